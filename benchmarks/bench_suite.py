@@ -0,0 +1,169 @@
+"""Benchmark suite: per-analyzer and end-to-end timings on a synthetic repository.
+
+Generates (or reuses) a deterministic repository from a preset, times each
+analyzer and the CLI, and writes the results as JSON. Compare against an
+earlier run to catch regressions::
+
+    python benchmarks/bench_suite.py --preset medium --output base.json
+    python benchmarks/bench_suite.py --preset medium --compare base.json
+
+``--compare`` exits non-zero when any benchmark is slower than the baseline by
+more than ``--threshold`` (default 10%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+
+from synthrepo import RepoSpec, generate
+
+from repolyzer import __version__
+
+PRESETS = {
+    "small": RepoSpec(files=1_000, commits=200),
+    "medium": RepoSpec(files=20_000, depth=8, commits=5_000),
+    "large": RepoSpec(files=200_000, depth=12, mean_lines=80, commits=50_000),
+}
+
+
+def _benchmarks(root: Path) -> dict[str, Callable[[], object]]:
+    from repolyzer.analyzers import (
+        analyze_git,
+        analyze_languages,
+        analyze_structure,
+        analyze_todos,
+    )
+
+    def cli(*flags: str) -> Callable[[], object]:
+        cmd = [sys.executable, "-m", "repolyzer", str(root), "--json", *flags]
+        return lambda: subprocess.run(cmd, check=True, capture_output=True)
+
+    # Library calls run single-process with no cache, so they measure the
+    # analyzer itself; the CLI rows measure what users actually wait for.
+    return {
+        "analyze_languages": lambda: analyze_languages(root),
+        "analyze_structure": lambda: analyze_structure(root),
+        "analyze_todos": lambda: analyze_todos(root),
+        "analyze_git": lambda: analyze_git(root),
+        "analyze_git_cached": lambda: analyze_git(root, use_cache=True),
+        "cli_cold": cli("--no-cache"),
+        "cli_warm": cli(),
+    }
+
+
+def _time(fn: Callable[[], object], repeat: int, warmup: int) -> dict[str, object]:
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "best": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs,
+    }
+
+
+def run_suite(root: Path, spec: RepoSpec, repeat: int, warmup: int, only: list[str] | None) -> dict:
+    benchmarks = _benchmarks(root)
+    unknown = set(only or ()) - set(benchmarks)
+    if unknown:
+        raise SystemExit(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if only and name not in only:
+            continue
+        results[name] = _time(fn, repeat, warmup)
+        print(f"  {name:<20} best {results[name]['best']:.3f}s", file=sys.stderr)
+
+    return {
+        "meta": {
+            "repolyzer": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": repeat,
+            "warmup": warmup,
+            "spec": asdict(spec),
+            "spec_digest": spec.digest(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Names of benchmarks whose best time regressed by more than ``threshold``."""
+    if baseline["meta"].get("spec_digest") != current["meta"]["spec_digest"]:
+        print("warning: baseline was measured on a different synthetic repository", file=sys.stderr)
+
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["best"] / before["best"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<20} {before['best']:.3f}s -> {result['best']:.3f}s ({ratio:.2f}x){flag}", file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--files", type=int, help="override the preset's file count")
+    parser.add_argument("--commits", type=int, help="override the preset's history length")
+    parser.add_argument("--seed", type=int, help="override the preset's seed")
+    parser.add_argument("--repo-dir", type=Path, help="generate into (and reuse) this directory")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only these benchmarks")
+    parser.add_argument("--output", type=Path, help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    spec = PRESETS[args.preset]
+    overrides = {"files": args.files, "commits": args.commits, "seed": args.seed}
+    spec = RepoSpec(**{**asdict(spec), **{k: v for k, v in overrides.items() if v is not None}})
+
+    with tempfile.TemporaryDirectory(prefix="repolyzer-bench-") as tmp:
+        # Keep the user's scan and history caches out of the measurements
+        os.environ["REPOLYZER_CACHE_DIR"] = os.path.join(tmp, "cache")
+        root = args.repo_dir or Path(tmp) / "repo"
+        print(f"generating {spec.files:,} files, {spec.commits:,} commits at {root}", file=sys.stderr)
+        generate(root, spec)
+        results = run_suite(root, spec, args.repeat, args.warmup, args.only)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            raise SystemExit(f"regressed: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Micro-benchmark: scandir-based scan_tree vs. the old os.walk + Path walk.
+
+Builds a synthetic tree (100k files by default) in a temporary directory and
+times both walkers over it. Run with::
+
+    python benchmarks/bench_walk.py --files 100000 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from repolyzer.scanner import SKIP_DIRS, scan_tree
+
+EXTENSIONS = (".py", ".js", ".md", ".json", ".txt", ".rs", ".go", "")
+
+
+def build_tree(root: Path, files: int, per_dir: int = 50, fanout: int = 8) -> None:
+    """Create ``files`` small files spread over a balanced directory tree."""
+    dirs = [root]
+    for n in range(1, -(-files // per_dir)):
+        directory = dirs[(n - 1) // fanout] / f"d{n}"
+        directory.mkdir()
+        dirs.append(directory)
+
+    for n in range(files):
+        ext = EXTENSIONS[n % len(EXTENSIONS)]
+        (dirs[n // per_dir] / f"f{n}{ext}").write_bytes(b"x = 1\n" * (n % 7))
+
+
+def legacy_walk(root: Path) -> tuple[int, int]:
+    """The pre-scandir approach: os.walk, a Path per file and an extra stat."""
+    count = 0
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            filepath = Path(dirpath) / filename
+            Path(filename).suffix
+            try:
+                total += filepath.stat().st_size
+                os.path.relpath(filepath, root)
+                count += 1
+            except OSError:
+                continue
+    return count, total
+
+
+def scandir_walk(root: Path) -> tuple[int, int]:
+    scan = scan_tree(root)
+    return len(scan.files), sum(entry.size for entry in scan.files)
+
+
+def _best_of(fn, root: Path, repeat: int) -> tuple[float, tuple[int, int]]:
+    best = float("inf")
+    result = (0, 0)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(root)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="repolyzer-bench-") as tmp:
+        root = Path(tmp)
+        build_tree(root, args.files)
+
+        legacy_time, legacy_result = _best_of(legacy_walk, root, args.repeat)
+        scandir_time, scandir_result = _best_of(scandir_walk, root, args.repeat)
+
+    assert legacy_result == scandir_result, (legacy_result, scandir_result)
+    print(f"files:          {legacy_result[0]:,}")
+    print(f"os.walk + Path: {legacy_time:.3f}s")
+    print(f"scan_tree:      {scandir_time:.3f}s")
+    print(f"speedup:        {legacy_time / scandir_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
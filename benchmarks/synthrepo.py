@@ -0,0 +1,220 @@
+"""Deterministic synthetic repositories for benchmarking.
+
+The same :class:`RepoSpec` (seed included) always produces byte-identical
+files and identical git history, so timings from different runs and machines
+measure repolyzer rather than the input. Usable as a module or directly::
+
+    python benchmarks/synthrepo.py /tmp/synth --files 20000 --commits 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import subprocess
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+# Extension -> line comment prefix ("" for formats without comments)
+COMMENT_PREFIX = {
+    ".py": "#",
+    ".js": "//",
+    ".ts": "//",
+    ".go": "//",
+    ".rs": "//",
+    ".java": "//",
+    ".c": "//",
+    ".md": "",
+    ".json": "",
+    ".txt": "",
+}
+
+DEFAULT_LANGUAGES = {
+    ".py": 30,
+    ".js": 15,
+    ".ts": 15,
+    ".go": 10,
+    ".rs": 10,
+    ".java": 5,
+    ".c": 5,
+    ".md": 4,
+    ".json": 3,
+    ".txt": 3,
+}
+
+MARKERS = ("TODO", "FIXME", "HACK", "XXX", "BUG", "NOTE")
+
+AUTHORS = (
+    ("Ada Lovelace", "ada@example.com"),
+    ("Alan Turing", "alan@example.com"),
+    ("Grace Hopper", "grace@example.com"),
+    ("Edsger Dijkstra", "edsger@example.com"),
+    ("Barbara Liskov", "barbara@example.com"),
+    ("Donald Knuth", "don@example.com"),
+    ("Frances Allen", "fran@example.com"),
+    ("Ken Thompson", "ken@example.com"),
+)
+
+# Fixed clock for generated commits so history is reproducible
+EPOCH = 1_600_000_000
+
+
+@dataclass
+class RepoSpec:
+    files: int = 2_000
+    depth: int = 6  # deepest directory level below the root
+    files_per_dir: int = 20
+    languages: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_LANGUAGES))  # ext -> weight
+    mean_lines: int = 60
+    size_sigma: float = 1.2  # spread of the log-normal line count distribution
+    max_lines: int = 20_000
+    todo_density: float = 0.005  # chance that a line carries a marker
+    commits: int = 200  # 0 for a plain directory without git
+    seed: int = 0
+
+    def digest(self) -> str:
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _directories(rng: random.Random, spec: RepoSpec) -> list[str]:
+    """Relative directory paths ("" is the root), at most ``spec.depth`` deep."""
+    dirs = [""]
+    depths = [0]
+    wanted = max(1, spec.files // max(1, spec.files_per_dir))
+    while len(dirs) < wanted:
+        parent = rng.randrange(len(dirs))
+        if depths[parent] >= spec.depth:
+            continue
+        dirs.append(os.path.join(dirs[parent], f"pkg{len(dirs)}"))
+        depths.append(depths[parent] + 1)
+    return dirs
+
+
+def _line_count(rng: random.Random, spec: RepoSpec) -> int:
+    mean = max(1, spec.mean_lines)
+    mu = math.log(mean) - spec.size_sigma ** 2 / 2
+    return min(spec.max_lines, int(rng.lognormvariate(mu, spec.size_sigma)))
+
+
+def _render(rng: random.Random, ext: str, lines: int, spec: RepoSpec) -> bytes:
+    prefix = COMMENT_PREFIX.get(ext, "#")
+    out = []
+    for n in range(lines):
+        if prefix and rng.random() < spec.todo_density:
+            out.append(f"{prefix} {rng.choice(MARKERS)}: revisit item {n}\n")
+        elif ext == ".json":
+            out.append(f'  "key_{n}": {n},\n')
+        else:
+            out.append(f"value_{n} = compute({n}, {rng.randrange(1000)})\n")
+    return "".join(out).encode()
+
+
+def _git(root: Path, *args: str, **kwargs) -> subprocess.CompletedProcess:
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME=AUTHORS[0][0],
+        GIT_AUTHOR_EMAIL=AUTHORS[0][1],
+        GIT_COMMITTER_NAME=AUTHORS[0][0],
+        GIT_COMMITTER_EMAIL=AUTHORS[0][1],
+        GIT_AUTHOR_DATE=f"{EPOCH} +0000",
+        GIT_COMMITTER_DATE=f"{EPOCH} +0000",
+    )
+    return subprocess.run(["git", "-C", str(root), *args], check=True, env=env, capture_output=True, **kwargs)
+
+
+def _history(root: Path, rng: random.Random, paths: list[str], spec: RepoSpec) -> None:
+    """Commit the tree, then add ``commits - 1`` small commits via git fast-import."""
+    _git(root, "init", "-q", "-b", "main")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "Initial import")
+
+    code_paths = [p for p in paths if COMMENT_PREFIX.get(os.path.splitext(p)[1])] or paths
+    touched: dict[str, bytes] = {}
+    stream = []
+    for n in range(1, spec.commits):
+        name, email = AUTHORS[rng.randrange(len(AUTHORS))]
+        path = rng.choice(code_paths)
+        if path not in touched:
+            touched[path] = (root / path).read_bytes()
+        touched[path] += f"revision_{n} = {n}\n".encode()
+        message = f"Change {n}\n".encode()
+        when = EPOCH + n * 3600
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(f"author {name} <{email}> {when} +0000\n".encode())
+        stream.append(f"committer {name} <{email}> {when} +0000\n".encode())
+        stream.append(b"data %d\n%s" % (len(message), message))
+        if n == 1:
+            stream.append(b"from refs/heads/main^0\n")
+        stream.append(f"M 100644 inline {path.replace(os.sep, '/')}\n".encode())
+        stream.append(b"data %d\n%s\n" % (len(touched[path]), touched[path]))
+
+    if stream:
+        _git(root, "fast-import", "--quiet", input=b"".join(stream))
+        _git(root, "reset", "-q", "--hard", "main")
+
+
+def generate(root: Path, spec: RepoSpec) -> Path:
+    """Create the repository for ``spec`` at ``root`` (reused if already generated)."""
+    # Kept beside the repository so it never shows up in what is analyzed
+    marker = root.with_name(f"{root.name}.synthrepo.json")
+    try:
+        if json.loads(marker.read_text())["digest"] == spec.digest():
+            return root
+    except (OSError, ValueError, KeyError):
+        pass
+    if root.exists() and any(root.iterdir()):
+        raise FileExistsError(f"{root} exists and was not generated from this spec")
+
+    rng = random.Random(spec.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    dirs = _directories(rng, spec)
+    for directory in dirs[1:]:
+        (root / directory).mkdir(exist_ok=True)
+
+    exts = list(spec.languages)
+    weights = [spec.languages[ext] for ext in exts]
+    paths = []
+    for n in range(spec.files):
+        ext = rng.choices(exts, weights)[0]
+        path = os.path.join(rng.choice(dirs), f"file{n}{ext}")
+        (root / path).write_bytes(_render(rng, ext, _line_count(rng, spec), spec))
+        paths.append(path)
+
+    if spec.commits > 0:
+        _history(root, rng, paths, spec)
+
+    # Written last so an interrupted run is never reused
+    marker.write_text(json.dumps({"digest": spec.digest(), "spec": asdict(spec)}))
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", type=Path)
+    defaults = RepoSpec()
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--mean-lines", type=int, default=defaults.mean_lines)
+    parser.add_argument("--todo-density", type=float, default=defaults.todo_density)
+    parser.add_argument("--commits", type=int, default=defaults.commits)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    spec = RepoSpec(
+        files=args.files,
+        depth=args.depth,
+        mean_lines=args.mean_lines,
+        todo_density=args.todo_density,
+        commits=args.commits,
+        seed=args.seed,
+    )
+    generate(args.root, spec)
+    print(f"{args.root}: {spec.files:,} files, {spec.commits:,} commits (spec {spec.digest()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Differences between the supported Python versions."""
+
+import sys
+
+# Keyword arguments for @dataclass giving the class __slots__, where supported (3.10+)
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -1,9 +1,30 @@
-from .languages import analyze_languages
-from .structure import analyze_structure
-from .git import analyze_git
-from .dependencies import analyze_dependencies
-from .health import analyze_health
-from .todos import analyze_todos
+"""Repository analyzers.
+
+Each analyzer module is imported the first time its function is looked up,
+so importing this package (and the CLI) stays cheap.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .dependencies import analyze_dependencies
+    from .git import analyze_git
+    from .health import analyze_health
+    from .languages import analyze_languages
+    from .structure import analyze_structure
+    from .todos import analyze_todos
+
+_ANALYZERS = {
+    "analyze_languages": ".languages",
+    "analyze_structure": ".structure",
+    "analyze_git": ".git",
+    "analyze_dependencies": ".dependencies",
+    "analyze_health": ".health",
+    "analyze_todos": ".todos",
+}
 
 __all__ = [
     "analyze_languages",
@@ -13,3 +34,16 @@ __all__ = [
     "analyze_health",
     "analyze_todos",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _ANALYZERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
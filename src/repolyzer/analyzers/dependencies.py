@@ -1,13 +1,33 @@
-"""Analyze project dependencies."""
+"""Analyze project dependencies.
+
+Manifests are picked out of the shared scan wherever they are in the tree,
+so every package of a monorepo is reported, and totals are given both per
+manifest and deduplicated by package name. Each parser extracts dependency
+names from a manifest's text; the counts follow from those. Lockfiles found
+the same way add the resolved, transitive picture (see :mod:`.lockfiles`).
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 
+from .. import profiling
+from .._compat import SLOTS
+from ..parallel import map_chunks
+from ..scanner import TreeScan, scan_tree
+from .lockfiles import LOCKFILES, LockfileStats, LockStats, read_lockfile
 
-@dataclass
+Names = tuple[list[str], list[str]]  # dependency names, dev dependency names
+
+
+@dataclass(**SLOTS)
 class DependencyFile:
     name: str
     path: str
@@ -15,234 +35,366 @@ class DependencyFile:
     dev_count: int = 0
 
 
+@dataclass(**SLOTS)
+class PackageDependencies:
+    path: str  # directory holding the manifests, "." for the root
+    manifests: list[str] = field(default_factory=list)
+    count: int = 0  # distinct names across the package's manifests
+    dev_count: int = 0
+
+
 @dataclass
 class DependencyReport:
     files: list[DependencyFile] = field(default_factory=list)
-    total_deps: int = 0
+    total_deps: int = 0  # summed over manifests
     total_dev_deps: int = 0
-
-
-DEPENDENCY_FILES = {
-    "package.json": "_parse_package_json",
-    "requirements.txt": "_parse_requirements_txt",
-    "Pipfile": "_parse_pipfile",
-    "pyproject.toml": "_parse_pyproject_toml",
-    "Cargo.toml": "_parse_cargo_toml",
-    "go.mod": "_parse_go_mod",
-    "Gemfile": "_parse_gemfile",
-    "composer.json": "_parse_composer_json",
-    "pom.xml": "_parse_pom_xml",
-    "build.gradle": "_parse_gradle",
-    "pubspec.yaml": "_parse_pubspec",
-    "mix.exs": "_parse_mix",
+    packages: list[PackageDependencies] = field(default_factory=list)
+    unique_deps: int = 0  # distinct (ecosystem, name) pairs across the tree
+    unique_dev_deps: int = 0  # dev-only names that are not also a regular dependency
+    lockfiles: list[LockfileStats] = field(default_factory=list)
+    transitive_deps: int = 0  # resolved packages summed over lockfiles
+
+
+# Names from manifests of the same ecosystem are the same package
+ECOSYSTEMS = {
+    "package.json": "npm",
+    "requirements.txt": "pypi",
+    "Pipfile": "pypi",
+    "pyproject.toml": "pypi",
+    "Cargo.toml": "cargo",
+    "go.mod": "go",
+    "Gemfile": "rubygems",
+    "composer.json": "packagist",
+    "pom.xml": "maven",
+    "build.gradle": "maven",
+    "pubspec.yaml": "pub",
+    "mix.exs": "hex",
 }
 
-
-def _parse_package_json(path: Path) -> tuple[int, int]:
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        deps = len(data.get("dependencies", {}))
-        dev = len(data.get("devDependencies", {}))
-        return deps, dev
-    except (json.JSONDecodeError, OSError):
-        return 0, 0
-
-
-def _parse_requirements_txt(path: Path) -> tuple[int, int]:
-    try:
-        lines = path.read_text(encoding="utf-8").splitlines()
-        count = sum(1 for line in lines if line.strip() and not line.strip().startswith("#") and not line.strip().startswith("-"))
-        return count, 0
-    except OSError:
-        return 0, 0
-
-
-def _parse_pyproject_toml(path: Path) -> tuple[int, int]:
-    try:
-        content = path.read_text(encoding="utf-8")
-        deps = 0
-        in_deps = False
-        in_dev = False
-        dev_deps = 0
-        for line in content.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("["):
-                in_deps = "dependencies" in stripped and "dev" not in stripped.lower() and "optional" not in stripped.lower()
-                in_dev = "dev" in stripped.lower() and "dependencies" in stripped.lower()
-            elif in_deps and stripped.startswith('"'):
-                deps += 1
-            elif in_dev and stripped.startswith('"'):
-                dev_deps += 1
-        return deps, dev_deps
-    except OSError:
-        return 0, 0
-
-
-def _parse_cargo_toml(path: Path) -> tuple[int, int]:
-    try:
-        content = path.read_text(encoding="utf-8")
-        deps = 0
-        dev_deps = 0
-        section = ""
-        for line in content.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("["):
-                section = stripped
-            elif "=" in stripped and not stripped.startswith("#"):
-                if section == "[dependencies]":
-                    deps += 1
-                elif section == "[dev-dependencies]":
-                    dev_deps += 1
-        return deps, dev_deps
-    except OSError:
-        return 0, 0
-
-
-def _parse_go_mod(path: Path) -> tuple[int, int]:
-    try:
-        content = path.read_text(encoding="utf-8")
-        in_require = False
-        deps = 0
-        for line in content.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("require ("):
-                in_require = True
-            elif stripped == ")":
-                in_require = False
-            elif in_require and stripped and not stripped.startswith("//"):
-                deps += 1
-            elif stripped.startswith("require ") and "(" not in stripped:
-                deps += 1
-        return deps, 0
-    except OSError:
-        return 0, 0
-
-
-def _parse_gemfile(path: Path) -> tuple[int, int]:
-    try:
-        lines = path.read_text(encoding="utf-8").splitlines()
-        count = sum(1 for line in lines if line.strip().startswith("gem "))
-        return count, 0
-    except OSError:
-        return 0, 0
-
-
-def _parse_composer_json(path: Path) -> tuple[int, int]:
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        deps = len(data.get("require", {}))
-        dev = len(data.get("require-dev", {}))
-        return deps, dev
-    except (json.JSONDecodeError, OSError):
-        return 0, 0
-
-
-def _parse_pipfile(path: Path) -> tuple[int, int]:
-    try:
-        content = path.read_text(encoding="utf-8")
-        section = ""
-        deps = 0
-        dev = 0
-        for line in content.splitlines():
-            stripped = line.strip()
-            if stripped == "[packages]":
-                section = "packages"
-            elif stripped == "[dev-packages]":
-                section = "dev"
-            elif stripped.startswith("["):
-                section = ""
-            elif "=" in stripped and section == "packages":
-                deps += 1
-            elif "=" in stripped and section == "dev":
-                dev += 1
-        return deps, dev
-    except OSError:
-        return 0, 0
-
-
-def _parse_pom_xml(path: Path) -> tuple[int, int]:
-    try:
-        content = path.read_text(encoding="utf-8")
-        count = content.count("<dependency>")
-        return count, 0
-    except OSError:
-        return 0, 0
-
-
-def _parse_gradle(path: Path) -> tuple[int, int]:
-    try:
-        content = path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-        deps = sum(1 for line in lines if "implementation " in line or "compile " in line or "api " in line)
-        dev = sum(1 for line in lines if "testImplementation " in line or "testCompile " in line)
-        return deps, dev
-    except OSError:
-        return 0, 0
+_REQUIREMENT_NAME = re.compile(r"[^<>=!~;\[\s@(]+")
+
+
+def _requirement_name(spec: str) -> str:
+    match = _REQUIREMENT_NAME.match(spec.strip())
+    return match.group(0) if match else spec.strip()
+
+
+def _package_json_names(text: str) -> Names:
+    data = json.loads(text)
+    return list(data.get("dependencies", {})), list(data.get("devDependencies", {}))
+
+
+def _requirements_txt_names(text: str) -> Names:
+    deps = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#") and not stripped.startswith("-"):
+            deps.append(_requirement_name(stripped))
+    return deps, []
+
+
+def _pyproject_toml_names(text: str) -> Names:
+    deps: list[str] = []
+    dev_deps: list[str] = []
+    in_deps = False
+    in_dev = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("["):
+            in_deps = "dependencies" in stripped and "dev" not in stripped.lower() and "optional" not in stripped.lower()
+            in_dev = "dev" in stripped.lower() and "dependencies" in stripped.lower()
+        elif (in_deps or in_dev) and stripped.startswith('"'):
+            name = _requirement_name(stripped[1:].partition('"')[0])
+            (deps if in_deps else dev_deps).append(name)
+    return deps, dev_deps
+
+
+def _cargo_toml_names(text: str) -> Names:
+    deps: list[str] = []
+    dev_deps: list[str] = []
+    section = ""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("["):
+            section = stripped
+        elif "=" in stripped and not stripped.startswith("#"):
+            name = stripped.partition("=")[0].strip().strip('"')
+            if section == "[dependencies]":
+                deps.append(name)
+            elif section == "[dev-dependencies]":
+                dev_deps.append(name)
+    return deps, dev_deps
+
+
+def _go_mod_names(text: str) -> Names:
+    deps = []
+    in_require = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("require ("):
+            in_require = True
+        elif stripped == ")":
+            in_require = False
+        elif in_require and stripped and not stripped.startswith("//"):
+            deps.append(stripped.split()[0])
+        elif stripped.startswith("require ") and "(" not in stripped:
+            deps.append(stripped.split()[1])
+    return deps, []
+
+
+_GEM_NAME = re.compile(r"""gem\s+["']([^"']+)""")
+
+
+def _gemfile_names(text: str) -> Names:
+    deps = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("gem "):
+            match = _GEM_NAME.match(stripped)
+            deps.append(match.group(1) if match else stripped)
+    return deps, []
+
+
+def _composer_json_names(text: str) -> Names:
+    data = json.loads(text)
+    return list(data.get("require", {})), list(data.get("require-dev", {}))
+
+
+def _pipfile_names(text: str) -> Names:
+    deps: list[str] = []
+    dev: list[str] = []
+    section = ""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == "[packages]":
+            section = "packages"
+        elif stripped == "[dev-packages]":
+            section = "dev"
+        elif stripped.startswith("["):
+            section = ""
+        elif "=" in stripped and section:
+            name = stripped.partition("=")[0].strip().strip('"')
+            (deps if section == "packages" else dev).append(name)
+    return deps, dev
+
+
+_POM_FIELD = re.compile(r"<(groupId|artifactId)>\s*([^<\s]+)\s*</\1>")
+
+
+def _pom_xml_names(text: str) -> Names:
+    deps = []
+    blocks = text.split("<dependency>")[1:]
+    for n, block in enumerate(blocks):
+        fields = dict(_POM_FIELD.findall(block.partition("</dependency>")[0]))
+        artifact = fields.get("artifactId")
+        deps.append(f"{fields.get('groupId', '')}:{artifact}" if artifact else f"<dependency {n}>")
+    return deps, []
+
+
+_GRADLE_COORDINATE = re.compile(r"""["']([^"':]+:[^"':]+)(?::[^"']*)?["']""")
+
+
+def _gradle_names(text: str) -> Names:
+    deps = []
+    dev = []
+    for line in text.splitlines():
+        match = _GRADLE_COORDINATE.search(line)
+        name = match.group(1) if match else line.strip()
+        if "implementation " in line or "compile " in line or "api " in line:
+            deps.append(name)
+        if "testImplementation " in line or "testCompile " in line:
+            dev.append(name)
+    return deps, dev
+
+
+def _pubspec_names(text: str) -> Names:
+    deps: list[str] = []
+    dev: list[str] = []
+    section = ""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped == "dependencies:":
+            section = "deps"
+        elif stripped == "dev_dependencies:":
+            section = "dev"
+        elif not line.startswith(" ") and not line.startswith("\t") and stripped:
+            section = ""
+        elif ":" in stripped and section:
+            (deps if section == "deps" else dev).append(stripped.partition(":")[0])
+    return deps, dev
+
+
+_MIX_NAME = re.compile(r"\{:(\w*)")
+
+
+def _mix_names(text: str) -> Names:
+    return _MIX_NAME.findall(text), []
+
+
+_PARSERS: dict[str, Callable[[str], Names]] = {
+    "package.json": _package_json_names,
+    "requirements.txt": _requirements_txt_names,
+    "Pipfile": _pipfile_names,
+    "pyproject.toml": _pyproject_toml_names,
+    "Cargo.toml": _cargo_toml_names,
+    "go.mod": _go_mod_names,
+    "Gemfile": _gemfile_names,
+    "composer.json": _composer_json_names,
+    "pom.xml": _pom_xml_names,
+    "build.gradle": _gradle_names,
+    "pubspec.yaml": _pubspec_names,
+    "mix.exs": _mix_names,
+}
 
 
-def _parse_pubspec(path: Path) -> tuple[int, int]:
+def _names(filename: str, data: bytes) -> Names:
     try:
-        content = path.read_text(encoding="utf-8")
-        section = ""
-        deps = 0
-        dev = 0
-        for line in content.splitlines():
-            stripped = line.strip()
-            if stripped == "dependencies:":
-                section = "deps"
-            elif stripped == "dev_dependencies:":
-                section = "dev"
-            elif not line.startswith(" ") and not line.startswith("\t") and stripped:
-                section = ""
-            elif ":" in stripped and section == "deps":
-                deps += 1
-            elif ":" in stripped and section == "dev":
-                dev += 1
-        return deps, dev
-    except OSError:
-        return 0, 0
-
-
-def _parse_mix(path: Path) -> tuple[int, int]:
+        return _PARSERS[filename](data.decode("utf-8", errors="replace"))
+    except (ValueError, TypeError, AttributeError, IndexError):  # malformed JSON and the like
+        return [], []
+
+
+def _normalize(ecosystem: str, name: str) -> str:
+    if ecosystem == "pypi":
+        return re.sub(r"[-_.]+", "-", name).lower()  # PEP 503
+    return name
+
+
+def manifest_digest(filename: str, data: bytes) -> str:
+    """Cache key for a manifest: its parser plus a hash of its content."""
+    return hashlib.sha1(filename.encode() + b"\0" + data).hexdigest()
+
+
+def lockfile_digest(filename: str, path: str) -> str:
+    """Cache key for a lockfile, hashed as it is read rather than loaded whole."""
+    digest = hashlib.sha1(filename.encode() + b"\0")
+    with open(path, "rb") as f:
+        for block in iter(partial(f.read, 1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_chunk(items: Sequence[tuple[str, bytes]]) -> list[Names]:
+    return [_names(filename, data) for filename, data in items]
+
+
+def _lockfile_chunk(items: Sequence[tuple[str, str]]) -> list[LockStats]:
+    return [read_lockfile(filename, path) for filename, path in items]
+
+
+def analyze_dependencies(
+    root: Path,
+    scan: TreeScan | None = None,
+    jobs: int = 1,
+    use_cache: bool = False,
+) -> DependencyReport:
+    """Find every manifest and lockfile in the tree and count what each declares.
+
+    Manifests and lockfiles are parsed on up to ``jobs`` processes. With
+    ``use_cache``, results are kept in a store shared by all repositories and
+    keyed by content hash, so a file already parsed anywhere is not parsed
+    again.
+    """
+    if scan is None:
+        scan = scan_tree(root)
+
+    manifests = []
+    locks = []
+    files = scan.files
+    for index in files.find(names=[*_PARSERS, *LOCKFILES]):
+        filename = files.name(index)
+        if filename in _PARSERS:
+            manifests.append((files.path(index), filename))
+        else:
+            locks.append((files.path(index), filename, files.sizes[index]))
+    manifests.sort()
+    locks.sort()
+
+    blobs = []
+    for path, filename in manifests:
+        try:
+            with open(os.path.join(root, path), "rb") as f:
+                blobs.append(f.read())
+        except OSError:
+            blobs.append(b"")
+    lock_paths = [os.path.join(root, path) for path, _, _ in locks]
+
+    digests = [manifest_digest(filename, data) for (_, filename), data in zip(manifests, blobs)]
+    lock_digests: list[str | None] = [None] * len(locks)
+    parsed: dict[str, tuple] = {}
+    cache = None
+    if use_cache and (manifests or locks):
+        from ..cache import ManifestCache
+
+        for i, (_, filename, _) in enumerate(locks):
+            try:
+                lock_digests[i] = lockfile_digest(filename, lock_paths[i])
+            except OSError:
+                pass
+        cache = ManifestCache.default()
+        parsed = cache.lookup(digests + [digest for digest in lock_digests if digest is not None])
     try:
-        content = path.read_text(encoding="utf-8")
-        count = content.count("{:")
-        return count, 0
-    except OSError:
-        return 0, 0
-
-
-_PARSERS = {
-    "package.json": _parse_package_json,
-    "requirements.txt": _parse_requirements_txt,
-    "Pipfile": _parse_pipfile,
-    "pyproject.toml": _parse_pyproject_toml,
-    "Cargo.toml": _parse_cargo_toml,
-    "go.mod": _parse_go_mod,
-    "Gemfile": _parse_gemfile,
-    "composer.json": _parse_composer_json,
-    "pom.xml": _parse_pom_xml,
-    "build.gradle": _parse_gradle,
-    "pubspec.yaml": _parse_pubspec,
-    "mix.exs": _parse_mix,
-}
-
+        misses = [i for i, digest in enumerate(digests) if digest not in parsed]
+        chunks = map_chunks(_parse_chunk, [(manifests[i][1], blobs[i]) for i in misses], jobs)
+        fresh = dict(zip((digests[i] for i in misses), (names for chunk in chunks for names in chunk)))
+
+        # Lockfiles are few and can be huge: one per task, read by the worker
+        lock_misses = [i for i, digest in enumerate(lock_digests) if digest not in parsed]
+        chunks = map_chunks(_lockfile_chunk, [(locks[i][1], lock_paths[i]) for i in lock_misses], jobs, min_chunk=1)
+        lock_results = [parsed.get(digest) for digest in lock_digests]
+        for i, stats in zip(lock_misses, (stats for chunk in chunks for stats in chunk)):
+            lock_results[i] = stats
+            if lock_digests[i] is not None:
+                fresh[lock_digests[i]] = stats
+        if cache is not None:
+            cache.store(fresh)
+        parsed.update(fresh)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # A cached run reads each lockfile once to hash it, and again if it missed
+    lock_reads = [i for i, digest in enumerate(lock_digests) if digest is not None] + lock_misses
+    profiling.count(
+        files_visited=len(manifests) + len(locks),
+        files_opened=len(manifests) + len(lock_reads),
+        bytes_read=sum(map(len, blobs)) + sum(locks[i][2] for i in lock_reads),
+    )
 
-def analyze_dependencies(root: Path) -> DependencyReport:
     report = DependencyReport()
-
-    for filename, parser in _PARSERS.items():
-        filepath = root / filename
-        if filepath.exists():
-            deps, dev = parser(filepath)
-            if deps or dev:
-                report.files.append(DependencyFile(
-                    name=filename,
-                    path=str(filepath.relative_to(root)),
-                    count=deps,
-                    dev_count=dev,
-                ))
-                report.total_deps += deps
-                report.total_dev_deps += dev
-
+    packages: dict[str, tuple[PackageDependencies, set[tuple[str, str]], set[tuple[str, str]]]] = {}
+    everywhere: set[tuple[str, str]] = set()
+    everywhere_dev: set[tuple[str, str]] = set()
+    for (path, filename), digest in zip(manifests, digests):
+        deps, dev = parsed[digest]
+        if not deps and not dev:
+            continue
+        report.files.append(DependencyFile(name=filename, path=path, count=len(deps), dev_count=len(dev)))
+        report.total_deps += len(deps)
+        report.total_dev_deps += len(dev)
+
+        ecosystem = ECOSYSTEMS[filename]
+        keys = {(ecosystem, _normalize(ecosystem, name)) for name in deps}
+        dev_keys = {(ecosystem, _normalize(ecosystem, name)) for name in dev}
+        directory = os.path.dirname(path) or "."
+        if directory not in packages:
+            packages[directory] = (PackageDependencies(path=directory), set(), set())
+        package, package_keys, package_dev_keys = packages[directory]
+        package.manifests.append(filename)
+        package_keys |= keys
+        package_dev_keys |= dev_keys
+        everywhere |= keys
+        everywhere_dev |= dev_keys
+
+    for package, package_keys, package_dev_keys in packages.values():
+        package.count = len(package_keys)
+        package.dev_count = len(package_dev_keys - package_keys)
+        report.packages.append(package)
+    report.unique_deps = len(everywhere)
+    report.unique_dev_deps = len(everywhere_dev - everywhere)
+
+    for (path, filename, _), (resolved, duplicates, max_depth) in zip(locks, lock_results):
+        if resolved:
+            report.lockfiles.append(LockfileStats(filename, path, resolved, duplicates, max_depth))
+            report.transitive_deps += resolved
     return report
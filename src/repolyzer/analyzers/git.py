@@ -2,9 +2,18 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .. import profiling
+
+if TYPE_CHECKING:
+    from ..history import History
 
 
 @dataclass
@@ -26,18 +35,146 @@ class GitReport:
 
 def _run_git(root: Path, *args: str) -> str:
     try:
-        result = subprocess.run(
-            ["git", "-C", str(root), *args],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
+        with profiling.track_subprocess(" ".join(("git",) + args)):
+            result = subprocess.run(
+                ["git", "-C", str(root), *args],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
         return result.stdout.strip()
     except (subprocess.TimeoutExpired, FileNotFoundError):
         return ""
 
 
-def analyze_git(root: Path) -> GitReport:
+def _git_dirs(root: Path) -> tuple[Path, Path]:
+    """Return (git dir, common dir), following ``.git`` files used by worktrees."""
+    git_dir = root / ".git"
+    if git_dir.is_file():
+        target = git_dir.read_text(encoding="utf-8").strip()
+        if target.startswith("gitdir:"):
+            git_dir = (root / target[len("gitdir:"):].strip()).resolve()
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = (git_dir / commondir_file.read_text(encoding="utf-8").strip()).resolve()
+    return git_dir, common_dir
+
+
+def _read_refs(common_dir: Path) -> tuple[set[str], set[str]]:
+    """Collect branch and tag names from loose refs and ``packed-refs``."""
+    refs: dict[str, set[str]] = {"heads": set(), "tags": set()}
+
+    for kind, names in refs.items():
+        base = common_dir / "refs" / kind
+        for dirpath, _, filenames in os.walk(base):
+            rel = os.path.relpath(dirpath, base)
+            for filename in filenames:
+                names.add(filename if rel == "." else f"{rel}/{filename}".replace(os.sep, "/"))
+
+    packed = common_dir / "packed-refs"
+    if packed.is_file():
+        for line in packed.read_text(encoding="utf-8", errors="replace").splitlines():
+            if not line or line[0] in "#^":
+                continue
+            _, _, ref = line.partition(" ")
+            for kind, names in refs.items():
+                prefix = f"refs/{kind}/"
+                if ref.startswith(prefix):
+                    names.add(ref[len(prefix):])
+
+    return refs["heads"], refs["tags"]
+
+
+def _read_head(git_dir: Path) -> str:
+    """Mirror ``git rev-parse --abbrev-ref HEAD`` without a subprocess."""
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    return "HEAD"  # detached
+
+
+def _ref_info(root: Path) -> tuple[str, int, int]:
+    """Current branch plus branch and tag counts, read straight from the git dir.
+
+    Falls back to git commands for layouts we don't parse (e.g. reftable).
+    """
+    try:
+        git_dir, common_dir = _git_dirs(root)
+        if not (common_dir / "reftable").exists():
+            branches, tags = _read_refs(common_dir)
+            return _read_head(git_dir), len(branches), len(tags)
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    refs = _run_git(root, "for-each-ref", "--format=%(refname)", "refs/heads", "refs/tags")
+    names = refs.splitlines() if refs else []
+    return (
+        _run_git(root, "rev-parse", "--abbrev-ref", "HEAD"),
+        sum(1 for name in names if name.startswith("refs/heads/")),
+        sum(1 for name in names if name.startswith("refs/tags/")),
+    )
+
+
+def _relative_date(timestamp: int, now: int | None = None) -> str:
+    """Format a timestamp the way git's ``%ar`` does ("3 years, 2 months ago")."""
+    if now is None:
+        now = int(time.time())
+    if timestamp > now:
+        return "in the future"
+
+    def plural(n: int, unit: str) -> str:
+        return f"{n} {unit}" if n == 1 else f"{n} {unit}s"
+
+    diff = now - timestamp
+    if diff < 90:
+        return f"{plural(diff, 'second')} ago"
+    diff = (diff + 30) // 60
+    if diff < 90:
+        return f"{plural(diff, 'minute')} ago"
+    diff = (diff + 30) // 60
+    if diff < 36:
+        return f"{plural(diff, 'hour')} ago"
+    diff = (diff + 12) // 24
+    if diff < 14:
+        return f"{plural(diff, 'day')} ago"
+    if diff < 70:
+        return f"{plural((diff + 3) // 7, 'week')} ago"
+    if diff < 365:
+        return f"{plural((diff + 15) // 30, 'month')} ago"
+    if diff < 1825:
+        total_months = (diff * 12 * 2 + 365) // (365 * 2)
+        years, months = divmod(total_months, 12)
+        if months:
+            return f"{plural(years, 'year')}, {plural(months, 'month')} ago"
+        return f"{plural(years, 'year')} ago"
+    return f"{plural((diff + 183) // 365, 'year')} ago"
+
+
+def _head_and_history(root: Path, use_cache: bool) -> tuple[list[str], History | None]:
+    """Last commit fields (sha, author, time, subject) plus history stats for it."""
+    from ..history import HistoryStore, commit_history
+
+    head = _run_git(root, "log", "-1", "--format=%H%x00%an%x00%at%x00%s", "HEAD")
+    fields = head.split("\x00", 3) if head else []
+    if len(fields) != 4:
+        return [], None
+
+    store = None
+    if use_cache:
+        try:
+            store = HistoryStore.for_repo(_git_dirs(root)[1])
+        except (OSError, UnicodeDecodeError):
+            store = None
+    return fields, commit_history(root, fields[0], store)
+
+
+def analyze_git(root: Path, use_cache: bool = False) -> GitReport:
+    """Collect git metadata for the repository at ``root``.
+
+    With ``use_cache``, commit counts and contributor tallies are persisted per
+    HEAD commit so later runs only walk commits that changed since.
+    """
     report = GitReport()
 
     # Check if it's a git repo
@@ -47,53 +184,35 @@ def analyze_git(root: Path) -> GitReport:
 
     report.is_git_repo = True
 
-    # Current branch
-    report.current_branch = _run_git(root, "rev-parse", "--abbrev-ref", "HEAD")
-
-    # Total commits
-    commit_count = _run_git(root, "rev-list", "--count", "HEAD")
-    report.total_commits = int(commit_count) if commit_count.isdigit() else 0
-
-    # Branches
-    branches_output = _run_git(root, "branch", "--list")
-    if branches_output:
-        report.branches = len(branches_output.strip().splitlines())
-
-    # Tags
-    tags_output = _run_git(root, "tag", "--list")
-    if tags_output:
-        report.tags = len(tags_output.strip().splitlines())
-
-    # Contributors
-    shortlog = _run_git(root, "shortlog", "-sn", "--no-merges", "HEAD")
-    if shortlog:
-        lines = shortlog.strip().splitlines()
-        report.contributors = len(lines)
-        report.top_contributors = []
-        for line in lines[:5]:
-            parts = line.strip().split("\t", 1)
-            if len(parts) == 2:
-                count = int(parts[0].strip())
-                name = parts[1].strip()
-                report.top_contributors.append((name, count))
-
-    # Last commit
-    last_log = _run_git(root, "log", "-1", "--format=%s|%ar|%an")
-    if last_log and "|" in last_log:
-        parts = last_log.split("|", 2)
-        report.last_commit_message = parts[0]
-        report.last_commit_date = parts[1] if len(parts) > 1 else ""
-        report.last_commit_author = parts[2] if len(parts) > 2 else ""
-
-    # First commit date
-    first_log = _run_git(root, "log", "--reverse", "--format=%ar", "-1")
-    report.first_commit_date = first_log
-
-    # Remote URL
-    report.remote_url = _run_git(root, "remote", "get-url", "origin")
+    # The remaining subprocesses are independent, so run them side by side
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        history_future = pool.submit(profiling.in_context(_head_and_history), root, use_cache)
+        remote_future = pool.submit(profiling.in_context(_run_git), root, "remote", "get-url", "origin")
+        status_future = pool.submit(profiling.in_context(_run_git), root, "status", "--porcelain")
+
+        # Current branch, branches and tags
+        report.current_branch, report.branches, report.tags = _ref_info(root)
+
+        head, history = history_future.result()
+        report.remote_url = remote_future.result()
+        status = status_future.result()
+
+    if head:
+        _, author, when, message = head
+        report.last_commit_message = message
+        report.last_commit_date = _relative_date(int(when))
+        report.last_commit_author = author
+
+    # Commits, contributors and first commit date
+    if history is not None:
+        report.total_commits = history.commits
+        ranked = sorted(history.authors.items(), key=lambda item: (-item[1], item[0]))
+        report.contributors = len(ranked)
+        report.top_contributors = ranked[:5]
+        if history.root_time is not None:
+            report.first_commit_date = _relative_date(history.root_time)
 
     # Uncommitted changes
-    status = _run_git(root, "status", "--porcelain")
     if status:
         report.uncommitted_changes = len(status.strip().splitlines())
 
@@ -1,12 +1,25 @@
-"""Analyze repository health indicators."""
+"""Analyze repository health indicators.
+
+Every check is answered from one listing of the root directory, plus a
+listing of any subdirectory a check names (``.github``, ``.circleci``), so
+the checks cost a couple of ``scandir`` calls rather than a stat each. Test
+files are looked for across the whole tree, in the file table of the shared
+scan: one search over its basenames and one over its directory names.
+"""
 
 from __future__ import annotations
 
+import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from .. import profiling
+from .._compat import SLOTS
+from ..scanner import TreeScan, scan_tree
 
-@dataclass
+
+@dataclass(**SLOTS)
 class HealthCheck:
     name: str
     passed: bool
@@ -42,6 +55,14 @@ TEST_PATTERNS = [
     "*.spec.ts",
 ]
 
+TEST_DIRS = [pattern for pattern in TEST_PATTERNS if not any(c in pattern for c in "*?[")]
+TEST_GLOBS = [pattern for pattern in TEST_PATTERNS if pattern not in TEST_DIRS]
+
+# A file is a test if a directory above it is named like a test directory,
+# or if its own name matches one of the test file globs
+_SEP = re.escape(os.sep)
+TEST_DIR = re.compile(f"(?:^|{_SEP})(?:{'|'.join(map(re.escape, TEST_DIRS))})(?:{_SEP}|\\Z)")
+
 DOCKER_FILES = [
     "Dockerfile",
     "docker-compose.yml",
@@ -51,77 +72,110 @@ DOCKER_FILES = [
 ]
 
 
-def analyze_health(root: Path) -> HealthReport:
+class _RootIndex:
+    """Which names exist under the root, from one directory listing each.
+
+    Names match whatever their case, as they do on the default macOS and
+    Windows filesystems, so ``README.md`` also finds ``Readme.md``.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._listings: dict[str, dict[str, str]] = {}  # directory -> casefolded name -> name
+
+    def _listing(self, reldir: str) -> dict[str, str]:
+        if reldir not in self._listings:
+            names: dict[str, str] = {}
+            try:
+                with os.scandir(os.path.join(self.root, reldir)) as entries:
+                    names = {entry.name.casefold(): entry.name for entry in entries}
+            except OSError:  # a file, or unreadable
+                pass
+            profiling.count(files_visited=len(names))
+            self._listings[reldir] = names
+        return self._listings[reldir]
+
+    def find(self, relpath: str) -> str:
+        """``relpath`` as it is named on disk, or "" if there is no such path."""
+        found = ""
+        for part in relpath.split("/"):
+            name = self._listing(found).get(part.casefold())
+            if name is None:
+                return ""
+            found = f"{found}/{name}" if found else name
+        return found
+
+    def exists(self, relpath: str) -> bool:
+        return bool(self.find(relpath))
+
+    def first(self, relpaths: list[str]) -> str:
+        return next((found for found in map(self.find, relpaths) if found), "")
+
+
+def _find_tests(index: _RootIndex, scan: TreeScan) -> str:
+    """A test directory at the root, or else any test file in the tree."""
+    found = index.first(TEST_DIRS)
+    if found:
+        return found
+    files = scan.files
+    candidates = files.find(globs=TEST_GLOBS)[:1]
+    in_test_dir = {dir_id for dir_id, path in enumerate(files.dirs) if TEST_DIR.search(path)}
+    if in_test_dir:
+        candidates += [next(index for index, dir_id in enumerate(files.dir_ids) if dir_id in in_test_dir)]
+    return files.path(min(candidates)) if candidates else ""
+
+
+def analyze_health(root: Path, scan: TreeScan | None = None) -> HealthReport:
+    """Run the health checks against ``root``.
+
+    Test files are searched for in ``scan``, which is taken of ``root`` if
+    not given.
+    """
+    index = _RootIndex(root)
     checks: list[HealthCheck] = []
 
     # README
-    readme_exists = any(
-        (root / name).exists()
-        for name in ("README.md", "README.rst", "README.txt", "README")
-    )
+    readme_exists = bool(index.first(["README.md", "README.rst", "README.txt", "README"]))
     checks.append(HealthCheck("README", readme_exists, "Documentation for your project"))
 
     # LICENSE
-    license_exists = any(
-        (root / name).exists()
-        for name in ("LICENSE", "LICENSE.md", "LICENSE.txt", "LICENCE", "COPYING")
-    )
+    license_exists = bool(index.first(["LICENSE", "LICENSE.md", "LICENSE.txt", "LICENCE", "COPYING"]))
     checks.append(HealthCheck("License", license_exists, "Open source license"))
 
     # .gitignore
-    gitignore = (root / ".gitignore").exists()
+    gitignore = index.exists(".gitignore")
     checks.append(HealthCheck(".gitignore", gitignore, "Git ignore rules"))
 
     # CI/CD
-    ci_found = ""
-    for ci in CI_FILES:
-        if (root / ci).exists():
-            ci_found = ci
-            break
+    ci_found = index.first(CI_FILES)
     checks.append(HealthCheck("CI/CD", bool(ci_found), ci_found or "No CI/CD configuration found"))
 
     # Tests
-    test_found = ""
-    for pattern in TEST_PATTERNS[:5]:  # Check directories
-        if (root / pattern).exists():
-            test_found = pattern
-            break
-    checks.append(HealthCheck("Tests", bool(test_found), test_found or "No test directory found"))
+    if scan is None:
+        scan = scan_tree(root)
+    test_found = _find_tests(index, scan)
+    checks.append(HealthCheck("Tests", bool(test_found), test_found or "No tests found"))
 
     # Docker
-    docker_found = ""
-    for df in DOCKER_FILES:
-        if (root / df).exists():
-            docker_found = df
-            break
+    docker_found = index.first(DOCKER_FILES)
     checks.append(HealthCheck("Docker", bool(docker_found), docker_found or "No Docker configuration"))
 
     # CONTRIBUTING
-    contributing = any(
-        (root / name).exists()
-        for name in ("CONTRIBUTING.md", "CONTRIBUTING.rst", "CONTRIBUTING")
-    )
+    contributing = bool(index.first(["CONTRIBUTING.md", "CONTRIBUTING.rst", "CONTRIBUTING"]))
     checks.append(HealthCheck("Contributing guide", contributing, "Guide for contributors"))
 
     # CHANGELOG
-    changelog = any(
-        (root / name).exists()
-        for name in ("CHANGELOG.md", "CHANGELOG", "CHANGES.md", "HISTORY.md")
-    )
+    changelog = bool(index.first(["CHANGELOG.md", "CHANGELOG", "CHANGES.md", "HISTORY.md"]))
     checks.append(HealthCheck("Changelog", changelog, "Project changelog"))
 
     # Security policy
-    security = any(
-        (root / name).exists()
-        for name in ("SECURITY.md", ".github/SECURITY.md")
-    )
+    security = bool(index.first(["SECURITY.md", ".github/SECURITY.md"]))
     checks.append(HealthCheck("Security policy", security, "Security reporting guidelines"))
 
     # Editor config
-    editorconfig = any(
-        (root / name).exists()
-        for name in (".editorconfig", ".prettierrc", ".prettierrc.json", ".eslintrc.json", "ruff.toml", ".flake8", "setup.cfg")
-    )
+    editorconfig = bool(index.first(
+        [".editorconfig", ".prettierrc", ".prettierrc.json", ".eslintrc.json", "ruff.toml", ".flake8", "setup.cfg"]
+    ))
     checks.append(HealthCheck("Linter/Formatter", editorconfig, "Code style configuration"))
 
     # Calculate score
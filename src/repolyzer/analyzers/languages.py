@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
-import os
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .._compat import SLOTS
+from ..scanner import SKIP_DIRS, TreeScan, scan_tree  # noqa: F401 - SKIP_DIRS re-exported
+
+if TYPE_CHECKING:
+    from ..content import ContentTotals, FileContent
 
 EXTENSION_MAP: dict[str, str] = {
     ".py": "Python",
@@ -94,16 +100,7 @@ LANGUAGE_COLORS: dict[str, str] = {
     "Lua": "blue",
 }
 
-SKIP_DIRS = {
-    ".git", "node_modules", "__pycache__", ".venv", "venv", "env",
-    ".env", "dist", "build", ".next", ".nuxt", "target", ".tox",
-    "vendor", ".idea", ".vscode", ".mypy_cache", ".pytest_cache",
-    ".ruff_cache", "coverage", ".coverage", "htmlcov", ".eggs",
-    "*.egg-info", ".gradle", ".cargo", "bin", "obj",
-}
-
-
-@dataclass
+@dataclass(**SLOTS)
 class LanguageStats:
     name: str
     files: int = 0
@@ -118,31 +115,89 @@ class LanguageReport:
     total_lines: int = 0
 
 
-def _count_lines(path: Path) -> int:
+# Files are read in blocks this size; anything smaller is read in one go
+BLOCK_SIZE = 1 << 20
+
+
+class _LineCounter:
+    """Count lines over a stream of byte blocks without decoding them.
+
+    Matches iterating the file in text mode with ``errors="ignore"``: ``\\n``,
+    ``\\r`` and ``\\r\\n`` each end a line, and trailing bytes after the last
+    terminator count as a line only if they decode to at least one character.
+    """
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self._pending_cr = False
+        self._tail = b""
+        self._tail_has_text = False
+
+    def feed(self, block: bytes) -> None:
+        if not block:
+            return
+        self.lines += block.count(b"\n") + block.count(b"\r") - block.count(b"\r\n")
+        if self._pending_cr and block[0] == 0x0A:
+            self.lines -= 1  # \r\n split across two blocks
+        self._pending_cr = block[-1] == 0x0D
+
+        cut = max(block.rfind(b"\n"), block.rfind(b"\r"))
+        if cut >= 0:
+            self._tail = b""
+            self._tail_has_text = False
+            block = block[cut + 1:]
+        if block and not self._tail_has_text:
+            probe = self._tail + block
+            if probe[0] < 0x80 or probe[-1] < 0x80 or probe.decode("utf-8", errors="ignore"):
+                self._tail_has_text = True
+            else:
+                self._tail = probe[-3:]  # may be the start of a split multi-byte char
+
+    @property
+    def total(self) -> int:
+        return self.lines + (1 if self._tail_has_text else 0)
+
+
+def _count_lines(path: str | Path) -> int:
+    counter = _LineCounter()
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return sum(1 for _ in f)
+        with open(path, "rb") as f:
+            while block := f.read(BLOCK_SIZE):
+                counter.feed(block)
     except (OSError, PermissionError):
         return 0
+    return counter.total
+
 
+def analyze_languages(
+    root: Path,
+    scan: TreeScan | None = None,
+    contents: list[FileContent] | None = None,
+    jobs: int = 1,
+    totals: ContentTotals | None = None,
+) -> LanguageReport:
+    if totals is None and contents is None:
+        from ..content import total_contents
+
+        totals = total_contents(root, scan or scan_tree(root), markers=False, jobs=jobs)
+    if totals is not None:
+        return _build_report(totals.lang_files, totals.lang_lines)
 
-def analyze_languages(root: Path) -> LanguageReport:
     lang_files: dict[str, int] = defaultdict(int)
     lang_lines: dict[str, int] = defaultdict(int)
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+    for content in contents:
+        lang_files[content.language] += 1
+        lang_lines[content.language] += content.lines
+
+    return _build_report(lang_files, lang_lines)
 
-        for filename in filenames:
-            ext = Path(filename).suffix
-            lang = EXTENSION_MAP.get(ext)
-            if lang:
-                filepath = Path(dirpath) / filename
-                lang_files[lang] += 1
-                lang_lines[lang] += _count_lines(filepath)
 
+def _build_report(lang_files: dict[str, int], lang_lines: dict[str, int]) -> LanguageReport:
     languages = []
     for name in lang_files:
+        if not lang_files[name]:
+            continue
         languages.append(LanguageStats(
             name=name,
             files=lang_files[name],
@@ -0,0 +1,488 @@
+"""Resolved dependency graphs from lockfiles, read as a stream.
+
+Lockfiles can run to tens of megabytes, so none of these parsers holds the
+document in memory: the line-oriented formats are read one line at a time,
+and ``package-lock.json`` is walked one ``packages`` entry at a time, each
+entry decoded on its own by the C JSON decoder. What is kept is the graph
+itself: one node per resolved package and its edges.
+
+From the graph come the number of resolved packages (transitive ones
+included), how many package names are resolved at more than one version,
+and the maximum depth: the longest of the shortest paths from the project
+to each package, direct dependencies being at depth 1. Where a lockfile does
+not record what the project itself depends on, packages nothing else depends
+on are taken as the direct ones. ``go.sum`` has no graph, so it has no depth.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import defaultdict, deque
+from collections.abc import Callable, Hashable, Iterator
+from dataclasses import dataclass
+from typing import IO
+
+from .._compat import SLOTS
+
+LOCKFILES = (
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "Cargo.lock",
+    "go.sum",
+)
+
+BLOCK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+LockStats = tuple[int, int, "int | None"]  # packages, duplicates, max depth
+
+
+@dataclass(**SLOTS)
+class LockfileStats:
+    name: str
+    path: str
+    packages: int = 0  # resolved packages, transitive ones included
+    duplicates: int = 0  # package names resolved at more than one version
+    max_depth: int | None = None  # None when the format records no graph
+
+
+class _Graph:
+    """Resolved packages and the edges between them, as a parser finds them."""
+
+    def __init__(self) -> None:
+        self.nodes: dict[Hashable, tuple[str, str]] = {}  # key -> (name, version)
+        self.edges: dict[Hashable, list[Hashable]] = {}
+        self.direct: list[Hashable] | None = None  # None: not recorded, infer it
+
+    def stats(self, has_graph: bool = True) -> LockStats:
+        versions: dict[str, set[str]] = defaultdict(set)
+        for name, version in self.nodes.values():
+            versions[name].add(version)
+        packages = sum(len(found) for found in versions.values())
+        duplicates = sum(1 for found in versions.values() if len(found) > 1)
+        if not has_graph or not self.nodes:
+            return packages, duplicates, None
+
+        direct = self.direct
+        if direct is None:
+            needed = {dep for deps in self.edges.values() for dep in deps}
+            direct = [key for key in self.nodes if key not in needed]
+        depth = {key: 1 for key in direct if key in self.nodes}
+        queue = deque(depth)
+        while queue:
+            key = queue.popleft()
+            below = depth[key] + 1
+            for dep in self.edges.get(key, ()):
+                if dep in self.nodes and dep not in depth:
+                    depth[dep] = below
+                    queue.append(dep)
+        return packages, duplicates, max(depth.values(), default=0)
+
+
+class _JsonStream:
+    """Steps through a JSON document in a file, one object member at a time.
+
+    Only the values asked for with :meth:`value` are decoded, each in a
+    single call to the C decoder; the text before them is dropped as the
+    read goes on, so memory is bounded by the largest single value.
+    """
+
+    def __init__(self, f: IO[str]):
+        self._file = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> None:
+        block = self._file.read(BLOCK_SIZE)
+        if not block:
+            self._eof = True
+        self._buf = self._buf[self._pos:] + block
+        self._pos = 0
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                raise ValueError("unexpected end of JSON document")
+            self._fill()
+
+    def _take(self, expected: str) -> str:
+        char = self._peek()
+        if char not in expected:
+            raise ValueError(f"expected {expected!r} in JSON document, found {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> object:
+        """Decode the next value in full."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                self._fill()  # the value runs past what has been read
+                continue
+            if end == len(self._buf) and not self._eof:
+                self._fill()  # a number may continue in the next block
+                continue
+            self._pos = end
+            return value
+
+    def skip(self) -> None:
+        """Pass over the next value, decoding an object one member at a time."""
+        if self._peek() == "{":
+            for _ in self.members():
+                self.value()
+        else:
+            self.value()
+
+    def members(self) -> Iterator[str]:
+        """Enter the next value, an object, yielding its keys.
+
+        The caller must consume each member's value, with :meth:`value`,
+        :meth:`skip` or :meth:`members`, before asking for the next key.
+        """
+        self._take("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise ValueError("JSON object key is not a string")
+            key = self.value()
+            self._take(":")
+            yield key
+            if self._take(",}") == "}":
+                return
+
+
+def _npm_resolve(nodes: dict[Hashable, tuple[str, str]], nested: set[str], location: str, name: str) -> str | None:
+    """Where Node would find ``name`` required from the package at ``location``.
+
+    ``nested`` holds the locations that have a ``node_modules`` of their own.
+    """
+    base = location
+    while base:
+        if base in nested:
+            candidate = f"{base}/node_modules/{name}"
+            if candidate in nodes:
+                return candidate
+        cut = base.rfind("/node_modules/")
+        base = base[:cut] if cut >= 0 else ""
+    candidate = f"node_modules/{name}"
+    return candidate if candidate in nodes else None
+
+
+def _npm_v1_entries(location: str, entries: dict, found: dict[str, tuple[str, str, list[str]]]) -> None:
+    for name, entry in entries.items():
+        if not isinstance(entry, dict):
+            continue
+        here = f"{location}/node_modules/{name}" if location else f"node_modules/{name}"
+        found[here] = (name, str(entry.get("version", "")), list(entry.get("requires") or {}))
+        _npm_v1_entries(here, entry.get("dependencies") or {}, found)
+
+
+def _package_lock(f: IO[str]) -> LockStats:
+    graph = _Graph()
+    requires: dict[str, list[str]] = {}
+    projects: dict[str, list[str]] = {}  # the root and workspace packages
+    stream = _JsonStream(f)
+    for key in stream.members():
+        if key == "packages":
+            for location in stream.members():
+                entry = stream.value()
+                if not isinstance(entry, dict) or entry.get("link"):
+                    continue
+                deps = [*(entry.get("dependencies") or {}), *(entry.get("optionalDependencies") or {})]
+                if "node_modules/" not in location:
+                    projects[location] = deps + list(entry.get("devDependencies") or {})
+                    continue
+                name = entry.get("name") or location[location.rfind("node_modules/") + 13:]
+                graph.nodes[location] = (name, str(entry.get("version", "")))
+                requires[location] = deps
+        elif key == "dependencies" and not graph.nodes:
+            # lockfileVersion 1 nests the tree, and the first level may be large
+            found: dict[str, tuple[str, str, list[str]]] = {}
+            for name in stream.members():
+                _npm_v1_entries("", {name: stream.value()}, found)
+            for location, (name, version, deps) in found.items():
+                graph.nodes[location] = (name, version)
+                requires[location] = deps
+        else:
+            stream.skip()  # including v2's copy of the tree under "dependencies"
+
+    nested = {location.rpartition("/node_modules/")[0] for location in graph.nodes}
+    for location, names in requires.items():
+        graph.edges[location] = [
+            dep for dep in (_npm_resolve(graph.nodes, nested, location, n) for n in names) if dep
+        ]
+    if projects:
+        graph.direct = [
+            dep for location, names in projects.items()
+            for dep in (_npm_resolve(graph.nodes, nested, location, n) for n in names) if dep
+        ]
+    return graph.stats()
+
+
+def _spec_name(spec: str) -> str:
+    at = spec.find("@", 1)  # scoped names start with "@"
+    return spec[:at] if at > 0 else spec
+
+
+def _unquote(text: str) -> str:
+    return text.strip().strip('"').strip("'")
+
+
+def _yarn_lock(f: IO[str]) -> LockStats:
+    # Classic (v1) and Berry lockfiles share a shape: a header of specifiers
+    # at column 0, then indented fields, dependencies two levels in.
+    graph = _Graph()
+    specifiers: dict[str, int] = {}
+    wanted: dict[int, list[tuple[str, str]]] = {}
+    workspaces: list[int] = []
+    entry = -1
+    in_deps = False
+    for line in f:
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line[0].isspace():
+            entry += 1
+            in_deps = False
+            specs = [_unquote(spec) for spec in line.rstrip().rstrip(":").split(",")]
+            for spec in specs:
+                specifiers[spec] = entry
+            name = _spec_name(specs[0])
+            if "@workspace:" in specs[0]:
+                workspaces.append(entry)
+            elif name != "__metadata":  # Berry's header block
+                graph.nodes[entry] = (name, "")
+            wanted[entry] = []
+            continue
+        if entry < 0:
+            continue
+        stripped = line.strip()
+        if not line.startswith(("    ", "\t\t")):
+            in_deps = stripped in ("dependencies:", "optionalDependencies:")
+            if stripped.startswith("version") and entry in graph.nodes:
+                graph.nodes[entry] = (graph.nodes[entry][0], _unquote(stripped[7:].lstrip(":")))
+        elif in_deps:
+            if stripped.startswith('"'):
+                name, _, rest = stripped[1:].partition('"')
+            else:
+                name, _, rest = stripped.replace(":", " ", 1).partition(" ")
+            wanted[entry].append((name, _unquote(rest.lstrip(":"))))
+
+    for entry, deps in wanted.items():
+        resolved = []
+        for name, range_ in deps:
+            found = specifiers.get(f"{name}@{range_}", specifiers.get(f"{name}@npm:{range_}"))
+            if found is not None:
+                resolved.append(found)
+        graph.edges[entry] = resolved
+    if workspaces:
+        graph.direct = [dep for entry in workspaces for dep in graph.edges[entry]]
+    return graph.stats()
+
+
+_PEER_SUFFIX = re.compile(r"\(.*\)$|_.*$")
+_PNPM_V5_ID = re.compile(r"((?:@[^/]+/)?[^/@]+)/(\d.*)")
+
+
+def _pnpm_key(name: str, version: str) -> tuple[str, str] | None:
+    """Graph key for ``name`` at ``version`` as a dependency value; None for links."""
+    version = _unquote(version)
+    if version.startswith(("link:", "file:", "workspace:")):
+        return None
+    if version.startswith("/"):  # an alias: the value is the package id itself
+        return _pnpm_id(version)
+    return name, version
+
+
+def _pnpm_id(package_id: str) -> tuple[str, str]:
+    """(name, version with peer suffix) for a ``packages:`` key of any lockfile version."""
+    package_id = _unquote(package_id).lstrip("/")
+    match = _PNPM_V5_ID.fullmatch(package_id)
+    if match:  # "name/1.0.0_peer@2.0.0" before lockfile v6
+        return match.group(1), match.group(2)
+    at = package_id.find("@", 1)  # "name@1.0.0(peer@2.0.0)" from v6 on
+    return (package_id[:at], package_id[at + 1:]) if at > 0 else (package_id, "")
+
+
+def _pnpm_lock(f: IO[str]) -> LockStats:
+    graph = _Graph()
+    direct: list[tuple[str, str]] = []
+    section = ""
+    package: tuple[str, str] | None = None
+    field = ""
+    importer_dep = ""  # a v6+ dependency whose version follows on its own line
+    for line in f:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+        key, _, value = stripped.partition(":")
+        key, value = _unquote(key), value.strip()
+        if indent == 0:
+            section, field, importer_dep = key, key, ""
+            continue
+
+        if section in ("packages", "snapshots"):
+            if indent == 2:
+                package = _pnpm_id(stripped[:-1] if stripped.endswith(":") else key)
+                graph.nodes[package] = (package[0], _PEER_SUFFIX.sub("", package[1]))
+                graph.edges.setdefault(package, [])
+            elif indent == 4:
+                field = key
+            elif indent == 6 and package is not None and field in ("dependencies", "optionalDependencies"):
+                dep = _pnpm_key(key, value)
+                if dep is not None:
+                    graph.edges[package].append(dep)
+            continue
+
+        # What the project depends on: top-level sections in a single-project
+        # lockfile, or nested one level deeper under each of the "importers"
+        level = indent
+        if section == "importers":
+            level -= 2
+        elif section not in ("dependencies", "devDependencies", "optionalDependencies"):
+            continue
+        else:
+            level += 2
+        if level == 2:
+            field = key
+        elif level == 4 and field in ("dependencies", "devDependencies", "optionalDependencies"):
+            importer_dep = key
+            if value:
+                dep = _pnpm_key(key, value)
+                if dep is not None:
+                    direct.append(dep)
+        elif level == 6 and key == "version" and importer_dep:
+            dep = _pnpm_key(importer_dep, value)
+            if dep is not None:
+                direct.append(dep)
+
+    graph.direct = direct
+    return graph.stats()
+
+
+def _toml_packages(f: IO[str]) -> Iterator[tuple[dict[str, str], list[str]]]:
+    """Each ``[[package]]`` of a TOML lockfile: its fields and its dependencies."""
+    fields: dict[str, str] | None = None
+    deps: list[str] = []
+    table = ""
+    in_array = False
+    for line in f:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if in_array:
+            if stripped.startswith("]"):
+                in_array = False
+            else:
+                deps.append(_unquote(stripped.rstrip(",")))
+            continue
+        if stripped.startswith("["):
+            if stripped == "[[package]]":
+                if fields is not None:
+                    yield fields, deps
+                fields, deps = {}, []
+            table = stripped
+            continue
+        if fields is None:
+            continue
+        key, _, value = stripped.partition("=")
+        key, value = key.strip(), value.strip()
+        if table == "[[package]]":
+            if key == "dependencies" and value.startswith("["):
+                inline = value[1:].partition("]")
+                deps.extend(_unquote(dep) for dep in inline[0].split(",") if dep.strip())
+                in_array = not inline[1]
+            else:
+                fields[key] = _unquote(value)
+        elif table == "[package.dependencies]":
+            deps.append(_unquote(key))
+    if fields is not None:
+        yield fields, deps
+
+
+def _poetry_lock(f: IO[str]) -> LockStats:
+    graph = _Graph()
+    by_name: dict[str, list[int]] = defaultdict(list)
+    for n, (fields, deps) in enumerate(_toml_packages(f)):
+        name = re.sub(r"[-_.]+", "-", fields.get("name", "")).lower()
+        graph.nodes[n] = (name, fields.get("version", ""))
+        graph.edges[n] = deps
+        by_name[name].append(n)
+    for n, deps in graph.edges.items():
+        graph.edges[n] = [
+            found for dep in deps for found in by_name.get(re.sub(r"[-_.]+", "-", dep).lower(), ())
+        ]
+    return graph.stats()
+
+
+def _cargo_lock(f: IO[str]) -> LockStats:
+    graph = _Graph()
+    members: list[int] = []
+    by_name: dict[str, list[int]] = defaultdict(list)
+    versions: dict[int, str] = {}
+    for n, (fields, deps) in enumerate(_toml_packages(f)):
+        name, version = fields.get("name", ""), fields.get("version", "")
+        versions[n] = version
+        if "source" in fields:
+            graph.nodes[n] = (name, version)
+        else:
+            members.append(n)  # a crate of this workspace
+        graph.edges[n] = deps
+        by_name[name].append(n)
+    for n, deps in graph.edges.items():
+        resolved = []
+        for dep in deps:
+            name, _, version = dep.partition(" ")
+            version = version.partition(" ")[0]
+            candidates = by_name.get(name, [])
+            if version:
+                candidates = [c for c in candidates if versions[c] == version] or candidates
+            resolved.extend(candidates[:1])
+        graph.edges[n] = resolved
+    graph.direct = [dep for n in members for dep in graph.edges[n]]
+    return graph.stats()
+
+
+def _go_sum(f: IO[str]) -> LockStats:
+    graph = _Graph()
+    for line in f:
+        parts = line.split()
+        if len(parts) >= 2:
+            module, version = parts[0], parts[1]
+            version = version.removesuffix("/go.mod")
+            graph.nodes[module, version] = (module, version)
+    return graph.stats(has_graph=False)
+
+
+_LOCKFILE_PARSERS: dict[str, Callable[[IO[str]], LockStats]] = {
+    "package-lock.json": _package_lock,
+    "yarn.lock": _yarn_lock,
+    "pnpm-lock.yaml": _pnpm_lock,
+    "poetry.lock": _poetry_lock,
+    "Cargo.lock": _cargo_lock,
+    "go.sum": _go_sum,
+}
+
+
+def read_lockfile(filename: str, path: str) -> LockStats:
+    """Packages, duplicates and max depth for the lockfile at ``path``."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return _LOCKFILE_PARSERS[filename](f)
+    except (OSError, ValueError, TypeError, AttributeError):  # unreadable or malformed
+        return 0, 0, None
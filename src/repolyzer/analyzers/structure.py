@@ -2,11 +2,31 @@
 
 from __future__ import annotations
 
+import heapq
 import os
 from dataclasses import dataclass
 from pathlib import Path
 
-from .languages import SKIP_DIRS
+from .._compat import SLOTS
+from ..scanner import TreeScan, scan_tree
+
+TOP_FILES = 5
+TOP_DIRS = 5
+
+
+def human_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+@dataclass(**SLOTS)
+class DirectoryStats:
+    path: str  # top-level directory, or "." for files in the root itself
+    files: int = 0
+    size_bytes: int = 0
 
 
 @dataclass
@@ -17,58 +37,54 @@ class StructureReport:
     deepest_path: str = ""
     max_depth: int = 0
     largest_files: list[tuple[str, int]] = None
+    heaviest_dirs: list[DirectoryStats] = None
 
     def __post_init__(self):
         if self.largest_files is None:
             self.largest_files = []
+        if self.heaviest_dirs is None:
+            self.heaviest_dirs = []
 
     @property
     def size_human(self) -> str:
-        size = self.total_size_bytes
-        for unit in ("B", "KB", "MB", "GB"):
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
-
-
-def analyze_structure(root: Path) -> StructureReport:
-    total_files = 0
-    total_dirs = 0
-    total_size = 0
-    max_depth = 0
-    deepest_path = ""
-    file_sizes: list[tuple[str, int]] = []
-
-    root_depth = str(root).count(os.sep)
-
-    for dirpath, dirnames, filenames in os.walk(root):
-        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
-        total_dirs += len(dirnames)
-
-        current_depth = str(dirpath).count(os.sep) - root_depth
-        if current_depth > max_depth:
-            max_depth = current_depth
-            deepest_path = os.path.relpath(dirpath, root)
-
-        for filename in filenames:
-            filepath = Path(dirpath) / filename
-            try:
-                size = filepath.stat().st_size
-                total_files += 1
-                total_size += size
-                rel = os.path.relpath(filepath, root)
-                file_sizes.append((rel, size))
-            except (OSError, PermissionError):
-                continue
-
-    file_sizes.sort(key=lambda x: x[1], reverse=True)
+        return human_size(self.total_size_bytes)
+
+
+def analyze_structure(root: Path, scan: TreeScan | None = None) -> StructureReport:
+    """Summarize the tree in a single pass over the scan.
+
+    Sizes are read straight from the scan's columns and summed per
+    directory id, then per top-level directory; only a fixed-size heap of
+    the largest files is kept, so no per-file objects are made.
+    """
+    if scan is None:
+        scan = scan_tree(root)
+    files = scan.files
+    sizes = files.sizes
+
+    dir_files = [0] * len(files.dirs)
+    dir_bytes = [0] * len(files.dirs)
+    for dir_id, size in zip(files.dir_ids, sizes):
+        dir_files[dir_id] += 1
+        dir_bytes[dir_id] += size
+
+    dirs: dict[str, DirectoryStats] = {}
+    for path, count, size in zip(files.dirs, dir_files, dir_bytes):
+        top = path.split(os.sep, 1)[0] if path else "."
+        stats = dirs.get(top)
+        if stats is None:
+            stats = dirs[top] = DirectoryStats(path=top)
+        stats.files += count
+        stats.size_bytes += size
+
+    largest = heapq.nlargest(TOP_FILES, range(len(files)), key=sizes.__getitem__)
 
     return StructureReport(
-        total_files=total_files,
-        total_dirs=total_dirs,
-        total_size_bytes=total_size,
-        deepest_path=deepest_path,
-        max_depth=max_depth,
-        largest_files=file_sizes[:5],
+        total_files=len(files),
+        total_dirs=scan.total_dirs,
+        total_size_bytes=sum(sizes),
+        deepest_path=scan.deepest_path,
+        max_depth=scan.max_depth,
+        largest_files=[(files.path(index), sizes[index]) for index in largest],
+        heaviest_dirs=heapq.nlargest(TOP_DIRS, dirs.values(), key=lambda d: d.size_bytes),
     )
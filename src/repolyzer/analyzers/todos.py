@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
-import os
 import re
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .languages import EXTENSION_MAP, SKIP_DIRS
+from .._compat import SLOTS
+from ..scanner import TreeScan, scan_tree
+
+if TYPE_CHECKING:
+    from ..content import ContentTotals, FileContent
 
 MARKERS = {
     "TODO": re.compile(r"\bTODO\b", re.IGNORECASE),
@@ -20,6 +24,16 @@ MARKERS = {
     "DEPRECATED": re.compile(r"\bDEPRECATED\b", re.IGNORECASE),
 }
 
+# A buffer can only hold a marker if its lowercased text contains one of these
+_MARKER_WORDS = tuple(name.lower() for name in MARKERS)
+# Plain lowercase literals, no groups, \b or IGNORECASE: far cheaper to search
+# the lowercased buffer for than MARKERS, and a superset of their matches.
+# Lines that hit are checked against MARKERS.
+_SCREEN_RE = re.compile("|".join(_MARKER_WORDS))
+# For the rare text whose lowercased form has a different length (such as
+# "\u0130"), where offsets into it would not line up with the text itself
+_SCREEN_ANYCASE_RE = re.compile("|".join(_MARKER_WORDS), re.IGNORECASE)
+
 MARKER_STYLES = {
     "TODO": "bright_cyan",
     "FIXME": "bright_red",
@@ -31,7 +45,7 @@ MARKER_STYLES = {
 }
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TodoItem:
     marker: str
     text: str
@@ -46,39 +60,93 @@ class TodoReport:
     total: int = 0
 
 
-def analyze_todos(root: Path, max_items: int = 20) -> TodoReport:
+def _line_end(text: str, pos: int) -> int:
+    ends = [i for i in (text.find("\n", pos), text.find("\r", pos)) if i >= 0]
+    return min(ends) if ends else len(text)
+
+
+def _scan_markers(
+    text: str,
+    path: str,
+    max_items: int,
+    first_line: int = 1,
+) -> tuple[dict[str, int], list[TodoItem]]:
+    """Find markers in one file's text, keeping at most ``max_items`` items.
+
+    A substring test on the lowercased buffer rules out the common
+    marker-free file. Otherwise a literal screen finds candidate lines and
+    only those are checked against ``MARKERS``; when a line holds several
+    markers the one listed first wins.
+    """
+    counts: dict[str, int] = {}
+    items: list[TodoItem] = []
+
+    lowered = text.lower()
+    if not any(word in lowered for word in _MARKER_WORDS):
+        return counts, items
+
+    if len(lowered) == len(text):
+        screen, screened = _SCREEN_RE.search, lowered
+    else:
+        screen, screened = _SCREEN_ANYCASE_RE.search, text
+    match = screen(screened)
+    line_num = first_line
+    counted_to = 0
+    while match:
+        start = match.start()
+        line_start = max(text.rfind("\n", 0, start), text.rfind("\r", 0, start)) + 1
+        line_end = _line_end(text, match.end())
+        line = text[line_start:line_end]
+        marker_name = next((name for name, pattern in MARKERS.items() if pattern.search(line)), None)
+        if marker_name is not None:
+            line_num += (
+                text.count("\n", counted_to, line_start)
+                + text.count("\r", counted_to, line_start)
+                - text.count("\r\n", counted_to, line_start)
+            )
+            counted_to = line_start
+
+            counts[marker_name] = counts.get(marker_name, 0) + 1
+            if len(items) < max_items:
+                snippet = line.strip()
+                if len(snippet) > 80:
+                    snippet = snippet[:77] + "..."
+                items.append(TodoItem(
+                    marker=marker_name,
+                    text=snippet,
+                    file=path,
+                    line=line_num,
+                ))
+
+        match = screen(screened, line_end)
+
+    return counts, items
+
+
+def analyze_todos(
+    root: Path,
+    max_items: int = 20,
+    scan: TreeScan | None = None,
+    contents: list[FileContent] | None = None,
+    jobs: int = 1,
+    totals: ContentTotals | None = None,
+) -> TodoReport:
+    if totals is None and contents is None:
+        from ..content import total_contents
+
+        totals = total_contents(root, scan or scan_tree(root), max_items=max_items, jobs=jobs)
+    if totals is not None:
+        report = TodoReport()
+        report.counts.update(totals.marker_counts)
+        report.total = sum(totals.marker_counts.values())
+        report.items = totals.markers[:max_items]
+        return report
+
     report = TodoReport()
-    code_extensions = set(EXTENSION_MAP.keys())
-
-    for dirpath, dirnames, filenames in os.walk(root):
-        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
-
-        for filename in filenames:
-            ext = Path(filename).suffix
-            if ext not in code_extensions:
-                continue
-
-            filepath = Path(dirpath) / filename
-            try:
-                with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-                    for line_num, line in enumerate(f, 1):
-                        for marker_name, pattern in MARKERS.items():
-                            if pattern.search(line):
-                                report.counts[marker_name] += 1
-                                report.total += 1
-                                if len(report.items) < max_items:
-                                    rel_path = os.path.relpath(filepath, root)
-                                    text = line.strip()
-                                    if len(text) > 80:
-                                        text = text[:77] + "..."
-                                    report.items.append(TodoItem(
-                                        marker=marker_name,
-                                        text=text,
-                                        file=rel_path,
-                                        line=line_num,
-                                    ))
-                                break  # One marker per line
-            except (OSError, PermissionError):
-                continue
+    for content in contents:
+        for marker, count in content.marker_counts.items():
+            report.counts[marker] += count
+            report.total += count
+        report.items.extend(content.markers[:max_items - len(report.items)])
 
     return report
@@ -0,0 +1,170 @@
+"""Analyze many repositories in one run, reporting each as soon as it finishes.
+
+Every repository is analyzed in its own worker process, so one that hangs
+(a stuck filesystem, a huge git history) can be killed at its deadline
+without taking the rest of the batch down. Workers are forked from a server
+that has already imported the analyzers, so starting one costs a fork rather
+than a fresh interpreter.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import multiprocessing.context
+    import multiprocessing.process
+    from multiprocessing.connection import Connection
+
+    from .pipeline import AnalysisOptions
+
+DEFAULT_TIMEOUT = 300.0  # seconds per repository
+
+
+@dataclass
+class BatchResult:
+    path: str  # as given, so callers can match results to their input
+    ok: bool
+    seconds: float = 0.0
+    report: dict[str, Any] | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"path": self.path, "ok": self.ok, "seconds": round(self.seconds, 3)}
+        if self.ok:
+            data["report"] = self.report
+        else:
+            data["error"] = self.error
+        return data
+
+
+def read_path_list(lines: Iterable[str]) -> list[str]:
+    """Paths from a list file: one per line, blank lines and ``#`` comments skipped."""
+    paths = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            paths.append(line)
+    return paths
+
+
+def _analyze_one(path: str, options: AnalysisOptions, conn: Connection) -> None:
+    from pathlib import Path
+
+    from .export import analysis_to_dict
+    from .pipeline import run_analysis
+
+    try:
+        report = analysis_to_dict(run_analysis(Path(path).resolve(), options))
+    except Exception as exc:  # noqa: BLE001 - reported as this repository's failure
+        conn.send((False, f"{type(exc).__name__}: {exc}"))
+    else:
+        conn.send((True, report))
+    finally:
+        conn.close()
+
+
+def _context() -> multiprocessing.context.BaseContext:
+    import multiprocessing
+
+    from .parallel import _mp_context
+
+    ctx = _mp_context()
+    if ctx is None:
+        return multiprocessing.get_context()
+    ctx.set_forkserver_preload([__name__, "repolyzer.pipeline", "repolyzer.export"])
+    return ctx
+
+
+def run_batch(
+    paths: Iterable[str],
+    options: AnalysisOptions | None = None,
+    workers: int | None = None,
+    timeout: float | None = DEFAULT_TIMEOUT,
+) -> Iterator[BatchResult]:
+    """Analyze every path in ``paths``, yielding results in completion order.
+
+    At most ``workers`` repositories are analyzed at once. A repository that
+    fails, or is still running after ``timeout`` seconds, yields a result with
+    ``ok=False`` and an ``error`` message; the batch carries on either way.
+    """
+    from multiprocessing.connection import wait
+
+    from .parallel import default_jobs
+    from .pipeline import AnalysisOptions
+
+    if options is None:
+        options = AnalysisOptions(jobs=1)
+    workers = workers or default_jobs()
+    ctx = _context()
+    pending = deque(paths)
+    running: dict[Connection, tuple[multiprocessing.process.BaseProcess, str, float]] = {}
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                path = pending.popleft()
+                if not os.path.isdir(path):
+                    yield BatchResult(path, ok=False, error="not a directory")
+                    continue
+                reader, writer = ctx.Pipe(duplex=False)
+                # Not daemonic: a worker starts its own pool for the content pass
+                # (``jobs``), and daemonic processes may not have children. The
+                # ``finally`` below kills any worker still running.
+                proc = ctx.Process(target=_analyze_one, args=(path, options, writer))
+                try:
+                    proc.start()
+                except OSError as exc:
+                    reader.close()
+                    yield BatchResult(path, ok=False, error=f"could not start worker: {exc}")
+                    continue
+                finally:
+                    writer.close()
+                running[reader] = (proc, path, time.monotonic())
+
+            if not running:
+                continue
+
+            wait_for = None
+            if timeout is not None:
+                oldest = min(started for _, _, started in running.values())
+                wait_for = max(0.0, oldest + timeout - time.monotonic())
+
+            for reader in wait(list(running), timeout=wait_for):
+                proc, path, started = running.pop(reader)
+                try:
+                    ok, payload = reader.recv()
+                except (EOFError, OSError):
+                    proc.join()
+                    ok, payload = False, f"worker exited with code {proc.exitcode}"
+                reader.close()
+                proc.join()
+                elapsed = time.monotonic() - started
+                if ok:
+                    yield BatchResult(path, ok=True, seconds=elapsed, report=payload)
+                else:
+                    yield BatchResult(path, ok=False, seconds=elapsed, error=payload)
+
+            if timeout is not None:
+                now = time.monotonic()
+                for reader, (proc, path, started) in list(running.items()):
+                    if now - started >= timeout:
+                        del running[reader]
+                        _stop(proc, reader)
+                        yield BatchResult(
+                            path, ok=False, seconds=now - started, error=f"timed out after {timeout:g}s"
+                        )
+    finally:
+        for reader, (proc, _, _) in running.items():
+            _stop(proc, reader)
+
+
+def _stop(proc: multiprocessing.process.BaseProcess, reader: Connection) -> None:
+    proc.kill()
+    proc.join()
+    reader.close()
@@ -0,0 +1,308 @@
+"""Persistent per-file cache so repeat scans only re-read changed files."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+from . import __version__
+from .analyzers.todos import TodoItem
+from .content import ContentTotals, FileContent
+from .scanner import FileEntry
+
+# Bump when the meaning of cached values changes (marker rules, line semantics)
+SCHEMA = f"{__version__}-2"
+
+# Files modified this recently may still be changing within the same mtime
+# tick, so (like git's "racily clean" check) they are never cached.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def cache_dir() -> Path:
+    """Where cache databases live: $REPOLYZER_CACHE_DIR, else $XDG_CACHE_HOME/repolyzer."""
+    override = os.environ.get("REPOLYZER_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "repolyzer"
+
+
+class ScanCache:
+    """SQLite-backed store of per-file results keyed by path, size and mtime_ns.
+
+    Every row for the root is loaded up front so lookups are dictionary hits,
+    unless ``preload`` is off, in which case only the directories passed to
+    :meth:`load` are; :meth:`update` writes back new results and drops rows
+    for deleted files. Totals for whole subtrees are kept alongside (see
+    :mod:`repolyzer.subtrees`). Any database error simply disables the cache
+    for the rest of the run.
+    """
+
+    _COLUMNS = "path, size, mtime_ns, language, lines, max_items, markers"
+
+    def __init__(self, db_path: Path, preload: bool = True):
+        self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+        self._rows: dict[str, tuple] = {}
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), timeout=5)
+            self._prepare()
+            if preload:
+                self._rows = {row[0]: row[1:] for row in self._conn.execute(f"SELECT {self._COLUMNS} FROM files")}
+        except (sqlite3.Error, OSError):
+            self.close()
+
+    @classmethod
+    def for_root(cls, root: Path, preload: bool = True) -> ScanCache:
+        digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+        return cls(cache_dir() / f"{digest}.sqlite", preload)
+
+    def _select(self, query: str, keys: list[str]) -> list[tuple]:
+        rows = []
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            rows.extend(self._conn.execute(query.format(",".join("?" * len(batch))), batch))
+        return rows
+
+    def load(self, dirs: list[str]) -> None:
+        """Fetch the rows for the files directly inside ``dirs``."""
+        if self._conn is None:
+            return
+        try:
+            for row in self._select(f"SELECT {self._COLUMNS} FROM files WHERE dir IN ({{}})", dirs):
+                self._rows[row[0]] = row[1:]
+        except sqlite3.Error:
+            self.close()
+
+    def _prepare(self) -> None:
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row is None or row[0] != SCHEMA:
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute("DROP TABLE IF EXISTS subtrees")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (SCHEMA,))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+            " language TEXT, lines INTEGER,"
+            " max_items INTEGER,"  # NULL when markers were not scanned
+            " markers TEXT,"  # JSON, NULL when the file has none
+            " dir TEXT"
+            ")"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS files_dir ON files (dir)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS subtrees ("
+            " path TEXT PRIMARY KEY, digest TEXT,"
+            " max_items INTEGER,"  # NULL when markers were not scanned
+            " totals TEXT"  # JSON
+            ")"
+        )
+        conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def lookup(self, entry: FileEntry, markers: bool, max_items: int) -> FileContent | None:
+        row = self._rows.get(entry.path)
+        if row is None:
+            return None
+        size, mtime_ns, language, lines, cached_max_items, payload = row
+        if size != entry.size or mtime_ns != entry.mtime_ns:
+            return None
+        if markers and (cached_max_items is None or cached_max_items < max_items):
+            return None
+
+        content = FileContent(path=entry.path, language=language, lines=lines)
+        if payload:
+            data = json.loads(payload)
+            content.marker_counts = data["counts"]
+            content.markers = [
+                TodoItem(marker=marker, text=text, file=entry.path, line=line)
+                for marker, line, text in data["items"][:max_items]
+            ]
+        return content
+
+    def update(
+        self,
+        entries: Sequence[FileEntry],
+        fresh: dict[str, FileContent],
+        markers: bool,
+        max_items: int,
+    ) -> None:
+        """Store ``fresh`` results and forget files that are no longer in ``entries``."""
+        if self._conn is None:
+            return
+
+        racy_after = time.time_ns() - RACY_WINDOW_NS
+        rows = []
+        for entry in entries:
+            content = fresh.get(entry.path)
+            if content is None or entry.mtime_ns >= racy_after:
+                continue
+            payload = None
+            if content.marker_counts:
+                payload = json.dumps({
+                    "counts": content.marker_counts,
+                    "items": [[item.marker, item.line, item.text] for item in content.markers],
+                })
+            rows.append((
+                entry.path, entry.size, entry.mtime_ns, content.language, content.lines,
+                max_items if markers else None, payload, entry.path[:max(entry.path.rfind(os.sep), 0)],
+            ))
+
+        seen = {entry.path for entry in entries}
+        stale = [(path,) for path in self._rows if path not in seen]
+
+        try:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        except sqlite3.Error:
+            self.close()
+
+    def subtree_digests(self) -> dict[str, tuple[str, int | None]]:
+        """Every stored subtree: its digest and the ``max_items`` its markers were kept for."""
+        if self._conn is None:
+            return {}
+        try:
+            return {path: (digest, max_items) for path, digest, max_items in self._conn.execute(
+                "SELECT path, digest, max_items FROM subtrees"
+            )}
+        except sqlite3.Error:
+            self.close()
+            return {}
+
+    def subtree_totals(self, paths: list[str]) -> dict[str, ContentTotals]:
+        if self._conn is None:
+            return {}
+        found = {}
+        try:
+            for path, payload in self._select("SELECT path, totals FROM subtrees WHERE path IN ({})", paths):
+                data = json.loads(payload)
+                found[path] = ContentTotals(
+                    lang_files=data["files"],
+                    lang_lines=data["lines"],
+                    marker_counts=data["counts"],
+                    markers=[
+                        TodoItem(marker=marker, text=text, file=file, line=line)
+                        for marker, file, line, text in data["items"]
+                    ],
+                )
+        except (sqlite3.Error, ValueError):
+            self.close()
+            return {}
+        return found
+
+    def store_subtrees(self, rows: list[tuple[str, str, int | None, ContentTotals]], vanished: list[str]) -> None:
+        """Save ``(path, digest, max_items, totals)`` rows and forget directories that are gone."""
+        if self._conn is None:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO subtrees VALUES (?, ?, ?, ?)", [
+                    (path, digest, max_items, json.dumps({
+                        "files": totals.lang_files,
+                        "lines": totals.lang_lines,
+                        "counts": totals.marker_counts,
+                        "items": [[item.marker, item.file, item.line, item.text] for item in totals.markers],
+                    }))
+                    for path, digest, max_items, totals in rows
+                ])
+                self._conn.executemany("DELETE FROM subtrees WHERE path = ?", [(path,) for path in vanished])
+                self._conn.executemany("DELETE FROM files WHERE dir = ?", [(path,) for path in vanished])
+        except sqlite3.Error:
+            self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class ManifestCache:
+    """Parsed dependency manifests and lockfiles keyed by a hash of their content.
+
+    Unlike :class:`ScanCache` there is one store for every repository, since
+    identical files (a vendored package, a template) parse the same way
+    anywhere. Entries unused for :attr:`MAX_AGE_NS` are dropped on write.
+    """
+
+    MAX_AGE_NS = 30 * 24 * 3600 * 1_000_000_000
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), timeout=5)
+            self._prepare()
+        except (sqlite3.Error, OSError):
+            self.close()
+
+    @classmethod
+    def default(cls) -> ManifestCache:
+        return cls(cache_dir() / "manifests.sqlite")
+
+    def _prepare(self) -> None:
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row is None or row[0] != SCHEMA:
+            conn.execute("DROP TABLE IF EXISTS manifests")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (SCHEMA,))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifests ("
+            " digest TEXT PRIMARY KEY,"
+            " names TEXT,"  # JSON [deps, dev], or [packages, duplicates, max_depth] for a lockfile
+            " used_ns INTEGER"
+            ")"
+        )
+        conn.commit()
+
+    def lookup(self, digests: list[str]) -> dict[str, tuple]:
+        if self._conn is None:
+            return {}
+        found = {}
+        try:
+            wanted = list(set(digests))
+            for i in range(0, len(wanted), 500):
+                batch = wanted[i:i + 500]
+                query = f"SELECT digest, names FROM manifests WHERE digest IN ({','.join('?' * len(batch))})"
+                for digest, names in self._conn.execute(query, batch):
+                    found[digest] = tuple(json.loads(names))
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE manifests SET used_ns = ? WHERE digest = ?",
+                    [(time.time_ns(), digest) for digest in found],
+                )
+        except (sqlite3.Error, ValueError):
+            self.close()
+        return found
+
+    def store(self, parsed: dict[str, tuple]) -> None:
+        if self._conn is None or not parsed:
+            return
+        now = time.time_ns()
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO manifests VALUES (?, ?, ?)",
+                    [(digest, json.dumps(names), now) for digest, names in parsed.items()],
+                )
+                self._conn.execute("DELETE FROM manifests WHERE used_ns < ?", (now - self.MAX_AGE_NS,))
+        except sqlite3.Error:
+            self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -1,136 +1,361 @@
-"""CLI entry point for repolyzer."""
+"""CLI entry point for repolyzer.
+
+Only click is imported up front. Rich, the display code and the analyzers are
+imported by the command that needs them, so ``--version``, ``--help`` and
+``--json`` never load what they don't use.
+"""
 
 from __future__ import annotations
 
 import os
 import sys
 import time
-from pathlib import Path
 
 import click
-from rich.console import Console
 
 from . import __version__
-from .analyzers import (
-    analyze_dependencies,
-    analyze_git,
-    analyze_health,
-    analyze_languages,
-    analyze_structure,
-    analyze_todos,
-)
-from .display import display_all
+from .batch import DEFAULT_TIMEOUT
+
+
+class _DefaultGroup(click.Group):
+    """Command group that runs ``analyze`` unless another subcommand is named.
+
+    Keeps ``repolyzer PATH`` working as it always has, alongside ``repolyzer
+    batch`` and the rest. ``--help`` and ``--version`` on their own are the
+    group's, so the help lists every command.
+    """
+
+    default_command = "analyze"
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        own = (*ctx.help_option_names, "--version")
+        if not args or (args[0] not in self.commands and args[0] not in own):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultGroup)
+@click.version_option(version=__version__)
+def main():
+    """Instant beautiful insights about any codebase.
+
+    With no command, `repolyzer [PATH]` runs `repolyzer analyze [PATH]`; see
+    `repolyzer analyze --help` for its options.
+    """
 
 
-@click.command()
+@main.command()
 @click.argument("path", default=".", type=click.Path(exists=True, file_okay=False))
 @click.option("--no-git", is_flag=True, help="Skip git analysis")
 @click.option("--no-health", is_flag=True, help="Skip health checks")
 @click.option("--no-todos", is_flag=True, help="Skip TODO/FIXME scanning")
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+@click.option(
+    "--indent",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Indent --json output by this many spaces  [default: compact]",
+)
+@click.option(
+    "--jobs", "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes for file content analysis  [default: CPU count]",
+)
+@click.option(
+    "--git-index",
+    is_flag=True,
+    help="Take the file list from the git index instead of walking the tree (tracked files only)",
+)
+@click.option("--no-cache", is_flag=True, help="Ignore and don't update the on-disk scan cache")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report time, CPU, file I/O, subprocesses and peak memory per analyzer "
+    "(analyzers then run one at a time)",
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    help="Analyze in this process even if a daemon is running (see `repolyzer daemon`)",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep the language, structure and marker reports live as files change (Ctrl-C to stop)",
+)
 @click.version_option(version=__version__)
-def main(path: str, no_git: bool, no_health: bool, no_todos: bool, as_json: bool):
+def analyze(
+    path: str,
+    no_git: bool,
+    no_health: bool,
+    no_todos: bool,
+    as_json: bool,
+    indent: int | None,
+    jobs: int | None,
+    no_cache: bool,
+    git_index: bool,
+    profile: bool,
+    no_daemon: bool,
+    watch: bool,
+):
     """Instant beautiful insights about any codebase.
 
     Analyzes the repository at PATH (defaults to current directory) and displays
     a comprehensive overview of languages, structure, git history, dependencies,
     health, and code markers.
+
+    To analyze many repositories in one run, see `repolyzer batch --help`.
     """
-    # Force UTF-8 on Windows to prevent UnicodeEncodeError with Rich bar characters
-    if sys.platform == "win32":
-        os.environ.setdefault("PYTHONIOENCODING", "utf-8")
-    console = Console(force_terminal=True)
-    root = Path(path).resolve()
-    project_name = root.name
+    from pathlib import Path
 
-    start = time.monotonic()
+    from .pipeline import AnalysisOptions, run_analysis
 
-    with console.status("[bright_cyan]Scanning codebase...[/bright_cyan]", spinner="dots"):
-        languages = analyze_languages(root)
-        structure = analyze_structure(root)
-        git = analyze_git(root) if not no_git else None
-        dependencies = analyze_dependencies(root)
-        health = analyze_health(root) if not no_health else None
-        todos = analyze_todos(root) if not no_todos else None
+    if watch and (as_json or profile):
+        raise click.UsageError("--watch is interactive and can't be combined with --json or --profile")
 
-    elapsed = time.monotonic() - start
+    root = Path(path).resolve()
+    options = AnalysisOptions(
+        git=not no_git,
+        health=not no_health,
+        todos=not no_todos,
+        jobs=jobs,
+        cache=not no_cache,
+        git_index=git_index,
+        profile=profile,
+    )
 
     if as_json:
-        _output_json(console, languages, structure, git, dependencies, health, todos)
+        # Machine output: no spinner, no Rich, just the document on stdout
+        from .export import analysis_to_dict, write_json
+
+        if not (no_daemon or no_cache or profile):
+            from .daemon import query
+
+            reply = query(root, options)
+            if reply is not None and reply["ok"]:
+                write_json(reply["report"], sys.stdout, indent)
+                return
+
+        write_json(analysis_to_dict(run_analysis(root, options)), sys.stdout, indent)
         return
 
+    from rich.console import Console
+
     from .analyzers.git import GitReport
     from .analyzers.health import HealthReport
     from .analyzers.todos import TodoReport
+    from .display import display_all
+
+    # Force UTF-8 on Windows to prevent UnicodeEncodeError with Rich bar characters
+    if sys.platform == "win32":
+        os.environ.setdefault("PYTHONIOENCODING", "utf-8")
+    console = Console(force_terminal=True)
+
+    if watch:
+        from .parallel import default_jobs
+        from .watch import watch as watch_tree
+
+        watch_tree(root, console, markers=not no_todos, jobs=jobs or default_jobs(), cache=not no_cache)
+        return
+
+    start = time.monotonic()
+
+    with console.status("[bright_cyan]Scanning codebase...[/bright_cyan]", spinner="dots"):
+        analysis = run_analysis(root, options)
+
+    elapsed = time.monotonic() - start
 
     display_all(
         console=console,
-        project_name=project_name,
-        languages=languages,
-        structure=structure,
-        git=git or GitReport(),
-        dependencies=dependencies,
-        health=health or HealthReport(),
-        todos=todos or TodoReport(),
+        project_name=root.name,
+        languages=analysis.languages,
+        structure=analysis.structure,
+        git=analysis.git or GitReport(),
+        dependencies=analysis.dependencies,
+        health=analysis.health or HealthReport(),
+        todos=analysis.todos or TodoReport(),
+        profiles=analysis.profiles,
     )
 
     console.print(f"  [dim]Scanned in {elapsed:.2f}s[/dim]\n")
 
 
-def _output_json(console, languages, structure, git, dependencies, health, todos):
-    import json
-
-    data = {
-        "languages": {
-            "total_files": languages.total_files,
-            "total_lines": languages.total_lines,
-            "breakdown": [
-                {"name": lang.name, "files": lang.files, "lines": lang.lines}
-                for lang in languages.languages
-            ],
-        },
-        "structure": {
-            "total_files": structure.total_files,
-            "total_dirs": structure.total_dirs,
-            "total_size_bytes": structure.total_size_bytes,
-            "max_depth": structure.max_depth,
-        },
-    }
-
-    if git:
-        data["git"] = {
-            "is_git_repo": git.is_git_repo,
-            "commits": git.total_commits,
-            "branches": git.branches,
-            "tags": git.tags,
-            "contributors": git.contributors,
-            "current_branch": git.current_branch,
-            "uncommitted_changes": git.uncommitted_changes,
-        }
-
-    if dependencies:
-        data["dependencies"] = {
-            "total": dependencies.total_deps,
-            "dev": dependencies.total_dev_deps,
-            "files": [
-                {"name": f.name, "count": f.count, "dev_count": f.dev_count}
-                for f in dependencies.files
-            ],
-        }
-
-    if health:
-        data["health"] = {
-            "score": health.score,
-            "checks": [
-                {"name": c.name, "passed": c.passed}
-                for c in health.checks
-            ],
-        }
-
-    if todos:
-        data["todos"] = {
-            "total": todos.total,
-            "counts": dict(todos.counts),
-        }
-
-    console.print_json(json.dumps(data))
+@main.command()
+@click.argument("paths", nargs=-1, type=click.Path())
+@click.option(
+    "--from-file",
+    type=click.File("r"),
+    help="Read repository paths from FILE, one per line ('-' for stdin)",
+)
+@click.option(
+    "--workers", "-w",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Repositories analyzed at once  [default: CPU count]",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TIMEOUT,
+    show_default=True,
+    help="Seconds before a repository is abandoned (0 for no limit)",
+)
+@click.option("--no-git", is_flag=True, help="Skip git analysis")
+@click.option("--no-health", is_flag=True, help="Skip health checks")
+@click.option("--no-todos", is_flag=True, help="Skip TODO/FIXME scanning")
+@click.option(
+    "--jobs", "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes for file content analysis within each repository",
+)
+@click.option("--git-index", is_flag=True, help="Take each file list from the git index")
+@click.option("--no-cache", is_flag=True, help="Ignore and don't update the on-disk scan cache")
+def batch(
+    paths: tuple[str, ...],
+    from_file,
+    workers: int | None,
+    timeout: float,
+    no_git: bool,
+    no_health: bool,
+    no_todos: bool,
+    jobs: int,
+    git_index: bool,
+    no_cache: bool,
+):
+    """Analyze many repositories, writing one JSON object per line.
+
+    Each line is {"path", "ok", "seconds"} plus either "report" (the same
+    data as --json) or "error". Lines appear as repositories finish, not in
+    input order. A repository that fails or times out is reported and the
+    batch carries on; the exit status is 1 if any repository failed.
+    """
+    from .batch import read_path_list, run_batch
+    from .export import write_json
+    from .pipeline import AnalysisOptions
+
+    targets = list(paths)
+    if from_file is not None:
+        targets.extend(read_path_list(from_file))
+    if not targets:
+        raise click.UsageError("no repositories given; pass PATHS or --from-file")
+
+    options = AnalysisOptions(
+        git=not no_git,
+        health=not no_health,
+        todos=not no_todos,
+        jobs=jobs,
+        cache=not no_cache,
+        git_index=git_index,
+    )
+
+    failed = False
+    stdout = sys.stdout
+    for result in run_batch(targets, options, workers=workers, timeout=timeout or None):
+        failed = failed or not result.ok
+        write_json(result.to_dict(), stdout)
+        stdout.flush()
+
+    if failed:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("path", default=".", type=click.Path(exists=True, file_okay=False))
+@click.option("--no-git", is_flag=True, help="Skip git analysis")
+@click.option("--no-health", is_flag=True, help="Skip health checks")
+@click.option("--no-todos", is_flag=True, help="Skip TODO/FIXME scanning")
+@click.option("--git-index", is_flag=True, help="Take the file list from the git index")
+@click.option(
+    "--indent",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Indent the output by this many spaces  [default: compact]",
+)
+@click.option("--socket", "socket_file", type=click.Path(dir_okay=False), default=None, help="Daemon socket")
+def query(
+    path: str,
+    no_git: bool,
+    no_health: bool,
+    no_todos: bool,
+    git_index: bool,
+    indent: int | None,
+    socket_file: str | None,
+):
+    """Print the JSON report for PATH from the running daemon.
+
+    Unlike `repolyzer --json`, this never analyzes in-process: it fails
+    (exit status 1) when no daemon is listening.
+    """
+    from pathlib import Path
+
+    from .daemon import query as query_daemon
+    from .daemon import socket_path
+    from .export import write_json
+    from .pipeline import AnalysisOptions
+
+    options = AnalysisOptions(git=not no_git, health=not no_health, todos=not no_todos, git_index=git_index)
+    socket_at = Path(socket_file) if socket_file else socket_path()
+    reply = query_daemon(Path(path).resolve(), options, socket_at)
+    if reply is None:
+        click.echo(f"No daemon is listening on {socket_at}; start one with `repolyzer daemon`.", err=True)
+        sys.exit(1)
+    if not reply["ok"]:
+        click.echo(f"Error: {reply['error']}", err=True)
+        sys.exit(1)
+    write_json(reply["report"], sys.stdout, indent)
+
+
+@main.command()
+@click.option(
+    "--socket", "socket_file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Socket to listen on  [default: $REPOLYZER_SOCKET, else repolyzer.sock in $XDG_RUNTIME_DIR]",
+)
+@click.option(
+    "--max-memory",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Megabytes of reports to keep; least recently used are dropped first",
+)
+@click.option(
+    "--jobs", "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes for file content analysis  [default: CPU count]",
+)
+@click.option("--status", is_flag=True, help="Print the running daemon's cache statistics and exit")
+@click.option("--stop", is_flag=True, help="Stop the running daemon and exit")
+def daemon(socket_file: str | None, max_memory: int, jobs: int | None, status: bool, stop: bool):
+    """Serve reports from memory over a Unix socket.
+
+    Reports are kept until the repository's HEAD moves or a file in it
+    changes. While a daemon is running, `repolyzer --json` and
+    `repolyzer query` are answered by it.
+    """
+    from pathlib import Path
+
+    from .daemon import request, serve, socket_path
+    from .export import write_json
+
+    socket_at = Path(socket_file) if socket_file else socket_path()
+    if status or stop:
+        reply = request({"op": "shutdown" if stop else "status"}, socket_at)
+        if reply is None:
+            click.echo(f"No daemon is listening on {socket_at}.", err=True)
+            sys.exit(1)
+        if status:
+            write_json(reply, sys.stdout, 2)
+        return
+
+    click.echo(f"repolyzer daemon listening on {socket_at} (Ctrl-C to stop)", err=True)
+    try:
+        serve(socket_at, max_bytes=max_memory * 1024 * 1024, jobs=jobs)
+    except OSError as exc:
+        raise click.ClickException(str(exc))
+    except KeyboardInterrupt:
+        pass
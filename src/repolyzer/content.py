@@ -0,0 +1,259 @@
+"""Single read of every code file, shared by the language and marker analyzers."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from . import profiling
+from ._compat import SLOTS
+from .analyzers.languages import BLOCK_SIZE, EXTENSION_MAP, _LineCounter
+from .analyzers.todos import MARKERS, TodoItem, _scan_markers
+from .parallel import map_chunks
+from .scanner import FileEntry, FileTable, TreeScan
+
+if TYPE_CHECKING:
+    from .cache import ScanCache
+
+
+@dataclass(**SLOTS)
+class FileContent:
+    path: str
+    language: str
+    lines: int = 0
+    marker_counts: dict[str, int] = field(default_factory=dict)
+    markers: list[TodoItem] = field(default_factory=list)  # first ``max_items`` only
+
+
+@dataclass
+class ContentTotals:
+    """What the language and marker reports need from a set of files, summed."""
+
+    lang_files: dict[str, int] = field(default_factory=dict)
+    lang_lines: dict[str, int] = field(default_factory=dict)
+    marker_counts: dict[str, int] = field(default_factory=dict)
+    markers: list[TodoItem] = field(default_factory=list)  # the first ``max_items``, in scan order
+
+    @classmethod
+    def from_contents(cls, contents: list[FileContent], max_items: int = 20) -> ContentTotals:
+        totals = cls()
+        for content in contents:
+            totals.add_file(content, max_items)
+        return totals
+
+    def add_file(self, content: FileContent, max_items: int) -> None:
+        self.lang_files[content.language] = self.lang_files.get(content.language, 0) + 1
+        self.lang_lines[content.language] = self.lang_lines.get(content.language, 0) + content.lines
+        for marker, count in content.marker_counts.items():
+            self.marker_counts[marker] = self.marker_counts.get(marker, 0) + count
+        self.markers.extend(content.markers[:max_items - len(self.markers)])
+
+    def add(self, other: ContentTotals, max_items: int) -> None:
+        for language, files in other.lang_files.items():
+            self.lang_files[language] = self.lang_files.get(language, 0) + files
+        for language, lines in other.lang_lines.items():
+            self.lang_lines[language] = self.lang_lines.get(language, 0) + lines
+        for marker, count in other.marker_counts.items():
+            self.marker_counts[marker] = self.marker_counts.get(marker, 0) + count
+        self.markers.extend(other.markers[:max_items - len(self.markers)])
+
+
+def _read_file(root: str, entry: FileEntry, markers: bool, max_items: int) -> FileContent:
+    content = FileContent(path=entry.path, language=EXTENSION_MAP[entry.ext])
+    counter = _LineCounter()
+    try:
+        with open(os.path.join(root, entry.path), "rb") as f:
+            # Go by what is read rather than the scanned size, which may be stale
+            data = f.read(BLOCK_SIZE)
+            if len(data) < BLOCK_SIZE:
+                counter.feed(data)
+                if markers:
+                    text = data.decode("utf-8", errors="ignore")
+                    content.marker_counts, content.markers = _scan_markers(text, entry.path, max_items)
+            elif markers:
+                _stream_with_markers(f, data, counter, content, max_items)
+            else:
+                counter.feed(data)
+                while block := f.read(BLOCK_SIZE):
+                    counter.feed(block)
+    except (OSError, PermissionError):
+        pass
+
+    content.lines = counter.total
+    return content
+
+
+class _LongLine:
+    """Markers on a line too long to buffer, fed to it in overlapping pieces.
+
+    Each piece starts with the last ``_OVERLAP`` bytes of the one before, so
+    a marker split between two pieces is still seen, with the character
+    before it to check its word boundary. As in ``_scan_markers`` the line
+    counts once, for the first marker listed in ``MARKERS`` that it holds.
+    """
+
+    __slots__ = ("head", "rank")
+
+    def __init__(self) -> None:
+        self.head: str | None = None  # start of the line, for the item text
+        self.rank = len(MARKERS)  # of the first-listed marker seen so far
+
+    def feed(self, piece: bytes, last: bool) -> bytes:
+        """Scan ``piece``, returning the overlap to start the next one with."""
+        text = piece.decode("utf-8", errors="ignore")
+        if self.head is None:
+            start = 0
+            self.head = text.lstrip()[:81]
+        else:
+            start = 1  # a match at 0 was judged with the previous piece
+        for rank, pattern in enumerate(list(MARKERS.values())[:self.rank]):
+            match = pattern.search(text, start)
+            # Unless the line ends here, a match at the very end may be cut
+            # short; the next piece decides it
+            if match and (last or match.end() < len(text)):
+                self.rank = rank
+                break
+        return piece[-_OVERLAP:]
+
+    def add_to(self, content: FileContent, line: int, max_items: int) -> None:
+        if self.rank == len(MARKERS):
+            return
+        marker = list(MARKERS)[self.rank]
+        content.marker_counts[marker] = content.marker_counts.get(marker, 0) + 1
+        if len(content.markers) < max_items:
+            text = self.head.strip()
+            if len(text) > 80:
+                text = text[:77] + "..."
+            content.markers.append(TodoItem(marker=marker, text=text, file=content.path, line=line))
+
+
+# Longer than any marker plus the character before it
+_OVERLAP = 16
+
+
+def _stream_with_markers(
+    f: BinaryIO, block: bytes, counter: _LineCounter, content: FileContent, max_items: int
+) -> None:
+    """Read the rest of a large file block by block, scanning for markers on whole lines.
+
+    ``block`` is the first block, already read from ``f``. A line that runs
+    past ``8 * BLOCK_SIZE`` is scanned piece by piece by ``_LongLine``.
+    """
+    carry = b""
+    first_line = 1
+    long_line: _LongLine | None = None
+    while True:
+        counter.feed(block)
+        buf = carry + block
+        if block:
+            # Cut after the last line end, but not between "\r" and a "\n"
+            # that may start the next block
+            cut = max(buf.rfind(b"\n"), buf.rfind(b"\r", 0, len(buf) - 1)) + 1
+            if cut == 0:
+                if long_line is None and len(buf) >= 8 * BLOCK_SIZE:
+                    long_line = _LongLine()
+                carry = buf if long_line is None else long_line.feed(buf, last=False)
+                block = f.read(BLOCK_SIZE)
+                continue
+        else:
+            cut = len(buf)
+
+        start = 0
+        if long_line is not None:
+            ends = [i for i in (buf.find(b"\n"), buf.find(b"\r")) if i >= 0]
+            start = min(ends) if ends else len(buf)
+            long_line.feed(buf[:start], last=True)
+            long_line.add_to(content, first_line, max_items)
+            long_line = None
+
+        chunk = buf[start:cut]
+        if chunk:
+            # Starting at the long line's end, if any, numbers the lines after it
+            counts, items = _scan_markers(
+                chunk.decode("utf-8", errors="ignore"),
+                content.path,
+                max_items - len(content.markers),
+                first_line=first_line,
+            )
+            for marker, count in counts.items():
+                content.marker_counts[marker] = content.marker_counts.get(marker, 0) + count
+            content.markers.extend(items)
+            first_line += chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+        carry = buf[cut:]
+
+        if not block:
+            return
+        block = f.read(BLOCK_SIZE)
+
+
+def _content_chunk(root: str, markers: bool, max_items: int, entries: Sequence[FileEntry]) -> list[FileContent]:
+    return [_read_file(root, entry, markers, max_items) for entry in entries]
+
+
+def _totals_chunk(root: str, markers: bool, max_items: int, entries: Sequence[FileEntry]) -> ContentTotals:
+    totals = ContentTotals()
+    for entry in entries:
+        totals.add_file(_read_file(root, entry, markers, max_items), max_items)
+    return totals
+
+
+def _count_reads(considered: int, read: FileTable) -> None:
+    # Files are read whole, possibly in worker processes, so account for them here
+    if profiling.active():
+        profiling.count(files_visited=considered, files_opened=len(read), bytes_read=sum(read.sizes))
+
+
+def scan_contents(
+    root: Path,
+    scan: TreeScan,
+    markers: bool = True,
+    max_items: int = 20,
+    jobs: int = 1,
+    cache: ScanCache | None = None,
+) -> list[FileContent]:
+    """Read every code file in ``scan`` once, counting lines and (optionally) markers.
+
+    With a ``cache``, files whose size and mtime are unchanged are served from
+    it and only the rest are read. Results are returned in scan order,
+    whatever ``jobs`` is.
+    """
+    code_files = scan.files.select(scan.files.with_ext(EXTENSION_MAP))
+    worker = partial(_content_chunk, str(root), markers, max_items)
+    if cache is None or not cache.enabled:
+        _count_reads(len(code_files), code_files)
+        return [content for chunk in map_chunks(worker, code_files, jobs) for content in chunk]
+
+    results = [cache.lookup(entry, markers, max_items) for entry in code_files]
+    misses = code_files.select(index for index, result in enumerate(results) if result is None)
+    _count_reads(len(code_files), misses)
+    fresh = {content.path: content for chunk in map_chunks(worker, misses, jobs) for content in chunk}
+    cache.update(code_files, fresh, markers, max_items)
+
+    return [
+        result if result is not None else fresh[entry.path]
+        for entry, result in zip(code_files, results)
+    ]
+
+
+def total_contents(
+    root: Path,
+    scan: TreeScan,
+    markers: bool = True,
+    max_items: int = 20,
+    jobs: int = 1,
+) -> ContentTotals:
+    """The totals of :func:`scan_contents`, without keeping a result per file.
+
+    Each chunk of files is folded into totals as it is read, and only the
+    chunks' totals are merged, so memory does not grow with the file count.
+    """
+    code_files = scan.files.select(scan.files.with_ext(EXTENSION_MAP))
+    _count_reads(len(code_files), code_files)
+    totals = ContentTotals()
+    for chunk in map_chunks(partial(_totals_chunk, str(root), markers, max_items), code_files, jobs):
+        totals.add(chunk, max_items)
+    return totals
@@ -0,0 +1,422 @@
+"""Keep reports warm in a long-running process and serve them over a socket.
+
+``repolyzer daemon`` listens on a Unix domain socket for newline-delimited
+JSON requests. Finished reports are kept, serialized, in an LRU bounded by
+their total size, and a repository's reports are dropped as soon as its HEAD
+moves or any file under it changes (seen through inotify, or a metadata
+rescan where inotify is unavailable). ``repolyzer query PATH`` asks the
+daemon directly; ``repolyzer --json`` uses it whenever one is listening.
+
+Only the client half is imported by the CLI; the server's dependencies load
+when it starts.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .pipeline import AnalysisOptions
+    from .scanner import TreeScan
+    from .watch import InotifyWatcher
+
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024  # bytes of serialized reports
+CONNECT_TIMEOUT = 0.5  # seconds; a daemon that can't accept by then is treated as absent
+REQUEST_TIMEOUT = 300.0  # seconds to wait for a reply, which may take a whole analysis
+
+# AnalysisOptions fields that change a report; ``jobs`` is the daemon's own choice
+OPTION_FIELDS = ("git", "health", "todos", "git_index")
+
+
+def available() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def socket_path() -> Path:
+    """$REPOLYZER_SOCKET, else repolyzer.sock in $XDG_RUNTIME_DIR or in a per-user temp directory."""
+    override = os.environ.get("REPOLYZER_SOCKET")
+    if override:
+        return Path(override)
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return Path(runtime) / "repolyzer.sock"
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return Path(tempfile.gettempdir()) / f"repolyzer-{uid}" / "repolyzer.sock"
+
+
+def _unsafe_dir(directory: Path) -> str | None:
+    """Why someone other than this user could place a socket in ``directory``, if they could."""
+    if not hasattr(os, "getuid"):
+        return None
+    st = os.stat(directory)
+    if st.st_uid != os.getuid():
+        return f"{directory} is owned by another user"
+    if st.st_mode & 0o022:
+        return f"{directory} is writable by other users"
+    return None
+
+
+def _untrusted(path: Path) -> str | None:
+    """Why the socket at ``path`` may not be this user's daemon, or None.
+
+    The socket and the directory holding it must both be this user's, and no
+    one else may write to the directory; another local user could otherwise
+    put their own daemon at the predictable default path and serve forged
+    reports.
+    """
+    if hasattr(os, "getuid") and os.stat(path).st_uid != os.getuid():
+        return f"{path} is owned by another user"
+    return _unsafe_dir(path.parent)
+
+
+# -- client ----------------------------------------------------------------
+
+def request(
+    message: dict[str, Any], path: Path | None = None, timeout: float = REQUEST_TIMEOUT
+) -> dict[str, Any] | None:
+    """Send one request and return the reply, or None if no daemon is listening.
+
+    A socket that another user could have put there is not connected to; the
+    reply is then an error, as it is when the daemon does not answer within
+    ``timeout`` seconds or answers with something other than JSON.
+    """
+    try:
+        return _exchange(message, path, timeout)
+    except OSError as exc:
+        return {"ok": False, "error": f"daemon connection failed: {exc}"}
+    except (ValueError, TypeError):
+        return {"ok": False, "error": "daemon sent a reply that is not a JSON object"}
+
+
+def _exchange(message: dict[str, Any], path: Path | None, timeout: float) -> dict[str, Any] | None:
+    """``request``, but raising OSError, ValueError or TypeError where the exchange fails."""
+    if not available():
+        return None
+    path = path or socket_path()
+    try:
+        problem = _untrusted(path)
+    except OSError:
+        return None  # no socket there
+    if problem is not None:
+        return {"ok": False, "error": f"not using the daemon socket: {problem}"}
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    finally:
+        sock.close()
+    if not line:
+        raise ConnectionResetError("daemon closed the connection")
+    reply = json.loads(line)
+    if not isinstance(reply, dict):
+        raise TypeError("reply is not a JSON object")
+    return reply
+
+
+def query(root: Path, options: AnalysisOptions, path: Path | None = None) -> dict[str, Any] | None:
+    """Ask a running daemon for the report on ``root``; None if there is none.
+
+    A reply has ``ok`` plus either ``report`` (the ``--json`` document) and
+    ``cached``, or ``error``. A daemon that times out, drops the connection
+    or sends back something unreadable counts as none, so callers can fall
+    back to analyzing in-process.
+    """
+    message = {"op": "analyze", "path": str(root), "options": {name: getattr(options, name) for name in OPTION_FIELDS}}
+    try:
+        return _exchange(message, path, REQUEST_TIMEOUT)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+# -- server ----------------------------------------------------------------
+
+class ReportCache:
+    """LRU of serialized reports, bounded by their total length."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MEMORY):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> str | None:
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+        return text
+
+    def put(self, key: tuple, text: str) -> None:
+        self._discard(key)
+        if len(text) > self.max_bytes:
+            return
+        self._entries[key] = text
+        self.size += len(text)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def drop(self, root: str) -> None:
+        """Forget every report for ``root`` (the first element of each key)."""
+        for key in [key for key in self._entries if key[0] == root]:
+            self._discard(key)
+
+    def roots(self) -> set[str]:
+        return {key[0] for key in self._entries}
+
+    def _discard(self, key: tuple) -> None:
+        text = self._entries.pop(key, None)
+        if text is not None:
+            self.size -= len(text)
+
+
+def _head_state(root: Path) -> tuple:
+    """What HEAD and the branch/tag lists look like on disk, for change detection."""
+    from .analyzers.git import _git_dirs
+
+    try:
+        git_dir, common_dir = _git_dirs(root)
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return ()
+
+    state: list[object] = [head]
+    if head.startswith("ref: "):
+        try:
+            state.append((common_dir / head[len("ref: "):]).read_text(encoding="utf-8").strip())
+        except (OSError, UnicodeDecodeError):
+            state.append(None)  # packed; covered by packed-refs below
+    for name in ("packed-refs", "refs/heads", "refs/tags"):
+        try:
+            state.append((common_dir / name).stat().st_mtime_ns)
+        except OSError:
+            state.append(None)
+    return tuple(state)
+
+
+def _tree_signature(scan: TreeScan) -> int:
+    return hash((scan.files.fingerprint(), tuple(scan.dirs)))
+
+
+class _Repo:
+    """Tells whether reports computed for one repository are still current.
+
+    Created from the scan the first analysis is then run on, before it runs,
+    so changes made while it runs also count as changes. Without inotify the
+    tree is rescanned and compared, at most once every ``POLL_INTERVAL``
+    seconds; reports are served unchecked in between.
+    """
+
+    def __init__(self, root: Path, scan: TreeScan):
+        from .ignore import IgnoreCache
+        from .watch import InotifyWatcher
+
+        self.root = root
+        self.ignore = IgnoreCache(root)
+        self.head = _head_state(root)
+        self.watcher: InotifyWatcher | None = InotifyWatcher.create(root, scan.dirs)
+        self.signature = None if self.watcher is not None else _tree_signature(scan)
+        self.checked = time.monotonic()
+
+    def changed(self) -> bool:
+        from .scanner import scan_tree
+        from .watch import POLL_INTERVAL
+
+        if _head_state(self.root) != self.head:
+            return True
+        if self.watcher is None:
+            now = time.monotonic()
+            if now - self.checked < POLL_INTERVAL:
+                return False
+            self.checked = now
+            return _tree_signature(scan_tree(self.root)) != self.signature
+        events = self.watcher.wait(0)
+        return events is None or any(not self._ignored(path) for path in events)
+
+    def _ignored(self, path: str) -> bool:
+        return self.ignore.ignored(path, os.path.isdir(os.path.join(self.root, path)))
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.close()
+
+
+class Daemon:
+    """Request handling, independent of the socket; safe to call from many threads."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MEMORY, jobs: int | None = None):
+        self.cache = ReportCache(max_bytes)
+        self.jobs = jobs
+        self.hits = 0
+        self.misses = 0
+        self._repos: dict[str, _Repo] = {}
+        self._repo_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()  # guards the cache, the dicts above and the counters
+
+    def handle(self, message: Any) -> str:
+        """Answer one decoded request with one JSON line (without the newline)."""
+        op = message.get("op") if isinstance(message, dict) else None
+        if op == "analyze":
+            return self._analyze(message)
+        if op == "status":
+            return json.dumps(self.status())
+        return json.dumps({"ok": False, "error": f"unknown request {op!r}"})
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "reports": len(self.cache),
+                "bytes": self.cache.size,
+                "max_bytes": self.cache.max_bytes,
+                "repositories": sorted(self._repos),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _analyze(self, message: dict[str, Any]) -> str:
+        from .export import analysis_to_dict
+        from .pipeline import AnalysisOptions, run_analysis
+        from .scanner import scan_tree
+
+        root = Path(str(message.get("path", ""))).resolve()
+        if not root.is_dir():
+            return json.dumps({"ok": False, "error": f"not a directory: {root}"})
+        requested = message.get("options") or {}
+        options = AnalysisOptions(
+            jobs=self.jobs, **{name: bool(requested[name]) for name in OPTION_FIELDS if name in requested}
+        )
+        key = (str(root), *(getattr(options, name) for name in OPTION_FIELDS))
+
+        with self._lock:
+            repo_lock = self._repo_locks.setdefault(key[0], threading.Lock())
+        with repo_lock:
+            repo = self._repos.get(key[0])
+            if repo is not None and repo.changed():
+                self._forget(key[0])
+                repo = None
+            if repo is not None:
+                with self._lock:
+                    text = self.cache.get(key)
+                    if text is not None:
+                        self.hits += 1
+                        return f'{{"ok":true,"cached":true,"report":{text}}}'
+            scan = None
+            if repo is None:
+                # One walk both sets up the watches and feeds the analysis
+                scan = scan_tree(root)
+                repo = _Repo(root, scan)
+                with self._lock:
+                    self._repos[key[0]] = repo
+
+            try:
+                report = analysis_to_dict(run_analysis(root, options, None if options.git_index else scan))
+            except Exception as exc:  # noqa: BLE001 - reported to the client
+                return json.dumps({"ok": False, "error": f"{type(exc).__name__}: {exc}"})
+            text = json.dumps(report, separators=(",", ":"))
+            with self._lock:
+                self.cache.put(key, text)
+                self.misses += 1
+
+        self._close_unused()
+        return f'{{"ok":true,"cached":false,"report":{text}}}'
+
+    def _forget(self, root: str) -> None:
+        with self._lock:
+            self.cache.drop(root)
+            repo = self._repos.pop(root, None)
+        if repo is not None:
+            repo.close()
+
+    def _close_unused(self) -> None:
+        """Stop watching repositories whose reports have all been evicted."""
+        with self._lock:
+            unused = [root for root in self._repos if root not in self.cache.roots()]
+        for root in unused:
+            lock = self._repo_locks[root]
+            if lock.acquire(blocking=False):  # busy repositories are about to have a report again
+                try:
+                    if root not in self.cache.roots():
+                        self._forget(root)
+                finally:
+                    lock.release()
+
+    def close(self) -> None:
+        with self._lock:
+            repos = list(self._repos.values())
+            self._repos.clear()
+        for repo in repos:
+            repo.close()
+
+
+def serve(path: Path | None = None, max_bytes: int = DEFAULT_MAX_MEMORY, jobs: int | None = None) -> None:
+    """Run the daemon in the foreground until a ``shutdown`` request or Ctrl-C."""
+    import socketserver
+
+    if not available():
+        raise OSError(errno.EAFNOSUPPORT, "Unix domain sockets are not supported on this platform")
+    path = path or socket_path()
+    reply = request({"op": "status"}, path)
+    if reply is not None and reply["ok"]:
+        raise OSError(errno.EADDRINUSE, f"a daemon is already listening on {path}")
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    problem = _unsafe_dir(path.parent)
+    if problem is not None:
+        raise OSError(errno.EPERM, f"refusing to listen on {path}: {problem}")
+    try:
+        path.unlink()  # left behind by a daemon that didn't exit cleanly
+    except FileNotFoundError:
+        pass
+
+    daemon = Daemon(max_bytes, jobs)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for line in self.rfile:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    reply = json.dumps({"ok": False, "error": "request is not valid JSON"})
+                else:
+                    if isinstance(message, dict) and message.get("op") == "shutdown":
+                        self.wfile.write(b'{"ok":true}\n')
+                        threading.Thread(target=server.shutdown, daemon=True).start()
+                        return
+                    reply = daemon.handle(message)
+                self.wfile.write(reply.encode() + b"\n")
+                self.wfile.flush()
+
+    # Created owner-only from the start; a chmod after bind would leave a window
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        daemon.close()
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -9,11 +9,12 @@ from rich.text import Text
 from rich import box
 
 from .analyzers.languages import LanguageReport
-from .analyzers.structure import StructureReport
+from .analyzers.structure import StructureReport, human_size
 from .analyzers.git import GitReport
 from .analyzers.dependencies import DependencyReport
 from .analyzers.health import HealthReport
 from .analyzers.todos import TodoReport, MARKER_STYLES
+from .profiling import TaskProfile
 
 LOGO = r"""
                       .__
@@ -46,8 +47,14 @@ def display_header(console: Console, project_name: str):
 
 
 def display_languages(console: Console, report: LanguageReport):
+    panel = languages_panel(report)
+    if panel is not None:
+        console.print(panel)
+
+
+def languages_panel(report: LanguageReport) -> Panel | None:
     if not report.languages:
-        return
+        return None
 
     table = Table(
         title=None,
@@ -72,16 +79,20 @@ def display_languages(console: Console, report: LanguageReport):
 
         table.add_row(name, bar, stats)
 
-    console.print(Panel(
+    return Panel(
         table,
         title="[bold bright_cyan]Languages[/bold bright_cyan]",
         border_style="cyan",
         box=box.ROUNDED,
         padding=(1, 1),
-    ))
+    )
 
 
 def display_structure(console: Console, report: StructureReport):
+    console.print(structure_panel(report))
+
+
+def structure_panel(report: StructureReport) -> Panel:
     grid = Table(box=None, show_header=False, padding=(0, 2), expand=True)
     grid.add_column(ratio=1)
     grid.add_column(ratio=1)
@@ -95,13 +106,23 @@ def display_structure(console: Console, report: StructureReport):
         Text.assemble(("  Max depth  ", "dim"), (str(report.max_depth), "bold bright_white")),
     )
 
-    console.print(Panel(
+    # Heaviest top-level directories
+    if report.heaviest_dirs:
+        grid.add_row(Text(""), Text(""))
+        for stats in report.heaviest_dirs[:3]:
+            name = "(root)" if stats.path == "." else f"{stats.path}/"
+            grid.add_row(
+                Text.assemble(("  ", ""), (name, "bright_white")),
+                Text(f"{human_size(stats.size_bytes)}  {stats.files:,} files", style="dim"),
+            )
+
+    return Panel(
         grid,
         title="[bold bright_cyan]Structure[/bold bright_cyan]",
         border_style="cyan",
         box=box.ROUNDED,
         padding=(0, 1),
-    ))
+    )
 
 
 def display_git(console: Console, report: GitReport):
@@ -165,6 +186,9 @@ def display_git(console: Console, report: GitReport):
     ))
 
 
+TOP_PACKAGES = 10
+
+
 def display_dependencies(console: Console, report: DependencyReport):
     if not report.files:
         return
@@ -173,13 +197,24 @@ def display_dependencies(console: Console, report: DependencyReport):
     table.add_column(ratio=2)
     table.add_column(ratio=1, justify="right")
 
-    for dep_file in report.files:
-        name = Text(f"  {dep_file.name}", style="bold bright_white")
+    # A monorepo lists its biggest packages rather than every manifest
+    if len(report.packages) > 1:
+        rows = [
+            (f"{package.path}/ ({', '.join(package.manifests)})", package.count, package.dev_count)
+            for package in sorted(report.packages, key=lambda p: p.count + p.dev_count, reverse=True)
+        ]
+    else:
+        rows = [(dep_file.name, dep_file.count, dep_file.dev_count) for dep_file in report.files]
+
+    for label, count, dev_count in rows[:TOP_PACKAGES]:
+        name = Text(f"  {label}", style="bold bright_white")
         counts = Text()
-        counts.append(f"{dep_file.count} deps", style="bright_green")
-        if dep_file.dev_count:
-            counts.append(f"  {dep_file.dev_count} dev", style="dim")
+        counts.append(f"{count} deps", style="bright_green")
+        if dev_count:
+            counts.append(f"  {dev_count} dev", style="dim")
         table.add_row(name, counts)
+    if len(rows) > TOP_PACKAGES:
+        table.add_row(Text(f"  ... and {len(rows) - TOP_PACKAGES} more packages", style="dim"), Text())
 
     total = Text()
     total.append("\n  Total: ", style="dim")
@@ -187,6 +222,23 @@ def display_dependencies(console: Console, report: DependencyReport):
     total.append(" dependencies", style="dim")
     if report.total_dev_deps:
         total.append(f", {report.total_dev_deps} dev", style="dim")
+    if len(report.packages) > 1 or report.unique_deps != report.total_deps:
+        total.append("\n  Unique: ", style="dim")
+        total.append(f"{report.unique_deps}", style="bold bright_white")
+        if report.unique_dev_deps:
+            total.append(f", {report.unique_dev_deps} dev-only", style="dim")
+        total.append(f" across {len(report.packages)} packages", style="dim")
+    if report.lockfiles:
+        duplicates = sum(lock.duplicates for lock in report.lockfiles)
+        depths = [lock.max_depth for lock in report.lockfiles if lock.max_depth is not None]
+        total.append("\n  Resolved: ", style="dim")
+        total.append(f"{report.transitive_deps}", style="bold bright_white")
+        total.append(" packages", style="dim")
+        if duplicates:
+            total.append(f", {duplicates} with several versions", style="bright_yellow")
+        if depths:
+            total.append(f", depth {max(depths)}", style="dim")
+        total.append(f" from {len(report.lockfiles)} lockfile{'s' if len(report.lockfiles) > 1 else ''}", style="dim")
 
     from rich.console import Group
     console.print(Panel(
@@ -230,8 +282,14 @@ def display_health(console: Console, report: HealthReport):
 
 
 def display_todos(console: Console, report: TodoReport):
+    panel = todos_panel(report)
+    if panel is not None:
+        console.print(panel)
+
+
+def todos_panel(report: TodoReport) -> Panel | None:
     if not report.total:
-        return
+        return None
 
     parts = []
     for marker, count in sorted(report.counts.items(), key=lambda x: x[1], reverse=True):
@@ -241,15 +299,80 @@ def display_todos(console: Console, report: TodoReport):
     summary = "    ".join(parts)
     total_text = f"\n  [dim]Total:[/dim] [bold bright_white]{report.total}[/bold bright_white] [dim]markers found[/dim]"
 
-    console.print(Panel(
+    return Panel(
         Text.from_markup(summary + total_text),
         title="[bold bright_cyan]Code Markers[/bold bright_cyan]",
         border_style="cyan",
         box=box.ROUNDED,
         padding=(1, 1),
+    )
+
+
+def display_profile(console: Console, profiles: list[TaskProfile]):
+    if not profiles:
+        return
+
+    table = Table(box=None, padding=(0, 1), collapse_padding=True, pad_edge=False, header_style="dim")
+    table.add_column("  Task", style="bold bright_white", no_wrap=True)
+    for heading in ("Wall", "CPU", "Files seen/read", "Read", "Subprocs", "Peak mem"):
+        table.add_column(heading, justify="right", no_wrap=True)
+
+    for profile in sorted(profiles, key=lambda p: p.wall_seconds, reverse=True):
+        spawned = sum(record.seconds for record in profile.subprocesses)
+        table.add_row(
+            f"  {profile.name}",
+            f"{profile.wall_seconds:.3f}s",
+            f"{profile.cpu_seconds:.3f}s",
+            f"{profile.files_visited:,}/{profile.files_opened:,}",
+            human_size(profile.bytes_read),
+            f"{len(profile.subprocesses)} in {spawned:.2f}s" if profile.subprocesses else "-",
+            human_size(profile.peak_memory_bytes),
+        )
+
+    slowest = sorted(
+        ((record, profile.name) for profile in profiles for record in profile.subprocesses),
+        key=lambda item: item[0].seconds,
+        reverse=True,
+    )[:5]
+    details = Text()
+    if slowest:
+        details.append("\n  Slowest subprocesses\n", style="dim")
+        for record, task in slowest:
+            details.append(f"  {record.seconds:8.3f}s  ", style="bright_yellow")
+            command = record.command if len(record.command) <= 50 else record.command[:47] + "..."
+            details.append(command, style="bright_white")
+            details.append(f"  ({task})\n", style="dim")
+
+    from rich.console import Group
+    console.print(Panel(
+        Group(table, details),
+        title="[bold bright_cyan]Profile[/bold bright_cyan]",
+        subtitle="[dim]tasks run one at a time while profiling[/dim]",
+        border_style="cyan",
+        box=box.ROUNDED,
+        padding=(0, 1),
     ))
 
 
+def watch_view(
+    project_name: str,
+    languages: LanguageReport,
+    structure: StructureReport,
+    todos: TodoReport | None,
+    status: str,
+):
+    """Everything ``--watch`` shows, rebuilt on each update."""
+    from rich.console import Group
+    parts = [Text.from_markup(f"\n  [bold bright_cyan]repolyzer[/bold bright_cyan] [dim]watching[/dim] "
+                              f"[bright_white]{project_name}[/bright_white]\n")]
+    parts.append(languages_panel(languages))
+    parts.append(structure_panel(structure))
+    if todos is not None:
+        parts.append(todos_panel(todos))
+    parts.append(Text(f"  {status} (Ctrl-C to stop)", style="dim"))
+    return Group(*(part for part in parts if part is not None))
+
+
 def display_all(
     console: Console,
     project_name: str,
@@ -259,6 +382,7 @@ def display_all(
     dependencies: DependencyReport,
     health: HealthReport,
     todos: TodoReport,
+    profiles: list[TaskProfile] | None = None,
 ):
     console.print()
     display_header(console, project_name)
@@ -268,4 +392,5 @@ def display_all(
     display_dependencies(console, dependencies)
     display_health(console, health)
     display_todos(console, todos)
+    display_profile(console, profiles or [])
     console.print()
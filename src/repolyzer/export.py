@@ -0,0 +1,147 @@
+"""Plain-data form of an :class:`~repolyzer.pipeline.Analysis`, for JSON output."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any, TextIO
+
+if TYPE_CHECKING:
+    from .pipeline import Analysis
+
+
+def analysis_to_dict(analysis: Analysis) -> dict[str, Any]:
+    """Everything the JSON output reports, as JSON-serializable builtins."""
+    languages = analysis.languages
+    structure = analysis.structure
+    git = analysis.git
+    dependencies = analysis.dependencies
+    health = analysis.health
+    todos = analysis.todos
+
+    data: dict[str, Any] = {
+        "languages": {
+            "total_files": languages.total_files,
+            "total_lines": languages.total_lines,
+            "breakdown": [
+                {"name": lang.name, "files": lang.files, "lines": lang.lines}
+                for lang in languages.languages
+            ],
+        },
+        "structure": {
+            "total_files": structure.total_files,
+            "total_dirs": structure.total_dirs,
+            "total_size_bytes": structure.total_size_bytes,
+            "max_depth": structure.max_depth,
+            "deepest_path": structure.deepest_path,
+            "largest_files": [
+                {"path": path, "size_bytes": size}
+                for path, size in structure.largest_files
+            ],
+            "heaviest_dirs": [
+                {"path": d.path, "files": d.files, "size_bytes": d.size_bytes}
+                for d in structure.heaviest_dirs
+            ],
+        },
+    }
+
+    if git:
+        data["git"] = {
+            "is_git_repo": git.is_git_repo,
+            "commits": git.total_commits,
+            "branches": git.branches,
+            "tags": git.tags,
+            "contributors": git.contributors,
+            "current_branch": git.current_branch,
+            "uncommitted_changes": git.uncommitted_changes,
+            "remote_url": git.remote_url,
+            "first_commit_date": git.first_commit_date,
+            "last_commit": {
+                "message": git.last_commit_message,
+                "author": git.last_commit_author,
+                "date": git.last_commit_date,
+            },
+            "top_contributors": [
+                {"name": name, "commits": commits}
+                for name, commits in git.top_contributors
+            ],
+        }
+
+    if dependencies:
+        data["dependencies"] = {
+            "total": dependencies.total_deps,
+            "dev": dependencies.total_dev_deps,
+            "unique": dependencies.unique_deps,
+            "unique_dev": dependencies.unique_dev_deps,
+            "files": [
+                {"name": f.name, "path": f.path, "count": f.count, "dev_count": f.dev_count}
+                for f in dependencies.files
+            ],
+            "packages": [
+                {"path": p.path, "manifests": p.manifests, "count": p.count, "dev_count": p.dev_count}
+                for p in dependencies.packages
+            ],
+            "transitive": dependencies.transitive_deps,
+            "lockfiles": [
+                {
+                    "name": lock.name,
+                    "path": lock.path,
+                    "packages": lock.packages,
+                    "duplicates": lock.duplicates,
+                    "max_depth": lock.max_depth,
+                }
+                for lock in dependencies.lockfiles
+            ],
+        }
+
+    if health:
+        data["health"] = {
+            "score": health.score,
+            "checks": [
+                {"name": c.name, "passed": c.passed, "detail": c.detail}
+                for c in health.checks
+            ],
+        }
+
+    if todos:
+        data["todos"] = {
+            "total": todos.total,
+            "counts": dict(todos.counts),
+            "items": [
+                {"marker": item.marker, "file": item.file, "line": item.line, "text": item.text}
+                for item in todos.items
+            ],
+        }
+
+    if analysis.profiles:
+        data["profile"] = [
+            {
+                "task": p.name,
+                "wall_seconds": round(p.wall_seconds, 6),
+                "cpu_seconds": round(p.cpu_seconds, 6),
+                "files_visited": p.files_visited,
+                "files_opened": p.files_opened,
+                "bytes_read": p.bytes_read,
+                "peak_memory_bytes": p.peak_memory_bytes,
+                "subprocesses": [
+                    {"command": r.command, "seconds": round(r.seconds, 6)}
+                    for r in p.subprocesses
+                ],
+            }
+            for p in analysis.profiles
+        ]
+
+    return data
+
+
+def write_json(data: Any, stream: TextIO, indent: int | None = None) -> None:
+    """Encode ``data`` onto ``stream`` piece by piece, followed by a newline.
+
+    Output is compact unless ``indent`` is given. The encoded document is never
+    held in memory as one string.
+    """
+    separators = (",", ":") if indent is None else (",", ": ")
+    encoder = json.JSONEncoder(indent=indent, separators=separators)
+    write = stream.write
+    for chunk in encoder.iterencode(data):
+        write(chunk)
+    write("\n")
@@ -0,0 +1,227 @@
+"""Incremental commit history statistics for the git analyzer.
+
+Counting commits and tallying authors over all of HEAD is the slow part of git
+analysis on large repositories. This module keeps a few snapshots (commit
+count, per-author tallies, root commit time) keyed by the HEAD commit they
+were computed for. A later run with a different HEAD only walks the commits
+that differ between the two heads, via ``git log --left-right old...new``,
+instead of the whole history.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import profiling
+from .cache import cache_dir
+
+SCHEMA = 1
+MAX_SNAPSHOTS = 4
+
+# Long enough for a first full walk of a multi-million commit repository
+HISTORY_TIMEOUT = 300
+
+_FIELDS = "%P%x00%at%x00%aN"  # parents, author time, mailmapped author
+
+
+@dataclass
+class History:
+    head: str
+    commits: int = 0
+    authors: dict[str, int] = field(default_factory=dict)  # non-merge commits only
+    root_time: int | None = None  # author time of the oldest root commit
+    mailmap: str = ""
+
+
+def _fold_git_lines(root: Path, args: list[str], fn: Callable[[str], None]) -> bool:
+    """Stream a git command's stdout line by line into ``fn``.
+
+    Returns False if git failed or ran past :data:`HISTORY_TIMEOUT`, in which
+    case whatever ``fn`` accumulated is incomplete.
+    """
+    try:
+        proc = subprocess.Popen(
+            ["git", "-C", str(root), *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except OSError:
+        return False
+
+    timer = threading.Timer(HISTORY_TIMEOUT, proc.kill)
+    timer.start()
+    try:
+        with profiling.track_subprocess(" ".join(["git", *args])):
+            try:
+                for line in proc.stdout:
+                    fn(line.rstrip("\n"))
+            finally:
+                proc.stdout.close()
+                proc.wait()
+    finally:
+        timer.cancel()
+    return proc.returncode == 0
+
+
+def _mailmap_signature(root: Path) -> str:
+    try:
+        st = os.stat(root / ".mailmap")
+    except OSError:
+        return ""
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _full_history(root: Path, head: str, mailmap: str) -> History | None:
+    history = History(head=head, mailmap=mailmap)
+
+    def add(line: str) -> None:
+        parents, when, author = line.split("\x00", 2)
+        history.commits += 1
+        if " " not in parents:
+            history.authors[author] = history.authors.get(author, 0) + 1
+        if not parents:
+            ts = int(when)
+            if history.root_time is None or ts < history.root_time:
+                history.root_time = ts
+
+    return history if _fold_git_lines(root, ["log", f"--format={_FIELDS}", head], add) else None
+
+
+def _counted_history(root: Path, head: str, mailmap: str) -> History | None:
+    """The stats for ``head`` from git's own counters.
+
+    ``rev-list --count`` and ``shortlog`` tally inside git, which is much
+    cheaper than streaming every commit through :func:`_full_history`; that
+    walk only pays off when its snapshot is stored.
+    """
+    history = History(head=head, mailmap=mailmap)
+
+    def count(line: str) -> None:
+        history.commits = int(line)
+
+    def tally(line: str) -> None:
+        commits, _, author = line.partition("\t")
+        history.authors[author] = int(commits)
+
+    def oldest(line: str) -> None:
+        if history.root_time is None or int(line) < history.root_time:
+            history.root_time = int(line)
+
+    ok = (
+        _fold_git_lines(root, ["rev-list", "--count", head], count)
+        and _fold_git_lines(root, ["shortlog", "-sn", "--no-merges", head], tally)
+        and _fold_git_lines(root, ["log", "--max-parents=0", "--format=%at", head], oldest)
+    )
+    return history if ok else None
+
+
+def _advance(root: Path, base: History, head: str) -> History | None:
+    """Derive the stats for ``head`` from a snapshot of another commit.
+
+    Commits only reachable from ``head`` are added and commits only reachable
+    from the old head are subtracted, which also copes with rebases and
+    resets. Returns None when that is not possible (the old head is gone, or
+    a root commit dropped out of history) so the caller can do a full walk.
+    """
+    history = History(
+        head=head,
+        commits=base.commits,
+        authors=dict(base.authors),
+        root_time=base.root_time,
+        mailmap=base.mailmap,
+    )
+    lost_root = False
+
+    def apply(line: str) -> None:
+        nonlocal lost_root
+        side, rest = line[0], line[1:]
+        parents, when, author = rest.split("\x00", 2)
+        sign = 1 if side == ">" else -1
+        history.commits += sign
+        if " " not in parents:
+            count = history.authors.get(author, 0) + sign
+            if count > 0:
+                history.authors[author] = count
+            else:
+                history.authors.pop(author, None)
+        if not parents:
+            if sign < 0:
+                lost_root = True
+            elif history.root_time is None or int(when) < history.root_time:
+                history.root_time = int(when)
+
+    args = ["log", "--left-right", f"--format=%m{_FIELDS}", f"{base.head}...{head}"]
+    if not _fold_git_lines(root, args, apply) or lost_root:
+        return None
+    return history
+
+
+class HistoryStore:
+    """JSON file holding the most recent :class:`History` snapshots of one repository."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def for_repo(cls, common_dir: Path) -> HistoryStore:
+        digest = hashlib.sha1(str(common_dir).encode("utf-8")).hexdigest()[:16]
+        return cls(cache_dir() / f"{digest}-history.json")
+
+    def load(self) -> list[History]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("schema") != SCHEMA:
+                return []
+            return [History(**snapshot) for snapshot in data["snapshots"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def save(self, snapshots: list[History]) -> None:
+        data = {"schema": SCHEMA, "snapshots": [vars(s) for s in snapshots[:MAX_SNAPSHOTS]]}
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+def commit_history(root: Path, head: str, store: HistoryStore | None = None) -> History | None:
+    """Commit count, author tallies and root commit time for ``head``.
+
+    With a ``store``, an exact snapshot for ``head`` is returned without running
+    git at all, and otherwise the newest usable snapshot is advanced
+    incrementally. Without one, git's own counters are used. Returns None if
+    git could not produce the history.
+    """
+    mailmap = _mailmap_signature(root)
+    snapshots = [s for s in store.load() if s.mailmap == mailmap] if store else []
+
+    for snapshot in snapshots:
+        if snapshot.head == head:
+            history = snapshot
+            break
+    else:
+        history = _advance(root, snapshots[0], head) if snapshots else None
+        if history is None:
+            history = (_full_history if store else _counted_history)(root, head, mailmap)
+        if history is None:
+            return None
+
+    if store:
+        store.save([history] + [s for s in snapshots if s.head != head])
+    return history
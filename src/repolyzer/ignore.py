@@ -0,0 +1,288 @@
+"""Compiled ``.gitignore`` rules, applied while the tree is walked.
+
+Rules come from, lowest priority first: the built-in patterns in
+:data:`DEFAULT_IGNORES`, ``.git/info/exclude``, every ``.gitignore`` from the
+root down to the directory being matched, and ``.repolyzerignore`` at the
+root. As in git, the last matching pattern in a file wins, a ``.gitignore``
+deeper in the tree beats its parents, and ``!pattern`` re-includes a path.
+
+Each file's patterns are compiled into a few combined regular expressions:
+one per run of consecutive patterns with the same polarity, split into
+patterns matched against the entry's name and patterns anchored to the
+file's directory. Literal names (``node_modules``) become set lookups.
+Ignored directories are pruned before the walk descends into them, so
+nothing beneath them is listed at all.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+
+# Skipped even without a .gitignore; a ``!pattern`` in one re-includes them
+DEFAULT_IGNORES = (
+    ".git/", "node_modules/", "__pycache__/", ".venv/", "venv/", "env/",
+    ".env/", "dist/", "build/", ".next/", ".nuxt/", "target/", ".tox/",
+    "vendor/", ".idea/", ".vscode/", ".mypy_cache/", ".pytest_cache/",
+    ".ruff_cache/", "coverage/", ".coverage/", "htmlcov/", ".eggs/",
+    "*.egg-info/", ".gradle/", ".cargo/", "bin/", "obj/",
+)
+
+IGNORE_FILE = ".repolyzerignore"
+IGNORE_FILES = (".gitignore", IGNORE_FILE)  # changing one can change what is ignored anywhere
+
+_GLOB_CHARS = re.compile(r"[*?\[\\]")
+
+
+def _translate(pattern: str) -> str:
+    """Regex source for one gitignore glob (already stripped of ``!``, ``/`` ends)."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/") and (i + 2 == n or pattern[i + 2] == "/"):
+                if i + 2 == n:
+                    out.append(".*")  # "dir/**": everything inside
+                    i += 2
+                else:
+                    out.append("(?:.*/)?")  # "**/": any number of directories
+                    i += 3
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = i + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class _Patterns:
+    """Patterns of one polarity, matched as a set."""
+
+    def __init__(self) -> None:
+        self.literals: set[str] = set()
+        self.globs: list[str] = []
+        self.anchored: list[str] = []
+
+    def compile(self) -> tuple[frozenset[str], re.Pattern[str] | None, re.Pattern[str] | None]:
+        def combined(sources: list[str]) -> re.Pattern[str] | None:
+            return re.compile("(?:" + "|".join(sources) + r")\Z", re.DOTALL) if sources else None
+
+        return frozenset(self.literals), combined(self.globs), combined(self.anchored)
+
+
+class _Run:
+    """Consecutive patterns with the same polarity; any of them matching decides."""
+
+    __slots__ = ("dir", "file", "negated")
+
+    def __init__(self, negated: bool):
+        self.negated = negated
+        self.file = _Patterns()
+        self.dir = _Patterns()  # directory-only patterns too
+
+    def freeze(self) -> None:
+        self.file = self.file.compile()
+        self.dir = self.dir.compile()
+
+
+def _matches(compiled, name: str, path: str) -> bool:
+    literals, globs, anchored = compiled
+    return (
+        name in literals
+        or (globs is not None and globs.match(name) is not None)
+        or (anchored is not None and anchored.match(path) is not None)
+    )
+
+
+class RuleSet:
+    """The compiled patterns of one ignore file."""
+
+    def __init__(self, lines: list[str]):
+        self.runs: list[_Run] = []
+        self.anchored = False
+        for line in lines:
+            self._add(line)
+        for run in self.runs:
+            run.freeze()
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> RuleSet | None:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                rules = cls(f.read().splitlines())
+        except OSError:
+            return None
+        return rules if rules.runs else None
+
+    def _add(self, line: str) -> None:
+        if not line or line.startswith("#"):
+            return
+        # Trailing spaces are dropped unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+
+        negated = line.startswith("!")
+        if negated or line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+
+        if not self.runs or self.runs[-1].negated != negated:
+            self.runs.append(_Run(negated))
+        run = self.runs[-1]
+        targets = (run.dir,) if dir_only else (run.file, run.dir)
+
+        if "/" in line:
+            # Anchored to the ignore file's directory, whatever its position
+            source = _translate(line.lstrip("/"))
+            self.anchored = True
+            for patterns in targets:
+                patterns.anchored.append(source)
+        elif not _GLOB_CHARS.search(line):
+            for patterns in targets:
+                patterns.literals.add(line)
+        else:
+            source = _translate(line)
+            for patterns in targets:
+                patterns.globs.append(source)
+
+    def match(self, name: str, path: str, is_dir: bool) -> bool | None:
+        """True if ignored, False if re-included, None if no pattern matches.
+
+        ``path`` is relative to the ignore file's directory, using ``/``.
+        """
+        for run in reversed(self.runs):
+            if _matches(run.dir if is_dir else run.file, name, path):
+                return not run.negated
+        return None
+
+
+DEFAULT_RULES = RuleSet(list(DEFAULT_IGNORES))
+
+
+class Ignore:
+    """The rule sets in effect for one directory of the walk.
+
+    Each rule set is held with the prefix to add and the number of leading
+    characters to drop to turn a walk-relative path into one relative to the
+    directory of its ignore file; walks may start below the repository root.
+    Rule sets are kept highest priority first.
+    """
+
+    __slots__ = ("_nested_at", "rules")
+
+    def __init__(self, rules: tuple[tuple[RuleSet, str, int], ...], nested_at: int = 0):
+        self.rules = rules
+        self._nested_at = nested_at  # where a newly found .gitignore goes
+
+    @classmethod
+    def for_root(cls, root: Path, subdir: str = "") -> Ignore:
+        """Rules for walking ``root / subdir``, where ``root`` is the repository root.
+
+        Every ``.gitignore`` from the root down to ``subdir`` is read; paths
+        are then matched relative to ``subdir``.
+        """
+        parts = subdir.split(os.sep) if subdir else []
+        rules = []
+        extra = RuleSet.from_file(root / IGNORE_FILE)
+        if extra is not None:
+            rules.append((extra, "/".join(parts + [""]), 0))
+        for depth in range(len(parts), -1, -1):
+            found = RuleSet.from_file(os.path.join(root, *parts[:depth], ".gitignore"))
+            if found is not None:
+                rules.append((found, "/".join(parts[depth:] + [""]), 0))
+        exclude = _info_exclude(root)
+        if exclude is not None:
+            rules.append((exclude, "/".join(parts + [""]), 0))
+        rules.append((DEFAULT_RULES, "", 0))
+        return cls(tuple(rules), nested_at=int(extra is not None))
+
+    def child(self, dirpath: str, reldir: str) -> Ignore:
+        """Rules for the walk-relative directory ``reldir``, adding its ``.gitignore``."""
+        found = RuleSet.from_file(os.path.join(dirpath, ".gitignore"))
+        if found is None:
+            return self
+        rules = list(self.rules)
+        rules.insert(self._nested_at, (found, "", len(reldir) + 1))
+        return Ignore(tuple(rules), self._nested_at)
+
+    def ignored(self, relpath: str, name: str, is_dir: bool) -> bool:
+        """Whether the walk-relative ``relpath`` (ending in ``name``) is ignored."""
+        path = relpath if os.sep == "/" else relpath.replace(os.sep, "/")
+        for ruleset, prefix, strip in self.rules:
+            rel = prefix + path[strip:] if ruleset.anchored else path
+            decision = ruleset.match(name, rel, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+
+def _info_exclude(root: Path) -> RuleSet | None:
+    from .analyzers.git import _git_dirs
+
+    try:
+        _, common_dir = _git_dirs(root)
+    except (OSError, UnicodeDecodeError):
+        return None
+    return RuleSet.from_file(common_dir / "info" / "exclude")
+
+
+class IgnoreCache:
+    """Answers for single paths under ``root``, as the walk would decide them.
+
+    Used where changes arrive one path at a time rather than from a walk;
+    the rules for each directory are built once and remembered.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._dirs: dict[str, Ignore | None] = {"": Ignore.for_root(root)}  # None: directory is ignored
+
+    def _rules(self, reldir: str) -> Ignore | None:
+        if reldir in self._dirs:
+            return self._dirs[reldir]
+        parent, _, name = reldir.rpartition(os.sep)
+        rules = self._rules(parent)
+        if rules is not None:
+            if rules.ignored(reldir, name, True):
+                rules = None
+            else:
+                rules = rules.child(os.path.join(self.root, reldir), reldir)
+        self._dirs[reldir] = rules
+        return rules
+
+    def ignored(self, relpath: str, is_dir: bool) -> bool:
+        """Whether ``relpath`` or any directory above it is ignored."""
+        parent, _, name = relpath.rpartition(os.sep)
+        rules = self._rules(parent)
+        return rules is None or rules.ignored(relpath, name, is_dir)
+
+    def clear(self) -> None:
+        """Forget everything, after an ignore file changed."""
+        self._dirs = {"": Ignore.for_root(self.root)}
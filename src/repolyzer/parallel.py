@@ -0,0 +1,66 @@
+"""Fan per-file work out over a pool of worker processes."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    import multiprocessing.context
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Below this many items per chunk, process startup costs more than it saves
+MIN_CHUNK_SIZE = 128
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def _mp_context() -> multiprocessing.context.BaseContext | None:
+    # Analyzers run on threads alongside this pool, and forking a threaded
+    # process can deadlock the child; start workers from a fork server instead.
+    import multiprocessing
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+def _chunked(items: Sequence[T], jobs: int, min_chunk: int = MIN_CHUNK_SIZE) -> list[Sequence[T]]:
+    # Aim for a few chunks per worker so one slow chunk doesn't stall the pool
+    size = max(min_chunk, -(-len(items) // (jobs * 4)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def map_chunks(
+    fn: Callable[[Sequence[T]], R],
+    items: Sequence[T],
+    jobs: int = 1,
+    min_chunk: int = MIN_CHUNK_SIZE,
+) -> list[R]:
+    """Apply ``fn`` to consecutive chunks of ``items``.
+
+    Results come back in chunk order regardless of which worker finishes first,
+    so merging them gives the same answer as a serial run. ``fn`` must be
+    picklable (a module-level function or a ``functools.partial`` of one).
+    Falls back to running in-process when there is only one chunk or when the
+    platform cannot start worker processes. Lower ``min_chunk`` when each
+    item is itself expensive, such as a whole large file.
+    """
+    chunks = _chunked(items, jobs, min_chunk)
+    if jobs <= 1 or len(chunks) <= 1:
+        return [fn(chunk) for chunk in chunks]
+
+    # Only pay for the multiprocessing machinery when there is a pool to run
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(chunks)), mp_context=_mp_context()) as pool:
+            return list(pool.map(fn, chunks))
+    except (OSError, NotImplementedError, BrokenProcessPool):
+        return [fn(chunk) for chunk in chunks]
@@ -0,0 +1,169 @@
+"""Run every analyzer for one repository, concurrently where they are independent."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import analyzers
+from .cache import ScanCache
+from .parallel import default_jobs
+from .profiling import TaskProfile, profiled
+from .scanner import TreeScan, scan_git_index, scan_tree
+from .subtrees import summarize_contents
+
+if TYPE_CHECKING:
+    from .analyzers.dependencies import DependencyReport
+    from .analyzers.git import GitReport
+    from .analyzers.health import HealthReport
+    from .analyzers.languages import LanguageReport
+    from .analyzers.structure import StructureReport
+    from .analyzers.todos import TodoReport
+
+
+class Scheduler:
+    """Run named tasks on threads as soon as the tasks they depend on finish.
+
+    Every task gets its own thread, so a task blocked on its dependencies never
+    starves another of a worker. Analyzers spend their time in subprocesses,
+    file I/O and worker processes, all of which release the GIL.
+
+    With ``profile=True`` tasks instead run one at a time, in registration
+    order, and :attr:`profiles` holds a :class:`TaskProfile` per task. Nothing
+    then competes with the task being measured, at the price of a slower run
+    overall.
+    """
+
+    def __init__(self, profile: bool = False) -> None:
+        self._tasks: dict[str, tuple[Callable[..., Any], tuple[str, ...]]] = {}
+        self.timings: dict[str, float] = {}
+        self.profile = profile
+        self.profiles: dict[str, TaskProfile] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], *deps: str) -> None:
+        """Register ``fn``; it is called with the results of ``deps`` in order."""
+        missing = [dep for dep in deps if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"task {name!r} depends on unknown task(s) {missing}")
+        self._tasks[name] = (fn, deps)
+
+    def run(self) -> dict[str, Any]:
+        """Run all tasks and return their results by name.
+
+        Results are keyed by task, not by completion order, so callers see the
+        same output however the threads interleave. The first failing task's
+        exception is re-raised.
+        """
+        if not self._tasks:
+            return {}
+        if self.profile:
+            return self._run_profiled()
+
+        futures: dict[str, Future] = {}
+        with ThreadPoolExecutor(max_workers=len(self._tasks)) as pool:
+            for name, (fn, deps) in self._tasks.items():
+                futures[name] = pool.submit(self._call, name, fn, [futures[dep] for dep in deps])
+
+        return {name: future.result() for name, future in futures.items()}
+
+    def _run_profiled(self) -> dict[str, Any]:
+        # add() only accepts known dependencies, so registration order is a
+        # valid execution order
+        results: dict[str, Any] = {}
+        for name, (fn, deps) in self._tasks.items():
+            with profiled(name) as profile:
+                results[name] = fn(*(results[dep] for dep in deps))
+            self.profiles[name] = profile
+            self.timings[name] = profile.wall_seconds
+        return results
+
+    def _call(self, name: str, fn: Callable[..., Any], deps: list[Future]) -> Any:
+        args = [dep.result() for dep in deps]
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+
+@dataclass
+class AnalysisOptions:
+    git: bool = True
+    health: bool = True
+    todos: bool = True
+    jobs: int | None = None  # None means one per CPU
+    cache: bool = True
+    git_index: bool = False
+    profile: bool = False  # run tasks one at a time and collect TaskProfiles
+
+
+@dataclass
+class Analysis:
+    languages: LanguageReport
+    structure: StructureReport
+    dependencies: DependencyReport
+    git: GitReport | None = None
+    health: HealthReport | None = None
+    todos: TodoReport | None = None
+    timings: dict[str, float] = field(default_factory=dict)  # seconds per task
+    profiles: list[TaskProfile] = field(default_factory=list)  # with AnalysisOptions.profile
+
+
+def run_analysis(root: Path, options: AnalysisOptions | None = None, scan: TreeScan | None = None) -> Analysis:
+    """Analyze ``root``, running independent analyzers concurrently.
+
+    The filesystem scan feeds the content pass, which in turn feeds the
+    language and marker reports, and the dependency and health analyzers
+    take their manifests and test files from the scan; git runs alongside
+    from the start. Analyzers that are switched off are never imported.
+    A ``scan`` already taken of ``root`` is used instead of taking another.
+    """
+    if options is None:
+        options = AnalysisOptions()
+    jobs = options.jobs or default_jobs()
+
+    def take_scan():
+        if scan is not None:
+            return scan
+        return (scan_git_index(root) if options.git_index else None) or scan_tree(root)
+
+    def contents(tree):
+        cache = ScanCache.for_root(root, preload=False) if options.cache else None
+        try:
+            return summarize_contents(root, tree, markers=options.todos, jobs=jobs, cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    scheduler = Scheduler(profile=options.profile)
+    scheduler.add("scan", take_scan)
+    scheduler.add("contents", contents, "scan")
+    scheduler.add("languages", lambda totals: analyzers.analyze_languages(root, totals=totals), "contents")
+    scheduler.add("structure", lambda tree: analyzers.analyze_structure(root, scan=tree), "scan")
+    if options.git:
+        scheduler.add("git", lambda: analyzers.analyze_git(root, use_cache=options.cache))
+    scheduler.add(
+        "dependencies",
+        lambda tree: analyzers.analyze_dependencies(root, scan=tree, jobs=jobs, use_cache=options.cache),
+        "scan",
+    )
+    if options.health:
+        scheduler.add("health", lambda tree: analyzers.analyze_health(root, scan=tree), "scan")
+    if options.todos:
+        scheduler.add("todos", lambda totals: analyzers.analyze_todos(root, totals=totals), "contents")
+
+    results = scheduler.run()
+    return Analysis(
+        languages=results["languages"],
+        structure=results["structure"],
+        dependencies=results["dependencies"],
+        git=results.get("git"),
+        health=results.get("health"),
+        todos=results.get("todos"),
+        timings=scheduler.timings,
+        profiles=list(scheduler.profiles.values()),
+    )
@@ -0,0 +1,151 @@
+"""Per-task resource counters behind ``--profile``.
+
+The scheduler runs each task inside :func:`profiled`, which makes a
+:class:`TaskProfile` current for that task's context. Code that touches the
+filesystem or spawns processes reports to it through :func:`count` and
+:func:`track_subprocess`; outside a profiled task both are no-ops, so the
+instrumentation costs one context lookup per call site.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+
+@dataclass
+class SubprocessRecord:
+    command: str
+    seconds: float
+
+
+@dataclass
+class TaskProfile:
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0  # this process only, not worker processes or subprocesses
+    files_visited: int = 0
+    files_opened: int = 0
+    bytes_read: int = 0
+    peak_memory_bytes: int = 0  # resident memory growth over the task's starting point
+    subprocesses: list[SubprocessRecord] = field(default_factory=list)
+
+
+_current: ContextVar[TaskProfile | None] = ContextVar("repolyzer_profile", default=None)
+
+
+def active() -> bool:
+    return _current.get() is not None
+
+
+def count(files_visited: int = 0, files_opened: int = 0, bytes_read: int = 0) -> None:
+    """Add to the current task's file counters."""
+    profile = _current.get()
+    if profile is not None:
+        profile.files_visited += files_visited
+        profile.files_opened += files_opened
+        profile.bytes_read += bytes_read
+
+
+@contextmanager
+def track_subprocess(command: str) -> Iterator[None]:
+    """Record how long the subprocess run inside the block took."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.subprocesses.append(SubprocessRecord(command, time.perf_counter() - start))
+
+
+def in_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap ``fn`` to run in a copy of the caller's context.
+
+    Pool threads start with an empty context; submitting the wrapped function
+    keeps whatever it records attributed to the task that submitted it.
+    """
+    return partial(copy_context().run, fn)
+
+
+def _rss_bytes() -> int | None:
+    """Current resident set size, where the platform exposes it cheaply."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _max_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _PeakMemory:
+    """Track how far resident memory rises above its level at construction.
+
+    Where the current RSS can be read it is sampled on a background thread;
+    otherwise the growth of the process's high-water mark is used, which only
+    shows memory beyond any earlier peak.
+    """
+
+    INTERVAL = 0.005
+
+    def __init__(self) -> None:
+        self._start = _rss_bytes()
+        self._peak = self._start or 0
+        self._stop = threading.Event()
+        self._thread = None
+        if self._start is None:
+            self._start_max = _max_rss_bytes()
+        else:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.INTERVAL):
+            self._peak = max(self._peak, _rss_bytes() or 0)
+
+    def stop(self) -> int:
+        if self._thread is None:
+            return max(0, _max_rss_bytes() - self._start_max)
+        self._stop.set()
+        self._thread.join()
+        self._peak = max(self._peak, _rss_bytes() or 0)
+        return max(0, self._peak - self._start)
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[TaskProfile]:
+    """Run the block as task ``name``, filling in a :class:`TaskProfile`.
+
+    CPU time and peak memory are process-wide measurements attributed to the
+    task, so they are only meaningful when tasks run one at a time.
+    """
+    profile = TaskProfile(name)
+    token = _current.set(profile)
+    memory = _PeakMemory()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield profile
+    finally:
+        profile.cpu_seconds = time.process_time() - cpu
+        profile.wall_seconds = time.perf_counter() - wall
+        profile.peak_memory_bytes = memory.stop()
+        _current.reset(token)
@@ -0,0 +1,415 @@
+"""Shared filesystem walk feeding every analyzer."""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+from array import array
+from bisect import bisect_left
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import overload
+
+from . import profiling
+from ._compat import SLOTS
+from .ignore import DEFAULT_IGNORES, DEFAULT_RULES, Ignore
+
+# Names of the directories skipped by default; the walk itself matches the
+# compiled rules (see repolyzer.ignore), which also cover "*.egg-info"
+SKIP_DIRS = {pattern.rstrip("/") for pattern in DEFAULT_IGNORES if "*" not in pattern}
+
+
+@dataclass(**SLOTS)
+class FileEntry:
+    path: str  # relative to the scanned root
+    size: int
+    ext: str
+    depth: int
+    mtime_ns: int = 0
+
+
+def _encode(name: str) -> bytes:
+    return name.encode("utf-8", "surrogatepass")
+
+
+class FileTable(Sequence[FileEntry]):
+    """The files of a scan, stored column by column.
+
+    Each file costs a directory id, its basename in one shared buffer, an
+    extension id, and its size and mtime in typed arrays: a few dozen bytes,
+    where a :class:`FileEntry` with its path string costs a few hundred.
+    Indexing and iterating still give ``FileEntry`` objects, made on demand;
+    analyzers that only need a column read it directly.
+
+    Basenames are kept NUL-terminated in one buffer, so :meth:`find` can
+    match them all with a single regular expression search.
+    """
+
+    __slots__ = (
+        "_dir_ids", "_dir_index", "_dirs", "_ends", "_ext_ids",
+        "_ext_index", "_exts", "_mtimes", "_names", "_sizes",
+    )
+
+    def __init__(self, entries: Iterable[FileEntry] = ()):
+        self._dirs: list[str] = []
+        self._dir_index: dict[str, int] = {}
+        self._exts: list[str] = []
+        self._ext_index: dict[str, int] = {}
+        self._dir_ids = array("I")
+        self._ext_ids = array("I")
+        self._names = bytearray()
+        self._ends = array("q")  # offset of the NUL after each name
+        self._sizes = array("q")
+        self._mtimes = array("q")
+        for entry in entries:
+            parent, _, name = entry.path.rpartition(os.sep)
+            self.append(self.add_dir(parent), name, entry.size, entry.mtime_ns)
+
+    def add_dir(self, path: str) -> int:
+        """The id of directory ``path`` (relative, ``""`` for the root), added if new."""
+        dir_id = self._dir_index.get(path)
+        if dir_id is None:
+            dir_id = self._dir_index[path] = len(self._dirs)
+            self._dirs.append(path)
+        return dir_id
+
+    def append(self, dir_id: int, name: str, size: int, mtime_ns: int) -> None:
+        ext = os.path.splitext(name)[1]
+        ext_id = self._ext_index.get(ext)
+        if ext_id is None:
+            ext_id = self._ext_index[ext] = len(self._exts)
+            self._exts.append(ext)
+        self._dir_ids.append(dir_id)
+        self._ext_ids.append(ext_id)
+        self._names += _encode(name)
+        self._ends.append(len(self._names))
+        self._names.append(0)
+        self._sizes.append(size)
+        self._mtimes.append(mtime_ns)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @overload
+    def __getitem__(self, index: int) -> FileEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> FileTable: ...
+
+    def __getitem__(self, index: int | slice) -> FileEntry | FileTable:
+        if isinstance(index, slice):
+            return self.select(range(len(self))[index])
+        index = range(len(self))[index]
+        parent = self._dirs[self._dir_ids[index]]
+        return FileEntry(
+            path=self.path(index),
+            size=self._sizes[index],
+            ext=self._exts[self._ext_ids[index]],
+            depth=parent.count(os.sep) + 1 if parent else 0,
+            mtime_ns=self._mtimes[index],
+        )
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        prefixes = [parent + os.sep if parent else "" for parent in self._dirs]
+        depths = [parent.count(os.sep) + 1 if parent else 0 for parent in self._dirs]
+        names, exts, dir_ids, ext_ids = self._names, self._exts, self._dir_ids, self._ext_ids
+        start = 0
+        for index, end in enumerate(self._ends):
+            dir_id = dir_ids[index]
+            yield FileEntry(
+                prefixes[dir_id] + names[start:end].decode("utf-8", "surrogatepass"),
+                self._sizes[index],
+                exts[ext_ids[index]],
+                depths[dir_id],
+                self._mtimes[index],
+            )
+            start = end + 1
+
+    def __repr__(self) -> str:
+        return f"<FileTable of {len(self)} files in {len(self._dirs)} directories>"
+
+    @property
+    def dirs(self) -> list[str]:
+        """Directory paths, indexed by the ids in :attr:`dir_ids`."""
+        return self._dirs
+
+    @property
+    def dir_ids(self) -> array:
+        return self._dir_ids
+
+    @property
+    def sizes(self) -> array:
+        return self._sizes
+
+    @property
+    def mtimes(self) -> array:
+        return self._mtimes
+
+    def name(self, index: int) -> str:
+        start = self._ends[index - 1] + 1 if index else 0
+        return self._names[start:self._ends[index]].decode("utf-8", "surrogatepass")
+
+    def path(self, index: int) -> str:
+        parent = self._dirs[self._dir_ids[index]]
+        return parent + os.sep + self.name(index) if parent else self.name(index)
+
+    def with_ext(self, exts: Collection[str]) -> list[int]:
+        """Indices of the files whose extension is one of ``exts``."""
+        wanted = {ext_id for ext_id, ext in enumerate(self._exts) if ext in exts}
+        return [index for index, ext_id in enumerate(self._ext_ids) if ext_id in wanted]
+
+    def find(self, names: Iterable[str] = (), globs: Iterable[str] = ()) -> list[int]:
+        """Indices, in order, of the files whose basename is one of ``names``
+        or matches one of ``globs`` (where only ``*`` and ``?`` are special).
+        """
+        alternatives = [re.escape(_encode(name)) for name in names]
+        for glob in globs:
+            parts = re.split(rb"(\*|\?)", _encode(glob))
+            alternatives.append(b"".join(
+                rb"[^\0]*" if part == b"*" else rb"[^\0]" if part == b"?" else re.escape(part)
+                for part in parts
+            ))
+        if not alternatives:
+            return []
+        pattern = re.compile(rb"(?<![^\0])(?:" + b"|".join(alternatives) + rb")(?=\0)")
+        ends = self._ends
+        return [bisect_left(ends, match.start()) for match in pattern.finditer(self._names)]
+
+    def select(self, indices: Iterable[int]) -> FileTable:
+        """A new table holding only the files at ``indices``, in that order."""
+        table = FileTable()
+        dir_ids: dict[int, int] = {}
+        for index in indices:
+            old = self._dir_ids[index]
+            dir_id = dir_ids.get(old)
+            if dir_id is None:
+                dir_id = dir_ids[old] = table.add_dir(self._dirs[old])
+            table.append(dir_id, self.name(index), self._sizes[index], self._mtimes[index])
+        return table
+
+    def fingerprint(self) -> int:
+        """A hash of every file's path, size and mtime."""
+        return hash((
+            tuple(self._dirs),
+            self._dir_ids.tobytes(),
+            bytes(self._names),
+            self._sizes.tobytes(),
+            self._mtimes.tobytes(),
+        ))
+
+
+@dataclass
+class TreeScan:
+    root: Path
+    files: FileTable = field(default_factory=FileTable)
+    dirs: list[str] = field(default_factory=list)  # relative paths, symlinked ones included
+    total_dirs: int = 0
+    max_depth: int = 0
+    deepest_path: str = ""
+
+
+def scan_tree(root: Path, ignore: Ignore | None = None) -> TreeScan:
+    """Walk ``root`` once and record every file the analyzers care about.
+
+    The walk is built on :func:`os.scandir` so file type checks come from the
+    directory listing itself and paths stay plain strings; no ``Path`` objects
+    or ``relpath`` calls are made per file. Directories are visited in the same
+    top-down order as :func:`os.walk`.
+
+    Ignored paths (``.gitignore`` and friends, see :mod:`repolyzer.ignore`)
+    are skipped and ignored directories are never entered. ``ignore`` gives
+    the rules when ``root`` is not itself the repository root.
+    """
+    scan = TreeScan(root=root)
+    files = scan.files
+    stack: list[tuple[str, str, int, Ignore]] = [(str(root), "", 0, ignore or Ignore.for_root(root))]
+
+    while stack:
+        dirpath, reldir, depth, rules = stack.pop()
+        if depth > scan.max_depth:
+            scan.max_depth = depth
+            scan.deepest_path = reldir
+
+        subdirs: list[tuple[str, str, int, Ignore]] = []
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if reldir and any(entry.name == ".gitignore" for entry in entries):
+            rules = rules.child(dirpath, reldir)
+        dir_id = None  # only directories holding files go in the table
+
+        for entry in entries:
+            name = entry.name
+            relpath = reldir + os.sep + name if reldir else name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if rules.ignored(relpath, name, True):
+                    continue
+                scan.total_dirs += 1
+                scan.dirs.append(relpath)
+                # Like os.walk, count symlinked directories but never follow them
+                if not entry.is_symlink():
+                    subdirs.append((entry.path, relpath, depth + 1, rules))
+                continue
+
+            if rules.ignored(relpath, name, False):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if dir_id is None:
+                dir_id = files.add_dir(reldir)
+            files.append(dir_id, name, st.st_size, st.st_mtime_ns)
+
+        stack.extend(reversed(subdirs))
+
+    profiling.count(files_visited=len(files))
+    return scan
+
+
+def _git_output(root: Path, *args: str, input: bytes | None = None) -> bytes | None:
+    try:
+        with profiling.track_subprocess(" ".join(("git",) + args)):
+            result = subprocess.run(
+                ["git", "-C", str(root), *args], input=input, capture_output=True, timeout=30, check=False
+            )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+# Index entry flag for paths outside a sparse checkout, which are not on disk
+_SKIP_WORKTREE = 0x40000000
+
+
+def _parse_index_stat(debug: list[bytes]) -> tuple[int, int, int]:
+    """Pull (size, mtime_ns, flags) out of the ``--debug`` lines of one index entry."""
+    seconds, nanos = debug[1].split(b": ", 1)[1].split(b":")
+    size, flags = debug[4].split(b"\t", 1)
+    return (
+        int(size.split(b": ", 1)[1]),
+        int(seconds) * 1_000_000_000 + int(nanos),
+        int(flags.split(b": ", 1)[1], 16),
+    )
+
+
+def scan_git_index(root: Path) -> TreeScan | None:
+    """Build the scan from the git index instead of walking the tree.
+
+    The file list and each file's size and mtime come from ``git ls-files
+    --debug``, so only tracked files are seen (``.gitignore`` is honoured for
+    free) and untracked build output is never visited. Only the files that
+    ``git diff-files`` reports as changed are stat'ed, along with those
+    whose index size disagrees with the size of their blob: the index keeps
+    sizes truncated to 32 bits, so that is how a file of 4 GiB or more shows
+    (as do files rewritten by filters, such as Git LFS). Paths left out of
+    a sparse checkout are skipped. Returns ``None`` when
+    ``root`` is not inside a git work tree or git is unavailable, so callers
+    can fall back to :func:`scan_tree`.
+    """
+    listing = _git_output(root, "ls-files", "-z", "--stage", "--debug")
+    if listing is None:
+        return None
+    changed = _git_output(root, "diff-files", "-z", "--name-status", "--relative")
+    if changed is None:
+        return None
+
+    fields = changed.split(b"\0")
+    dirty = {os.fsdecode(path): status for status, path in zip(fields[0::2], fields[1::2])}
+
+    scan = TreeScan(root=root)
+    dirs: set[str] = set()
+    skipped: dict[str, bool] = {}  # parent directory -> under a default-ignored directory
+    unchecked: list[int] = []  # files whose size is taken from the index
+    blobs = bytearray()  # their object names, for ``git cat-file``
+    last_path = None
+
+    # With -z each record is "<mode> <sha> <stage>\t<path>\0" followed by five
+    # debug lines, which run straight into the next record's header.
+    records = listing.split(b"\0")
+    header = records[0]
+    for block in records[1:]:
+        debug = block.split(b"\n", 5)
+        meta, _, raw_path = header.partition(b"\t")
+        header = debug[5] if len(debug) > 5 else b""
+
+        path = os.fsdecode(raw_path)
+        if path == last_path or meta.startswith(b"160000"):
+            continue  # later merge stage of the same file, or a submodule
+        last_path = path
+
+        parent, _, name = path.rpartition("/")
+        parts = parent.split("/") if parent else []
+        # Tracked files are never gitignored, but the built-in defaults
+        # (vendored code, committed build output) still apply
+        skip = skipped.get(parent)
+        if skip is None:
+            skip = skipped[parent] = any(DEFAULT_RULES.match(part, part, True) for part in parts)
+        if skip:
+            continue
+
+        size, mtime_ns, flags = _parse_index_stat(debug)
+        if flags & _SKIP_WORKTREE:
+            continue
+        status = dirty.get(path)
+        if status == "D":
+            continue
+        if status or meta.startswith(b"120000"):
+            try:
+                st = os.stat(os.path.join(root, path))
+            except OSError:
+                continue
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        else:
+            unchecked.append(len(scan.files))
+            blobs += meta.split(b" ", 2)[1] + b"\n"
+
+        dir_id = scan.files.add_dir(parent.replace("/", os.sep))
+        while parent and parent not in dirs:
+            dirs.add(parent)
+            depth = parent.count("/") + 1
+            if depth > scan.max_depth:
+                scan.max_depth = depth
+                scan.deepest_path = parent.replace("/", os.sep)
+            parent = parent.rpartition("/")[0]
+
+        scan.files.append(dir_id, name, size, mtime_ns)
+
+    _restat_truncated(root, scan.files, unchecked, bytes(blobs))
+    scan.total_dirs = len(dirs)
+    scan.dirs = [d.replace("/", os.sep) for d in sorted(dirs)]
+    profiling.count(files_visited=len(scan.files))
+    return scan
+
+
+def _restat_truncated(root: Path, files: FileTable, indices: list[int], blobs: bytes) -> None:
+    """Stat the files at ``indices`` whose index size is not their blob's size.
+
+    ``blobs`` holds the files' object names, one per line. A clean file is
+    the size of its blob unless a filter rewrites it, so a mismatch means the
+    index size was truncated or the blob is not the content on disk; if git
+    cannot say, every file is stat'ed.
+    """
+    if not indices:
+        return
+    sizes = _git_output(root, "cat-file", "--batch-check=%(objectsize)", "--buffer", input=blobs)
+    fields = sizes.split() if sizes is not None else []
+    if len(fields) != len(indices):
+        fields = [b"-1"] * len(indices)
+    for index, blob_size in zip(indices, fields):
+        if int(blob_size) != files.sizes[index]:
+            try:
+                st = os.stat(os.path.join(root, files.path(index)))
+            except OSError:
+                continue
+            files.sizes[index] = st.st_size
+            files.mtimes[index] = st.st_mtime_ns
@@ -0,0 +1,152 @@
+"""Content totals per subtree, reused across runs while the subtree is unchanged.
+
+Every directory of the scan gets a Merkle digest: a hash of the names, sizes
+and mtimes of the code files directly inside it, in scan order, and of the
+names and digests of its subdirectories. A change anywhere below a directory
+changes its digest and those of the directories above it, and no others.
+
+The totals of each subtree (files and lines per language, marker counts and
+the first marker items) are stored with its digest. A later run walks down
+from the root only while digests differ: an unchanged subtree contributes
+its stored totals, and neither its files nor their per-file cache rows are
+looked at. Touching a few files costs the directories on their path to the
+root, not the tree.
+
+The walk that produced the scan has still listed and stat'ed every file. A
+file edited in place does not change its directory's mtime, so the listing
+alone cannot tell that a subtree is unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .analyzers.languages import EXTENSION_MAP
+from .content import ContentTotals, scan_contents, total_contents
+from .scanner import TreeScan
+
+if TYPE_CHECKING:
+    from .cache import ScanCache
+
+_EMPTY = hashlib.sha1(b"").hexdigest()  # a subtree without code files: nothing to store
+
+
+class _Tree:
+    """The scan's directories with their code files, children and digests."""
+
+    def __init__(self, scan: TreeScan, racy_after: int):
+        self.table = scan.files
+        self.files: dict[str, list[int]] = defaultdict(list)  # indices into the table
+        self.children: dict[str, list[str]] = defaultdict(list)
+        self.digests: dict[str, str] = {}
+        self.racy: set[str] = set()  # holding a file that may still change unseen
+
+        dirs, dir_ids = self.table.dirs, self.table.dir_ids
+        for index in self.table.with_ext(EXTENSION_MAP):
+            self.files[dirs[dir_ids[index]]].append(index)
+        for path in scan.dirs:
+            self.children[path.rpartition(os.sep)[0]].append(path)
+
+        # Deepest first, so every child is done before its parent
+        for path in sorted(scan.dirs, key=lambda path: path.count(os.sep), reverse=True) + [""]:
+            self._digest(path, racy_after)
+
+    def _digest(self, path: str, racy_after: int) -> None:
+        start = len(path) + 1 if path else 0
+        table, parts = self.table, []
+        for index in self.files.get(path, ()):
+            mtime_ns = table.mtimes[index]
+            parts.append(f"{table.name(index)}\0{table.sizes[index]}\0{mtime_ns}")
+            if mtime_ns >= racy_after:
+                self.racy.add(path)
+        for child in self.children.get(path, ()):
+            if self.digests[child] != _EMPTY:
+                parts.append(f"{child[start:]}/\0{self.digests[child]}")
+            if child in self.racy:
+                self.racy.add(path)
+        self.digests[path] = hashlib.sha1("\n".join(parts).encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def summarize_contents(
+    root: Path,
+    scan: TreeScan,
+    markers: bool = True,
+    max_items: int = 20,
+    jobs: int = 1,
+    cache: ScanCache | None = None,
+) -> ContentTotals:
+    """Totals over every code file in ``scan``, reusing unchanged subtrees from ``cache``.
+
+    Without a usable cache every file is read, as by :func:`total_contents`.
+    ``cache`` is best opened with ``preload=False``, so that per-file rows are
+    only fetched for the directories that changed.
+    """
+    if cache is None or not cache.enabled:
+        return total_contents(root, scan, markers, max_items, jobs)
+
+    from .cache import RACY_WINDOW_NS
+
+    tree = _Tree(scan, time.time_ns() - RACY_WINDOW_NS)
+    stored = cache.subtree_digests()
+
+    def reusable(path: str) -> bool:
+        found = stored.get(path)
+        return found is not None and found[0] == tree.digests[path] and (
+            not markers or (found[1] is not None and found[1] >= max_items)
+        )
+
+    changed, frontier = _changed(tree, reusable)
+    reused = cache.subtree_totals(frontier)
+    if len(reused) < len(frontier):  # unreadable rows: recompute everything from the files
+        changed, _ = _changed(tree, lambda path: False)
+        reused = {}
+
+    cache.load(changed)
+    files = tree.table.select(index for path in changed for index in tree.files.get(path, ()))
+    by_path = {content.path: content for content in scan_contents(
+        root, TreeScan(root=root, files=files), markers, max_items, jobs, cache,
+    )}
+
+    # Children before parents, each directory's own files before its subdirectories
+    totals: dict[str, ContentTotals] = dict(reused)
+    rows = []
+    for path in sorted(changed, key=lambda path: path.count(os.sep) if path else -1, reverse=True):
+        subtotal = ContentTotals()
+        for index in tree.files.get(path, ()):
+            subtotal.add_file(by_path[tree.table.path(index)], max_items)
+        for child in tree.children.get(path, ()):
+            if child in totals:
+                subtotal.add(totals[child], max_items)
+        totals[path] = subtotal
+        if path not in tree.racy:
+            rows.append((path, tree.digests[path], max_items if markers else None, subtotal))
+
+    vanished = [path for path in stored if tree.digests.get(path, _EMPTY) == _EMPTY]
+    cache.store_subtrees(rows, vanished)
+    result = totals.get("", ContentTotals())
+    if not markers:
+        result.marker_counts, result.markers = {}, []
+    return result
+
+
+def _changed(tree: _Tree, reusable: Callable[[str], bool]) -> tuple[list[str], list[str]]:
+    """Directories to recompute, and the unchanged subtrees met on the way down."""
+    changed: list[str] = []
+    frontier: list[str] = []
+    stack = [""]
+    while stack:
+        path = stack.pop()
+        if tree.digests[path] == _EMPTY:
+            continue
+        if reusable(path):
+            frontier.append(path)
+            continue
+        changed.append(path)
+        stack.extend(tree.children.get(path, ()))
+    return changed, frontier
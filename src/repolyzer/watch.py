@@ -0,0 +1,476 @@
+"""Keep the language, structure and marker reports current as files change.
+
+``repolyzer --watch`` scans the tree once and from then on applies changes as
+deltas: only files whose size or mtime changed are re-read, and each report's
+aggregates are adjusted by the difference instead of being recomputed.
+Changes come from inotify on Linux; elsewhere, or when inotify runs out of
+watches, the tree's metadata is rescanned every few seconds and diffed
+against what is already known.
+"""
+
+from __future__ import annotations
+
+import errno
+import heapq
+import os
+import select
+import stat
+import struct
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+from .analyzers.languages import EXTENSION_MAP, _build_report
+from .analyzers.structure import TOP_DIRS, TOP_FILES, DirectoryStats, StructureReport
+from .analyzers.todos import TodoItem, TodoReport
+from .content import FileContent, _read_file, scan_contents
+from .ignore import IGNORE_FILES, Ignore, IgnoreCache
+from .scanner import FileEntry, TreeScan, scan_tree
+
+POLL_INTERVAL = 2.0  # seconds between rescans when polling
+
+# Collect events for this long after the first one so a burst of writes
+# (a checkout, a build) becomes one update; never wait longer than the cap
+BATCH_QUIET = 0.05
+BATCH_MAX = 1.0
+
+
+def _dir_depth(path: str) -> int:
+    return path.count(os.sep) + 1
+
+
+class WatchState:
+    """Per-file results plus the running aggregates derived from them."""
+
+    def __init__(
+        self,
+        root: Path,
+        scan: TreeScan,
+        contents: list[FileContent],
+        markers: bool = True,
+        max_items: int = 20,
+    ):
+        self.root = root
+        self.markers = markers
+        self.max_items = max_items
+        self.ignore = IgnoreCache(root)
+        self.files: dict[str, FileEntry] = {}
+        self.dirs: set[str] = set()
+        self._contents: dict[str, FileContent] = {}
+        self._depths: Counter[int] = Counter()
+        self._deepest: str | None = scan.deepest_path
+        self._lang_files: Counter[str] = Counter()
+        self._lang_lines: Counter[str] = Counter()
+        self._marker_counts: Counter[str] = Counter()
+        self._marker_items: dict[str, list[TodoItem]] = {}  # files with markers, in scan order
+        self._total_size = 0
+        self._top_dirs: dict[str, DirectoryStats] = {}
+        self._largest: list[FileEntry] | None = None  # None until (re)computed
+
+        for path in scan.dirs:
+            self._add_dir(path)
+        by_path = {content.path: content for content in contents}
+        for entry in scan.files:
+            self._add_file(entry, by_path.get(entry.path))
+
+    @classmethod
+    def build(cls, root: Path, markers: bool = True, jobs: int = 1, cache: bool = True) -> WatchState:
+        from .cache import ScanCache
+
+        scan = scan_tree(root)
+        scan_cache = ScanCache.for_root(root) if cache else None
+        try:
+            contents = scan_contents(root, scan, markers=markers, jobs=jobs, cache=scan_cache)
+        finally:
+            if scan_cache is not None:
+                scan_cache.close()
+        return cls(root, scan, contents, markers=markers)
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def _add_dir(self, path: str) -> bool:
+        if path in self.dirs:
+            return False
+        depth = _dir_depth(path)
+        if self._deepest is not None and depth > self.max_depth:
+            self._deepest = path
+        self.dirs.add(path)
+        self._depths[depth] += 1
+        return True
+
+    def _remove_dir(self, path: str) -> None:
+        self.dirs.discard(path)
+        depth = _dir_depth(path)
+        self._depths[depth] -= 1
+        if not self._depths[depth]:
+            del self._depths[depth]
+        if path == self._deepest:
+            self._deepest = None
+
+    def _add_file(self, entry: FileEntry, content: FileContent | None) -> None:
+        self.files[entry.path] = entry
+        self._total_size += entry.size
+        top = entry.path.split(os.sep, 1)[0] if entry.depth else "."
+        stats = self._top_dirs.get(top)
+        if stats is None:
+            stats = self._top_dirs[top] = DirectoryStats(path=top)
+        stats.files += 1
+        stats.size_bytes += entry.size
+        if self._largest is not None:
+            self._largest = heapq.nlargest(TOP_FILES, self._largest + [entry], key=lambda e: e.size)
+
+        if content is None:
+            return
+        self._contents[entry.path] = content
+        self._lang_files[content.language] += 1
+        self._lang_lines[content.language] += content.lines
+        self._marker_counts.update(content.marker_counts)
+        if content.markers:
+            self._marker_items[entry.path] = content.markers
+
+    def _remove_file(self, path: str) -> None:
+        entry = self.files.pop(path)
+        self._total_size -= entry.size
+        top = path.split(os.sep, 1)[0] if entry.depth else "."
+        stats = self._top_dirs[top]
+        stats.files -= 1
+        stats.size_bytes -= entry.size
+        if not stats.files:
+            del self._top_dirs[top]
+        if self._largest is not None and any(e.path == path for e in self._largest):
+            self._largest = None
+
+        content = self._contents.pop(path, None)
+        if content is None:
+            return
+        self._lang_files[content.language] -= 1
+        self._lang_lines[content.language] -= content.lines
+        self._marker_counts.subtract(content.marker_counts)
+        self._marker_items.pop(path, None)
+
+    def _put(self, entry: FileEntry) -> int:
+        """Add or refresh one file; returns 1 if it had to be read."""
+        old = self.files.get(entry.path)
+        if old is not None:
+            if old.size == entry.size and old.mtime_ns == entry.mtime_ns:
+                return 0
+            self._remove_file(entry.path)
+        content = None
+        if entry.ext in EXTENSION_MAP:
+            content = _read_file(str(self.root), entry, self.markers, self.max_items)
+        self._add_file(entry, content)
+        return int(content is not None)
+
+    def _remove_tree(self, path: str) -> None:
+        if path in self.files:
+            self._remove_file(path)
+        if path in self.dirs:
+            prefix = path + os.sep
+            for file_path in [p for p in self.files if p.startswith(prefix)]:
+                self._remove_file(file_path)
+            for dir_path in [d for d in self.dirs if d.startswith(prefix)]:
+                self._remove_dir(dir_path)
+            self._remove_dir(path)
+
+    def _sync_dir(self, path: str, new_dirs: list[str]) -> int:
+        if self._add_dir(path):
+            new_dirs.append(path)
+        full = os.path.join(self.root, path)
+        if os.path.islink(full):
+            return 0  # counted like scan_tree does, never followed
+
+        sub = scan_tree(Path(full), Ignore.for_root(self.root, path))
+        prefix = path + os.sep
+        base_depth = _dir_depth(path)
+        seen_dirs = set()
+        for sub_dir in sub.dirs:
+            rel = prefix + sub_dir
+            seen_dirs.add(rel)
+            if self._add_dir(rel):
+                new_dirs.append(rel)
+
+        reread = 0
+        seen_files = set()
+        for entry in sub.files:
+            rel = prefix + entry.path
+            seen_files.add(rel)
+            reread += self._put(FileEntry(rel, entry.size, entry.ext, entry.depth + base_depth, entry.mtime_ns))
+
+        for file_path in [p for p in self.files if p.startswith(prefix) and p not in seen_files]:
+            self._remove_file(file_path)
+        for dir_path in [d for d in self.dirs if d.startswith(prefix) and d not in seen_dirs]:
+            self._remove_dir(dir_path)
+        return reread
+
+    # -- updates -----------------------------------------------------------
+
+    def apply(self, paths: Iterable[str]) -> tuple[int, list[str]]:
+        """Bring ``paths`` (files or directories, relative to the root) up to date.
+
+        Returns how many files were re-read and which directories appeared,
+        so a watcher can start watching them.
+        """
+        reread = 0
+        new_dirs: list[str] = []
+        paths = set(paths)
+        if any(os.path.basename(path) in IGNORE_FILES for path in paths):
+            # What is ignored may have changed anywhere; compare with a fresh walk
+            self.ignore.clear()
+            paths |= self.changed_since(scan_tree(self.root))
+
+        # Sorted, so a directory is handled before anything inside it
+        for path in sorted(paths):
+            if not path:
+                continue
+            try:
+                st = os.stat(os.path.join(self.root, path))
+            except OSError:
+                self._remove_tree(path)
+                continue
+            is_dir = stat.S_ISDIR(st.st_mode)
+            if self.ignore.ignored(path, is_dir):
+                self._remove_tree(path)
+                continue
+            if is_dir:
+                if path in self.files:
+                    self._remove_file(path)
+                reread += self._sync_dir(path, new_dirs)
+            else:
+                if path in self.dirs:
+                    self._remove_tree(path)
+                name = os.path.basename(path)
+                entry = FileEntry(path, st.st_size, os.path.splitext(name)[1], path.count(os.sep), st.st_mtime_ns)
+                reread += self._put(entry)
+        return reread, new_dirs
+
+    def changed_since(self, scan: TreeScan) -> set[str]:
+        """Paths that differ between ``scan`` and what this state holds."""
+        current = {entry.path: entry for entry in scan.files}
+        changed = {
+            path for path, entry in current.items()
+            if (old := self.files.get(path)) is None or (old.size, old.mtime_ns) != (entry.size, entry.mtime_ns)
+        }
+        changed.update(path for path in self.files if path not in current)
+        changed.update(self.dirs.symmetric_difference(scan.dirs))
+        return changed
+
+    # -- reports -----------------------------------------------------------
+
+    @property
+    def max_depth(self) -> int:
+        return max(self._depths, default=0)
+
+    def languages(self):
+        return _build_report(self._lang_files, self._lang_lines)
+
+    def structure(self) -> StructureReport:
+        if self._largest is None:
+            self._largest = heapq.nlargest(TOP_FILES, self.files.values(), key=lambda e: e.size)
+        max_depth = self.max_depth
+        if self._deepest is None or _dir_depth(self._deepest) != max_depth:
+            self._deepest = min((d for d in self.dirs if _dir_depth(d) == max_depth), default="")
+        return StructureReport(
+            total_files=len(self.files),
+            total_dirs=len(self.dirs),
+            total_size_bytes=self._total_size,
+            deepest_path=self._deepest,
+            max_depth=max_depth,
+            largest_files=[(entry.path, entry.size) for entry in self._largest],
+            heaviest_dirs=[
+                DirectoryStats(d.path, d.files, d.size_bytes)
+                for d in heapq.nlargest(TOP_DIRS, self._top_dirs.values(), key=lambda d: d.size_bytes)
+            ],
+        )
+
+    def todos(self) -> TodoReport:
+        report = TodoReport()
+        for marker, count in self._marker_counts.items():
+            if count > 0:
+                report.counts[marker] = count
+                report.total += count
+        for items in self._marker_items.values():
+            if len(report.items) >= self.max_items:
+                break
+            report.items.extend(items[:self.max_items - len(report.items)])
+        return report
+
+
+class PollingWatcher:
+    """Fallback watcher: every ``interval`` seconds, ask for a metadata rescan."""
+
+    name = "polling"
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        self.interval = interval
+
+    def wait(self, timeout: float) -> set[str] | None:
+        time.sleep(self.interval)
+        return None  # caller diffs a fresh scan against its state
+
+    def add(self, dirs: Iterable[str]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes, one watch per directory.
+
+    :meth:`wait` returns the changed paths, or None if the kernel queue
+    overflowed and events were lost.
+    """
+
+    name = "inotify"
+
+    def __init__(self, root: Path, fd: int, libc):
+        self.root = root
+        self._fd = fd
+        self._libc = libc
+        self._paths: dict[int, str] = {}  # watch descriptor -> relative directory
+
+    @classmethod
+    def create(cls, root: Path, dirs: Iterable[str]) -> InotifyWatcher | None:
+        """Watch ``root`` and ``dirs``, or return None if inotify can't be used."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            import ctypes
+
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+
+        watcher = cls(root, fd, libc)
+        try:
+            watcher.add(["", *dirs])
+        except OSError:
+            watcher.close()
+            return None
+        return watcher
+
+    def add(self, dirs: Iterable[str]) -> None:
+        """Start watching ``dirs``; raises OSError once the watch limit is hit."""
+        import ctypes
+
+        for path in dirs:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(os.path.join(self.root, path)), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOSPC, errno.ENOMEM):
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue  # gone already, or unreadable
+            # A directory moved within the tree keeps its watch; re-map it
+            self._paths[wd] = path
+
+    def wait(self, timeout: float) -> set[str] | None:
+        changed: set[str] = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        deadline = time.monotonic() + BATCH_MAX
+        while True:
+            if not self._drain(changed):
+                return None
+            remaining = min(BATCH_QUIET, deadline - time.monotonic())
+            if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                return changed
+
+    def _drain(self, changed: set[str]) -> bool:
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return True
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].split(b"\0", 1)[0]
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                return False
+            base = self._paths.get(wd)
+            if base is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._paths[wd]
+                continue
+            if name:
+                changed.add(os.path.join(base, os.fsdecode(name)) if base else os.fsdecode(name))
+            elif base:
+                changed.add(base)
+        return True
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def watch(root: Path, console, markers: bool = True, jobs: int = 1, cache: bool = True,
+          interval: float = POLL_INTERVAL) -> None:
+    """Show live reports for ``root`` until interrupted."""
+    from rich.live import Live
+
+    from .display import watch_view
+
+    state = WatchState.build(root, markers=markers, jobs=jobs, cache=cache)
+    watcher = InotifyWatcher.create(root, state.dirs) or PollingWatcher(interval)
+    status = f"watching via {watcher.name}"
+
+    def view():
+        return watch_view(root.name, state.languages(), state.structure(), state.todos() if markers else None, status)
+
+    try:
+        with Live(view(), console=console, auto_refresh=False) as live:
+            while True:
+                changed = watcher.wait(interval)
+                if changed is None:
+                    changed = state.changed_since(scan_tree(root))
+                if not changed:
+                    continue
+
+                start = time.perf_counter()
+                reread, new_dirs = state.apply(changed)
+                try:
+                    watcher.add(new_dirs)
+                except OSError:
+                    watcher.close()
+                    watcher = PollingWatcher(interval)
+                elapsed = (time.perf_counter() - start) * 1000
+                status = (
+                    f"watching via {watcher.name} - {time.strftime('%H:%M:%S')}: "
+                    f"{len(changed)} changed, {reread} re-read in {elapsed:.0f} ms"
+                )
+                live.update(view(), refresh=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
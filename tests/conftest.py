@@ -0,0 +1,13 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep CLI runs from writing scan caches into the real user cache dir.
+
+    Nor may they talk to a daemon the user has running.
+    """
+    monkeypatch.setenv("REPOLYZER_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+    monkeypatch.setenv("REPOLYZER_SOCKET", str(tmp_path_factory.mktemp("daemon") / "repolyzer.sock"))
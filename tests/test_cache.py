@@ -0,0 +1,107 @@
+"""Tests for the persistent scan cache."""
+
+import os
+import time
+
+from repolyzer import content as content_module
+from repolyzer.cache import ScanCache
+from repolyzer.content import scan_contents
+from repolyzer.scanner import scan_tree
+
+
+def _write_old(path, text):
+    """Write a file with an mtime safely outside the racy window."""
+    path.write_text(text)
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+def _forbid_open(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("file was re-read")
+
+    monkeypatch.setattr(content_module, "open", fail, raising=False)
+
+
+def test_warm_run_reads_nothing(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _write_old(repo / "app.py", "# TODO: cached\nx = 1\n")
+    db = tmp_path / "cache.sqlite"
+
+    cold = scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    _forbid_open(monkeypatch)
+    warm = scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    assert warm == cold
+    assert warm[0].lines == 2
+    assert warm[0].markers[0].text == "# TODO: cached"
+
+
+def test_changed_file_is_reread(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _write_old(repo / "app.py", "x = 1\n")
+    db = tmp_path / "cache.sqlite"
+    scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    (repo / "app.py").write_text("x = 1\ny = 2\n# FIXME\n")
+    contents = scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    assert contents[0].lines == 3
+    assert contents[0].marker_counts == {"FIXME": 1}
+
+
+def test_recent_files_are_not_cached(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "fresh.py").write_text("x = 1\n")
+    db = tmp_path / "cache.sqlite"
+    scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    assert ScanCache(db).lookup(scan_tree(repo).files[0], markers=False, max_items=20) is None
+
+
+def test_markers_scan_not_served_from_lines_only_entry(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _write_old(repo / "app.py", "# TODO: x\n")
+    db = tmp_path / "cache.sqlite"
+    scan_contents(repo, scan_tree(repo), markers=False, cache=ScanCache(db))
+
+    entry = scan_tree(repo).files[0]
+    assert ScanCache(db).lookup(entry, markers=False, max_items=20) is not None
+    assert ScanCache(db).lookup(entry, markers=True, max_items=20) is None
+
+
+def test_deleted_files_are_pruned(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _write_old(repo / "a.py", "a\n")
+    _write_old(repo / "b.py", "b\n")
+    db = tmp_path / "cache.sqlite"
+    scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    (repo / "b.py").unlink()
+    scan_contents(repo, scan_tree(repo), cache=ScanCache(db))
+
+    assert set(ScanCache(db)._rows) == {"a.py"}
+
+
+def test_unusable_cache_location_is_disabled(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    (tmp_path / "app.py").write_text("x = 1\n")
+
+    cache = ScanCache(blocker / "cache.sqlite")
+    assert not cache.enabled
+    contents = scan_contents(tmp_path, scan_tree(tmp_path), cache=cache)
+    assert contents[0].lines == 1
+
+
+def test_for_root_honours_cache_dir_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPOLYZER_CACHE_DIR", str(tmp_path / "c"))
+    cache = ScanCache.for_root(tmp_path)
+    assert cache.db_path.parent == tmp_path / "c"
+    assert cache.enabled
@@ -33,6 +33,18 @@ def test_cli_version():
     assert "0.1.0" in result.output
 
 
+def test_cli_help_lists_commands():
+    runner = CliRunner()
+    result = runner.invoke(main, ["--help"])
+    assert result.exit_code == 0
+    for command in ("analyze", "batch", "query", "daemon"):
+        assert f"  {command} " in result.output
+
+    result = runner.invoke(main, ["analyze", "--help"])
+    assert result.exit_code == 0
+    assert "--no-git" in result.output
+
+
 def test_cli_runs_on_directory(tmp_path):
     (tmp_path / "app.py").write_text("x = 1\n")
     runner = CliRunner()
@@ -96,3 +108,171 @@ def test_cli_nonexistent_path():
     runner = CliRunner()
     result = runner.invoke(main, ["/nonexistent/path/xyz"])
     assert result.exit_code != 0
+
+
+def test_cli_jobs_option(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--no-git", "--jobs", "2"])
+    assert result.exit_code == 0
+
+
+def test_cli_jobs_rejects_zero(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--jobs", "0"])
+    assert result.exit_code != 0
+
+
+def test_cli_git_index_mode(tmp_path):
+    _init_git_repo(tmp_path)
+    (tmp_path / "untracked.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--git-index", "--no-git"])
+    assert result.exit_code == 0
+
+
+def test_cli_git_index_falls_back_outside_repo(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--git-index", "--no-git"])
+    assert result.exit_code == 0
+
+
+def test_cli_analyze_subcommand_matches_default(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, ["analyze", str(tmp_path), "--no-git"])
+    assert result.exit_code == 0
+    assert "Python" in result.output
+
+
+def _batch_lines(output):
+    return [json.loads(line) for line in output.splitlines() if line.strip()]
+
+
+def test_cli_batch_streams_one_object_per_repo(tmp_path):
+    for name in ("one", "two", "three"):
+        repo = tmp_path / name
+        repo.mkdir()
+        (repo / "app.py").write_text("x = 1\n" * len(name))
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        ["batch", *(str(tmp_path / n) for n in ("one", "two", "three")), "--no-git", "-w", "2"],
+    )
+    assert result.exit_code == 0
+    records = {r["path"]: r for r in _batch_lines(result.output)}
+    assert set(records) == {str(tmp_path / n) for n in ("one", "two", "three")}
+    assert all(r["ok"] for r in records.values())
+    assert records[str(tmp_path / "three")]["report"]["languages"]["total_lines"] == 5
+
+
+def test_cli_batch_workers_can_run_their_own_pool(tmp_path):
+    from repolyzer.parallel import MIN_CHUNK_SIZE
+
+    for i in range(MIN_CHUNK_SIZE * 2 + 1):
+        (tmp_path / f"m{i}.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, ["batch", str(tmp_path), "--no-git", "--no-cache", "-j", "2"])
+    assert result.exit_code == 0, result.output
+    [record] = _batch_lines(result.output)
+    assert record["ok"] is True, record.get("error")
+    assert record["report"]["languages"]["total_files"] == MIN_CHUNK_SIZE * 2 + 1
+
+
+def test_cli_batch_reports_failures_without_aborting(tmp_path):
+    good = tmp_path / "good"
+    good.mkdir()
+    (good / "app.py").write_text("x = 1\n")
+    listing = tmp_path / "repos.txt"
+    listing.write_text(f"# nightly\n{good}\n\n{tmp_path / 'missing'}\n")
+    runner = CliRunner()
+    result = runner.invoke(main, ["batch", "--from-file", str(listing), "--no-git"])
+    assert result.exit_code == 1
+    records = {r["path"]: r for r in _batch_lines(result.output)}
+    assert records[str(good)]["ok"] is True
+    assert records[str(tmp_path / "missing")] == {
+        "path": str(tmp_path / "missing"), "ok": False, "seconds": 0.0, "error": "not a directory",
+    }
+
+
+def test_cli_batch_times_out_slow_repos(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, ["batch", str(tmp_path), "--timeout", "0.001"])
+    assert result.exit_code == 1
+    [record] = _batch_lines(result.output)
+    assert record["ok"] is False
+    assert record["error"].startswith("timed out")
+
+
+def test_cli_batch_requires_paths():
+    runner = CliRunner()
+    result = runner.invoke(main, ["batch"])
+    assert result.exit_code == 2
+
+
+def test_cli_watch_rejects_json(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--watch", "--json"])
+    assert result.exit_code == 2
+    assert "--watch" in result.output
+
+
+def test_cli_json_includes_full_report(tmp_path):
+    _init_git_repo(tmp_path)
+    (tmp_path / "app.py").write_text("# TODO: ship it\nx = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--json"])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data["todos"]["items"] == [
+        {"marker": "TODO", "file": "app.py", "line": 1, "text": "# TODO: ship it"}
+    ]
+    assert {f["path"] for f in data["structure"]["largest_files"]} == {"app.py", "README.md"}
+    assert data["git"]["top_contributors"] == [{"name": "Tester", "commits": 1}]
+    assert data["git"]["last_commit"]["message"] == "Init"
+
+
+def test_cli_json_is_compact_unless_indented(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    compact = runner.invoke(main, [str(tmp_path), "--no-git", "--json"]).output
+    indented = runner.invoke(main, [str(tmp_path), "--no-git", "--json", "--indent", "2"]).output
+    assert compact.count("\n") == 1
+    assert ": " not in compact
+    assert indented.startswith('{\n  "languages": {')
+    assert json.loads(compact) == json.loads(indented)
+
+
+def test_cli_json_does_not_import_rich(tmp_path):
+    import sys
+
+    code = (
+        "import sys\n"
+        "from repolyzer.cli import main\n"
+        f"main([{str(tmp_path)!r}, '--no-git', '--json'], standalone_mode=False)\n"
+        "print('rich' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[-1] == "False"
+
+
+def test_cli_profile_json(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--no-git", "--json", "--profile"])
+    assert result.exit_code == 0
+    profile = {p["task"]: p for p in json.loads(result.output)["profile"]}
+    assert profile["contents"]["files_opened"] == 1
+    assert {"wall_seconds", "cpu_seconds", "bytes_read", "peak_memory_bytes", "subprocesses"} <= set(profile["scan"])
+
+
+def test_cli_profile_display(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--no-git", "--profile"])
+    assert result.exit_code == 0
+    assert "Profile" in result.output
+    assert "contents" in result.output
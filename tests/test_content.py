@@ -0,0 +1,109 @@
+"""Tests for the shared single-read content pass."""
+
+import builtins
+
+from repolyzer import content as content_module
+from repolyzer.analyzers.languages import analyze_languages
+from repolyzer.analyzers.todos import analyze_todos
+from repolyzer.content import ContentTotals, scan_contents, total_contents
+from repolyzer.scanner import scan_tree
+
+
+def test_scan_contents_counts_lines_and_markers(tmp_path):
+    (tmp_path / "app.py").write_text("# TODO: one\nx = 1\n# FIXME: two\n")
+    (tmp_path / "notes.txt").write_text("TODO: not code\n")
+
+    contents = scan_contents(tmp_path, scan_tree(tmp_path))
+
+    assert len(contents) == 1
+    assert contents[0].path == "app.py"
+    assert contents[0].language == "Python"
+    assert contents[0].lines == 3
+    assert contents[0].marker_counts == {"TODO": 1, "FIXME": 1}
+    assert [item.line for item in contents[0].markers] == [1, 3]
+
+
+def test_scan_contents_without_markers(tmp_path):
+    (tmp_path / "app.py").write_text("# TODO: one\n")
+    contents = scan_contents(tmp_path, scan_tree(tmp_path), markers=False)
+    assert contents[0].lines == 1
+    assert contents[0].marker_counts == {}
+
+
+def test_scan_contents_opens_each_file_once(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("# TODO: a\n")
+    (tmp_path / "b.js").write_text("// HACK: b\n")
+    opened = []
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return builtins.open(path, *args, **kwargs)
+
+    monkeypatch.setattr(content_module, "open", counting_open, raising=False)
+    contents = scan_contents(tmp_path, scan_tree(tmp_path))
+
+    assert len(opened) == 2
+    assert analyze_languages(tmp_path, contents=contents).total_lines == 2
+    assert analyze_todos(tmp_path, contents=contents).total == 2
+
+
+def test_total_contents_matches_per_file_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_module, "map_chunks", lambda fn, items, jobs: [fn(items[:1]), fn(items[1:])])
+    (tmp_path / "a.py").write_text("# TODO: a\nx = 1\n")
+    (tmp_path / "b.js").write_text("// HACK: b\n// TODO: b\n")
+    (tmp_path / "c.py").write_text("# FIXME: c\n")
+    scan = scan_tree(tmp_path)
+
+    totals = total_contents(tmp_path, scan, max_items=2)
+
+    assert totals == ContentTotals.from_contents(scan_contents(tmp_path, scan, max_items=2), max_items=2)
+    assert len(totals.markers) == 2
+
+
+def test_scan_contents_universal_newlines(tmp_path):
+    (tmp_path / "mixed.py").write_bytes(b"a\r\nb\rc\nd")
+    with open(tmp_path / "mixed.py", encoding="utf-8") as f:
+        expected = sum(1 for _ in f)
+
+    contents = scan_contents(tmp_path, scan_tree(tmp_path))
+    assert contents[0].lines == expected == 4
+
+
+def test_scan_contents_streams_large_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(content_module, "BLOCK_SIZE", 64)
+    body = "".join(
+        "# TODO: item %d\n" % i if i % 10 == 0 else "x = %d\r\n" % i
+        for i in range(100)
+    )
+    (tmp_path / "big.py").write_text(body, newline="")
+
+    contents = scan_contents(tmp_path, scan_tree(tmp_path), max_items=5)
+
+    assert contents[0].lines == 100
+    assert contents[0].marker_counts == {"TODO": 10}
+    assert [item.line for item in contents[0].markers] == [1, 11, 21, 31, 41]
+
+
+def test_scan_contents_streams_overlong_lines(tmp_path, monkeypatch):
+    # Lines past 8 blocks are scanned in pieces; a marker may straddle a cut
+    bodies = [
+        "x = 1\n" + "a" * offset + " todo " + "b" * (700 - offset) + "\n# FIXME: after\n"
+        for offset in range(490, 530, 3)
+    ]
+    bodies.append("# BUG: first\r" + "c" * 600 + "XTODO" + "d" * 600 + "\r\n# HACK: last\r")
+    bodies.append("e" * 1000 + " TODO")
+    expected = {}
+    for i, body in enumerate(bodies):
+        (tmp_path / f"f{i:02}.py").write_text(body, newline="")
+        expected[f"f{i:02}.py"] = content_module._scan_markers(body, f"f{i:02}.py", 20)
+
+    monkeypatch.setattr(content_module, "BLOCK_SIZE", 64)
+    contents = scan_contents(tmp_path, scan_tree(tmp_path))
+
+    assert len(contents) == len(bodies)
+    for content in contents:
+        counts, items = expected[content.path]
+        assert content.marker_counts == counts
+        assert [(item.marker, item.line, item.text[:20]) for item in content.markers] == [
+            (item.marker, item.line, item.text[:20]) for item in items
+        ]
@@ -0,0 +1,303 @@
+"""Tests for the report daemon: its cache, invalidation and socket protocol."""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from repolyzer import daemon, pipeline, scanner, watch
+from repolyzer.cli import main
+from repolyzer.daemon import Daemon, ReportCache, request, serve
+
+needs_unix_sockets = pytest.mark.skipif(not daemon.available(), reason="no Unix domain sockets")
+
+
+def test_report_cache_evicts_least_recently_used():
+    cache = ReportCache(max_bytes=10)
+    cache.put(("a",), "1234")
+    cache.put(("b",), "1234")
+    assert cache.get(("a",)) == "1234"  # now most recent
+    cache.put(("c",), "1234")
+
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == "1234"
+    assert cache.size == 8
+
+
+def test_report_cache_skips_oversized_and_drops_by_root():
+    cache = ReportCache(max_bytes=10)
+    cache.put(("big",), "x" * 11)
+    cache.put(("r", True), "1")
+    cache.put(("r", False), "2")
+    cache.put(("s", True), "3")
+
+    cache.drop("r")
+
+    assert len(cache) == 1
+    assert cache.roots() == {"s"}
+    assert cache.size == 1
+
+
+def _repo(root):
+    (root / ".git" / "refs" / "heads").mkdir(parents=True)
+    (root / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (root / ".git" / "refs" / "heads" / "main").write_text("a" * 40 + "\n")
+    (root / "app.py").write_text("# TODO: one\n")
+
+
+def _analyze(server, root):
+    return json.loads(server.handle({"op": "analyze", "path": str(root), "options": {"git": False}}))
+
+
+def test_repeat_query_is_served_from_cache(tmp_path):
+    _repo(tmp_path)
+    server = Daemon()
+    try:
+        first = _analyze(server, tmp_path)
+        second = _analyze(server, tmp_path)
+    finally:
+        server.close()
+
+    assert first["ok"] and not first["cached"]
+    assert second["cached"]
+    assert second["report"] == first["report"]
+    assert first["report"]["todos"]["counts"] == {"TODO": 1}
+    assert (server.hits, server.misses) == (1, 1)
+
+
+def test_file_change_invalidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch, "POLL_INTERVAL", 0)  # where inotify is unavailable
+    _repo(tmp_path)
+    server = Daemon()
+    try:
+        _analyze(server, tmp_path)
+        (tmp_path / "app.py").write_text("# TODO: one\n# FIXME: two\n")
+        reply = _analyze(server, tmp_path)
+    finally:
+        server.close()
+
+    assert not reply["cached"]
+    assert reply["report"]["todos"]["total"] == 2
+
+
+def _count_walks(monkeypatch):
+    walks = []
+
+    def counting_scan_tree(root, *args, **kwargs):
+        walks.append(root)
+        return scan_tree(root, *args, **kwargs)
+
+    scan_tree = scanner.scan_tree
+    monkeypatch.setattr(scanner, "scan_tree", counting_scan_tree)
+    monkeypatch.setattr(pipeline, "scan_tree", counting_scan_tree)
+    return walks
+
+
+def test_new_repository_is_walked_once(tmp_path, monkeypatch):
+    _repo(tmp_path)
+    walks = _count_walks(monkeypatch)
+    server = Daemon()
+    try:
+        _analyze(server, tmp_path)
+    finally:
+        server.close()
+
+    assert len(walks) == 1
+
+
+def test_polling_rescans_at_most_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch.InotifyWatcher, "create", classmethod(lambda cls, root, dirs: None))
+    _repo(tmp_path)
+    walks = _count_walks(monkeypatch)
+    server = Daemon()
+    try:
+        _analyze(server, tmp_path)
+        for _ in range(3):
+            assert _analyze(server, tmp_path)["cached"]
+        assert len(walks) == 1
+
+        monkeypatch.setattr(watch, "POLL_INTERVAL", 0)
+        (tmp_path / "app.py").write_text("# TODO: one\n# FIXME: two\n")
+        reply = _analyze(server, tmp_path)
+    finally:
+        server.close()
+
+    assert not reply["cached"]
+    assert reply["report"]["todos"]["total"] == 2
+
+
+def test_head_change_invalidates(tmp_path):
+    _repo(tmp_path)
+    server = Daemon()
+    try:
+        _analyze(server, tmp_path)
+        (tmp_path / ".git" / "refs" / "heads" / "main").write_text("b" * 40 + "\n")
+        reply = _analyze(server, tmp_path)
+    finally:
+        server.close()
+
+    assert not reply["cached"]
+
+
+def test_options_are_cached_separately(tmp_path):
+    _repo(tmp_path)
+    server = Daemon()
+    try:
+        _analyze(server, tmp_path)
+        reply = json.loads(server.handle(
+            {"op": "analyze", "path": str(tmp_path), "options": {"git": False, "todos": False}}
+        ))
+    finally:
+        server.close()
+
+    assert not reply["cached"]
+    assert "todos" not in reply["report"]
+
+
+def test_bad_requests_get_errors(tmp_path):
+    server = Daemon()
+    assert json.loads(server.handle({"op": "nope"}))["ok"] is False
+    assert json.loads(server.handle([]))["ok"] is False
+    reply = json.loads(server.handle({"op": "analyze", "path": str(tmp_path / "missing")}))
+    assert reply["error"].startswith("not a directory")
+
+
+@pytest.fixture
+def running_daemon(monkeypatch):
+    # Socket paths are length-limited, so keep this one short
+    directory = tempfile.mkdtemp(prefix="rpz")
+    path = Path(directory) / "d.sock"
+    monkeypatch.setenv("REPOLYZER_SOCKET", str(path))
+    thread = threading.Thread(target=serve, args=(path,), kwargs={"jobs": 1}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while request({"op": "status"}, path) is None:
+        assert time.monotonic() < deadline, "daemon did not start"
+        time.sleep(0.02)
+    yield path
+    request({"op": "shutdown"}, path)
+    thread.join(timeout=5)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@needs_unix_sockets
+def test_query_command_uses_daemon(running_daemon, tmp_path):
+    _repo(tmp_path)
+    runner = CliRunner()
+    result = runner.invoke(main, ["query", str(tmp_path), "--no-git"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["todos"]["total"] == 1
+
+
+@needs_unix_sockets
+def test_json_output_goes_through_daemon(running_daemon, tmp_path):
+    _repo(tmp_path)
+    runner = CliRunner()
+    for _ in range(2):
+        result = runner.invoke(main, [str(tmp_path), "--json", "--no-git"])
+        assert result.exit_code == 0
+    status = request({"op": "status"}, running_daemon)
+    assert (status["hits"], status["misses"]) == (1, 1)
+
+    result = runner.invoke(main, [str(tmp_path), "--json", "--no-git", "--no-daemon"])
+    assert result.exit_code == 0
+    assert request({"op": "status"}, running_daemon)["hits"] == 1
+
+
+@needs_unix_sockets
+def test_shutdown_removes_socket(running_daemon):
+    assert request({"op": "shutdown"}, running_daemon) == {"ok": True}
+    deadline = time.monotonic() + 5
+    while os.path.exists(running_daemon) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not os.path.exists(running_daemon)
+
+
+@needs_unix_sockets
+def test_socket_is_private(running_daemon):
+    assert os.stat(running_daemon).st_mode & 0o077 == 0
+
+
+@needs_unix_sockets
+def test_socket_of_another_user_is_not_trusted(running_daemon, tmp_path, monkeypatch):
+    _repo(tmp_path)
+    uid = os.getuid()
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "getuid", lambda: uid + 1)
+
+        reply = request({"op": "status"}, running_daemon)
+        assert reply["ok"] is False
+        assert "owned by another user" in reply["error"]
+
+        # --json analyzes in-process instead
+        result = CliRunner().invoke(main, [str(tmp_path), "--json", "--no-git"])
+        assert result.exit_code == 0
+        assert json.loads(result.output)["todos"]["total"] == 1
+    status = request({"op": "status"}, running_daemon)
+    assert (status["hits"], status["misses"]) == (0, 0)
+
+
+@needs_unix_sockets
+@pytest.mark.parametrize("reply", [b"not json\n", b"[1]\n", None])
+def test_unreadable_daemon_falls_back(tmp_path, monkeypatch, reply):
+    _repo(tmp_path)
+    directory = tempfile.mkdtemp(prefix="rpz")
+    path = os.path.join(directory, "d.sock")
+    monkeypatch.setenv("REPOLYZER_SOCKET", path)
+    monkeypatch.setattr(daemon, "REQUEST_TIMEOUT", 0.2)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen()
+    done = threading.Event()
+
+    def answer():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return  # closed at the end of the test
+            with conn:
+                conn.makefile("rb").readline()
+                if reply is None:
+                    done.wait(5)  # never answer
+                else:
+                    conn.sendall(reply)
+
+    thread = threading.Thread(target=answer, daemon=True)
+    thread.start()
+    try:
+        assert daemon.query(tmp_path, pipeline.AnalysisOptions(git=False), Path(path)) is None
+        result = CliRunner().invoke(main, [str(tmp_path), "--json", "--no-git"])
+        assert result.exit_code == 0
+        assert json.loads(result.output)["todos"]["total"] == 1
+    finally:
+        done.set()
+        listener.shutdown(socket.SHUT_RDWR)
+        listener.close()
+        thread.join(timeout=5)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@needs_unix_sockets
+def test_serve_refuses_shared_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(OSError, match="writable by other users"):
+        serve(shared / "d.sock")
+
+
+def test_query_without_daemon_fails(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPOLYZER_SOCKET", str(tmp_path / "none.sock"))
+    runner = CliRunner()
+    result = runner.invoke(main, ["query", str(tmp_path)])
+    assert result.exit_code == 1
+    assert "No daemon" in result.output
@@ -1,16 +1,16 @@
 """Tests for the dependencies analyzer."""
 
 import json
+import os
+
+import pytest
+
+from repolyzer.analyzers.dependencies import DependencyReport, _names, analyze_dependencies
 
-from repolyzer.analyzers.dependencies import (
-    DependencyReport,
-    analyze_dependencies,
-    _parse_package_json,
-    _parse_requirements_txt,
-    _parse_cargo_toml,
-    _parse_go_mod,
-    _parse_pyproject_toml,
-)
+
+def _count(path):
+    deps, dev = _names(path.name, path.read_bytes())
+    return len(deps), len(dev)
 
 
 def test_parse_package_json(tmp_path):
@@ -19,7 +19,7 @@ def test_parse_package_json(tmp_path):
         "dependencies": {"react": "^18", "axios": "^1"},
         "devDependencies": {"jest": "^29"},
     }))
-    deps, dev = _parse_package_json(pj)
+    deps, dev = _count(pj)
     assert deps == 2
     assert dev == 1
 
@@ -27,7 +27,7 @@ def test_parse_package_json(tmp_path):
 def test_parse_package_json_empty(tmp_path):
     pj = tmp_path / "package.json"
     pj.write_text("{}")
-    deps, dev = _parse_package_json(pj)
+    deps, dev = _count(pj)
     assert deps == 0
     assert dev == 0
 
@@ -35,15 +35,22 @@ def test_parse_package_json_empty(tmp_path):
 def test_parse_package_json_invalid(tmp_path):
     pj = tmp_path / "package.json"
     pj.write_text("not json")
-    deps, dev = _parse_package_json(pj)
+    deps, dev = _count(pj)
     assert deps == 0
     assert dev == 0
 
 
+@pytest.mark.parametrize("text", ['{"dependencies": null}', '{"dependencies": 5}', "[1, 2]"])
+def test_parse_package_json_wrong_shape(tmp_path, text):
+    pj = tmp_path / "package.json"
+    pj.write_text(text)
+    assert _count(pj) == (0, 0)
+
+
 def test_parse_requirements_txt(tmp_path):
     req = tmp_path / "requirements.txt"
     req.write_text("flask>=2.0\nrequests\n# comment\n\n-r other.txt\n")
-    deps, dev = _parse_requirements_txt(req)
+    deps, dev = _count(req)
     assert deps == 2
     assert dev == 0
 
@@ -61,7 +68,7 @@ tokio = "1.0"
 [dev-dependencies]
 criterion = "0.5"
 """)
-    deps, dev = _parse_cargo_toml(cargo)
+    deps, dev = _count(cargo)
     assert deps == 2
     assert dev == 1
 
@@ -78,7 +85,7 @@ require (
 \tgithub.com/lib/pq v1.10.9
 )
 """)
-    deps, dev = _parse_go_mod(gomod)
+    deps, dev = _count(gomod)
     assert deps == 2
     assert dev == 0
 
@@ -94,7 +101,7 @@ def test_parse_pyproject_toml(tmp_path):
 [tool.poetry.dev-dependencies]
 "pytest" = "^7.0"
 """)
-    deps, dev = _parse_pyproject_toml(toml)
+    deps, dev = _count(toml)
     assert deps == 2
     assert dev == 1
 
@@ -124,3 +131,88 @@ def test_analyze_dependencies_multiple_files(tmp_path):
     report = analyze_dependencies(tmp_path)
     assert report.total_deps == 3
     assert len(report.files) == 2
+
+
+def test_analyze_dependencies_finds_nested_manifests(tmp_path):
+    (tmp_path / "package.json").write_text(json.dumps({"devDependencies": {"eslint": "^8"}}))
+    api = tmp_path / "services" / "api"
+    web = tmp_path / "services" / "web"
+    api.mkdir(parents=True)
+    web.mkdir(parents=True)
+    (api / "requirements.txt").write_text("Flask>=2\nrequests\n")
+    (api / "pyproject.toml").write_text('[project.dependencies]\n"flask"\n')
+    (web / "package.json").write_text(json.dumps({
+        "dependencies": {"react": "^18", "eslint": "^8"},
+    }))
+
+    report = analyze_dependencies(tmp_path)
+
+    assert {f.path for f in report.files} == {
+        "package.json",
+        os.path.join("services", "api", "requirements.txt"),
+        os.path.join("services", "api", "pyproject.toml"),
+        os.path.join("services", "web", "package.json"),
+    }
+    assert report.total_deps == 5
+    packages = {p.path: p for p in report.packages}
+    assert packages[os.path.join("services", "api")].count == 2  # Flask == flask
+    assert sorted(packages[os.path.join("services", "api")].manifests) == ["pyproject.toml", "requirements.txt"]
+    assert packages["."].dev_count == 1
+    assert report.unique_deps == 4  # flask, requests, react, eslint
+    assert report.unique_dev_deps == 0  # eslint is a regular dependency in web
+
+
+def test_analyze_dependencies_skips_ignored_directories(tmp_path):
+    (tmp_path / "node_modules" / "left-pad").mkdir(parents=True)
+    (tmp_path / "node_modules" / "left-pad" / "package.json").write_text(json.dumps({
+        "dependencies": {"x": "1"},
+    }))
+    assert analyze_dependencies(tmp_path).files == []
+
+
+def test_dependency_cache_reuses_parsed_manifests(tmp_path, monkeypatch):
+    from repolyzer.analyzers import dependencies
+
+    monkeypatch.setenv("REPOLYZER_CACHE_DIR", str(tmp_path / "cache"))
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "requirements.txt").write_text("flask\n")
+    first = analyze_dependencies(repo, use_cache=True)
+
+    parsed = []
+    original = dependencies._parse_chunk
+    monkeypatch.setattr(dependencies, "_parse_chunk", lambda items: parsed.extend(items) or original(items))
+    assert analyze_dependencies(repo, use_cache=True) == first
+    assert parsed == []
+
+    (repo / "requirements.txt").write_text("flask\nrich\n")
+    assert analyze_dependencies(repo, use_cache=True).total_deps == 2
+    assert [filename for filename, _ in parsed] == ["requirements.txt"]
+
+
+def test_analyze_dependencies_reads_lockfiles(tmp_path, monkeypatch):
+    from repolyzer.analyzers import dependencies
+
+    monkeypatch.setenv("REPOLYZER_CACHE_DIR", str(tmp_path / "cache"))
+    repo = tmp_path / "repo"
+    (repo / "tools").mkdir(parents=True)
+    (repo / "package.json").write_text(json.dumps({"dependencies": {"a": "^1"}}))
+    (repo / "package-lock.json").write_text(json.dumps({
+        "lockfileVersion": 3,
+        "packages": {
+            "": {"dependencies": {"a": "^1"}},
+            "node_modules/a": {"version": "1.0.0", "dependencies": {"b": "^1"}},
+            "node_modules/b": {"version": "1.0.0"},
+        },
+    }))
+    (repo / "tools" / "go.sum").write_text("rsc.io/quote v1.5.2 h1:x=\nrsc.io/quote v1.5.1/go.mod h1:y=\n")
+
+    report = analyze_dependencies(repo, use_cache=True)
+
+    locks = {lock.name: lock for lock in report.lockfiles}
+    assert (locks["package-lock.json"].packages, locks["package-lock.json"].max_depth) == (2, 2)
+    assert (locks["go.sum"].path, locks["go.sum"].duplicates) == (os.path.join("tools", "go.sum"), 1)
+    assert report.transitive_deps == 4
+
+    monkeypatch.setattr(dependencies, "read_lockfile", lambda *args: (0, 0, None))
+    assert analyze_dependencies(repo, use_cache=True) == report
@@ -86,3 +86,98 @@ def test_git_report_defaults():
     assert report.total_commits == 0
     assert report.branches == 0
     assert report.top_contributors == []
+
+
+def _git(tmp_path, *args):
+    subprocess.run(["git", "-C", str(tmp_path), *args], capture_output=True)
+
+
+def test_analyze_git_tags_loose_and_packed(tmp_path):
+    _init_git_repo(tmp_path)
+    _git(tmp_path, "tag", "v1")
+    _git(tmp_path, "tag", "-a", "v2", "-m", "annotated")
+    _git(tmp_path, "branch", "feature/nested")
+    _git(tmp_path, "pack-refs", "--all")
+    _git(tmp_path, "tag", "v3")
+    _git(tmp_path, "branch", "loose")
+
+    report = analyze_git(tmp_path)
+    assert report.tags == 3
+    assert report.branches == 3
+
+
+def test_analyze_git_detached_head(tmp_path):
+    _init_git_repo(tmp_path)
+    _git(tmp_path, "checkout", "--detach")
+    report = analyze_git(tmp_path)
+    assert report.current_branch == "HEAD"
+
+
+def test_analyze_git_merges_not_counted_as_contributions(tmp_path):
+    _init_git_repo(tmp_path)
+    _git(tmp_path, "checkout", "-b", "side")
+    (tmp_path / "side.txt").write_text("side")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "-c", "user.name=Other", "commit", "-m", "Side work")
+    _git(tmp_path, "checkout", "-")
+    (tmp_path / "main.txt").write_text("main")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-m", "Main work")
+    _git(tmp_path, "merge", "--no-edit", "side")
+
+    report = analyze_git(tmp_path)
+    assert report.total_commits == 4
+    assert report.top_contributors == [("Tester", 2), ("Other", 1)]
+    assert report.last_commit_message.startswith("Merge branch")
+
+
+def test_analyze_git_worktree(tmp_path):
+    main = tmp_path / "main"
+    main.mkdir()
+    _init_git_repo(main)
+    _git(main, "worktree", "add", "-b", "wt-branch", str(tmp_path / "wt"))
+
+    report = analyze_git(tmp_path / "wt")
+    assert report.is_git_repo
+    assert report.current_branch == "wt-branch"
+    assert report.branches == 2
+    assert report.total_commits == 1
+
+
+def test_relative_date_matches_git(tmp_path):
+    import os
+    import time
+
+    from repolyzer.analyzers.git import _relative_date
+
+    _init_git_repo(tmp_path)
+    now = int(time.time())
+    for age in (5, 3600 * 5, 86400 * 3, 86400 * 40, 86400 * 200, 86400 * 400, 86400 * 365 * 7):
+        env = {**os.environ, "GIT_AUTHOR_DATE": f"{now - age} +0000"}
+        subprocess.run(
+            ["git", "-C", str(tmp_path), "commit", "--allow-empty", "-m", str(age)],
+            capture_output=True, env=env,
+        )
+        out = subprocess.run(
+            ["git", "-C", str(tmp_path), "log", "-1", "--format=%at|%ar"],
+            capture_output=True, text=True,
+        ).stdout.strip()
+        at, ar = out.split("|")
+        assert _relative_date(int(at)) == ar
+
+
+def test_analyze_git_history_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPOLYZER_CACHE_DIR", str(tmp_path / "cache"))
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _init_git_repo(repo)
+    first = analyze_git(repo, use_cache=True)
+    (repo / "more.txt").write_text("more")
+    subprocess.run(["git", "-C", str(repo), "add", "."], capture_output=True)
+    subprocess.run(["git", "-C", str(repo), "commit", "-m", "More"], capture_output=True)
+    second = analyze_git(repo, use_cache=True)
+
+    assert first.total_commits == 1
+    assert second.total_commits == 2
+    assert second.top_contributors == [("Tester", 2)]
+    assert any((tmp_path / "cache").iterdir())
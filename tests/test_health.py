@@ -1,6 +1,9 @@
 """Tests for the health analyzer."""
 
+import os
+
 from repolyzer.analyzers.health import HealthCheck, HealthReport, analyze_health
+from repolyzer.scanner import TreeScan
 
 
 def test_health_all_missing(tmp_path):
@@ -109,3 +112,60 @@ def test_health_partial_score(tmp_path):
     (tmp_path / "LICENSE").write_text("MIT")
     report = analyze_health(tmp_path)
     assert 0 < report.score < 100
+
+
+def test_health_tests_found_anywhere_in_tree(tmp_path):
+    (tmp_path / "pkg" / "server").mkdir(parents=True)
+    (tmp_path / "pkg" / "server" / "handler_test.go").write_text("package server\n")
+    report = analyze_health(tmp_path)
+    check = next(c for c in report.checks if c.name == "Tests")
+    assert check.passed
+    assert check.detail == os.path.join("pkg", "server", "handler_test.go")
+
+
+def test_health_test_patterns_are_matched_as_globs(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "contest.py").write_text("")
+    (tmp_path / "src" / "latest.ts").write_text("")
+    report = analyze_health(tmp_path)
+    assert not next(c for c in report.checks if c.name == "Tests").passed
+
+    (tmp_path / "src" / "button.spec.ts").write_text("")
+    report = analyze_health(tmp_path)
+    assert next(c for c in report.checks if c.name == "Tests").passed
+
+
+def test_health_nested_ci_and_security(tmp_path):
+    (tmp_path / ".circleci").mkdir()
+    (tmp_path / ".circleci" / "config.yml").write_text("version: 2.1\n")
+    (tmp_path / ".github").mkdir()
+    (tmp_path / ".github" / "SECURITY.md").write_text("# Security")
+    report = analyze_health(tmp_path)
+    checks = {c.name: c for c in report.checks}
+    assert checks["CI/CD"].detail == ".circleci/config.yml"
+    assert checks["Security policy"].passed
+
+
+def test_health_lists_each_directory_once(tmp_path, monkeypatch):
+    (tmp_path / ".github" / "workflows").mkdir(parents=True)
+    (tmp_path / "README.md").write_text("# X")
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: listed.append(path) or real_scandir(path))
+
+    analyze_health(tmp_path, scan=TreeScan(root=tmp_path))
+
+    assert sorted(listed) == sorted([os.path.join(tmp_path, ""), os.path.join(tmp_path, ".github")])
+
+
+def test_health_names_match_in_any_case(tmp_path):
+    (tmp_path / "Readme.md").write_text("# X")
+    (tmp_path / "license").write_text("MIT")
+    (tmp_path / ".GitHub" / "Workflows").mkdir(parents=True)
+    (tmp_path / "dockerfile").write_text("FROM scratch\n")
+    report = analyze_health(tmp_path, scan=TreeScan(root=tmp_path))
+    checks = {c.name: c for c in report.checks}
+    assert checks["README"].passed
+    assert checks["License"].passed
+    assert checks["CI/CD"].detail == ".GitHub/Workflows"
+    assert checks["Docker"].detail == "dockerfile"
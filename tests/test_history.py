@@ -0,0 +1,136 @@
+"""Tests for the incremental commit history engine."""
+
+import subprocess
+
+from repolyzer import history as history_module
+from repolyzer.history import HistoryStore, commit_history
+
+
+def _git(repo, *args):
+    result = subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def _commit(repo, name, author="Tester"):
+    (repo / name).write_text(name)
+    _git(repo, "add", ".")
+    _git(repo, "-c", f"user.name={author}", "commit", "-m", name)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+def _init_repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init")
+    _git(repo, "config", "user.email", "test@test.com")
+    _git(repo, "config", "user.name", "Tester")
+    return repo
+
+
+def test_full_history(tmp_path):
+    repo = _init_repo(tmp_path)
+    _commit(repo, "a")
+    head = _commit(repo, "b", author="Other")
+
+    history = commit_history(repo, head)
+    assert history.commits == 2
+    assert history.authors == {"Tester": 1, "Other": 1}
+    assert history.root_time is not None
+
+
+def test_uncached_history_matches_full_walk(tmp_path, monkeypatch):
+    repo = _init_repo(tmp_path)
+    _commit(repo, "a")
+    _git(repo, "checkout", "-b", "side")
+    _commit(repo, "b", author="Other")
+    _git(repo, "checkout", "-")
+    _commit(repo, "c")
+    _git(repo, "merge", "--no-edit", "side")
+    head = _git(repo, "rev-parse", "HEAD")
+    walked = history_module._full_history(repo, head, "")
+
+    args = []
+    real = history_module._fold_git_lines
+    monkeypatch.setattr(history_module, "_fold_git_lines", lambda root, a, fn: args.append(a) or real(root, a, fn))
+    history = commit_history(repo, head)
+
+    # Only the root commits are listed, not every commit
+    assert [a[:2] for a in args] == [["rev-list", "--count"], ["shortlog", "-sn"], ["log", "--max-parents=0"]]
+    assert history == walked
+    assert history.commits == 4
+
+
+def test_snapshot_reused_without_git(tmp_path, monkeypatch):
+    repo = _init_repo(tmp_path)
+    head = _commit(repo, "a")
+    store = HistoryStore(tmp_path / "history.json")
+    first = commit_history(repo, head, store)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("git history was walked again")
+
+    monkeypatch.setattr(history_module, "_fold_git_lines", fail)
+    assert commit_history(repo, head, store) == first
+
+
+def test_incremental_update_matches_full(tmp_path, monkeypatch):
+    repo = _init_repo(tmp_path)
+    _commit(repo, "a")
+    head = _commit(repo, "b")
+    store = HistoryStore(tmp_path / "history.json")
+    commit_history(repo, head, store)
+
+    _commit(repo, "c", author="New")
+    head = _commit(repo, "d", author="New")
+
+    walked = []
+    real_fold = history_module._fold_git_lines
+
+    def spy(root, args, fn):
+        walked.append(args)
+        return real_fold(root, args, fn)
+
+    monkeypatch.setattr(history_module, "_fold_git_lines", spy)
+    incremental = commit_history(repo, head, store)
+
+    assert len(walked) == 1 and "--left-right" in walked[0]
+    full = commit_history(repo, head)
+    assert (incremental.commits, incremental.authors, incremental.root_time) == (
+        full.commits, full.authors, full.root_time,
+    )
+    assert incremental.authors == {"Tester": 2, "New": 2}
+
+
+def test_rewritten_history(tmp_path):
+    repo = _init_repo(tmp_path)
+    _commit(repo, "a")
+    head = _commit(repo, "b", author="Gone")
+    store = HistoryStore(tmp_path / "history.json")
+    commit_history(repo, head, store)
+
+    _git(repo, "reset", "--hard", "HEAD~1")
+    head = _commit(repo, "c", author="Replacement")
+
+    history = commit_history(repo, head, store)
+    assert history.commits == 2
+    assert history.authors == {"Tester": 1, "Replacement": 1}
+
+
+def test_missing_old_head_falls_back_to_full_walk(tmp_path):
+    repo = _init_repo(tmp_path)
+    head = _commit(repo, "a")
+    store = HistoryStore(tmp_path / "history.json")
+    snapshot = commit_history(repo, head, store)
+    snapshot.head = "0" * 40
+    store.save([snapshot])
+
+    head = _commit(repo, "b")
+    assert commit_history(repo, head, store).commits == 2
+
+
+def test_corrupt_store_is_ignored(tmp_path):
+    repo = _init_repo(tmp_path)
+    head = _commit(repo, "a")
+    path = tmp_path / "history.json"
+    path.write_text("{not json")
+    assert commit_history(repo, head, HistoryStore(path)).commits == 1
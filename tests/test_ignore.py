@@ -0,0 +1,134 @@
+"""Tests for the compiled ignore rules and their use in the walk."""
+
+import os
+
+import pytest
+
+from repolyzer.ignore import Ignore, IgnoreCache, RuleSet
+from repolyzer.scanner import scan_tree
+
+
+@pytest.mark.parametrize("pattern, path, is_dir, expected", [
+    ("*.log", "a/b/debug.log", False, True),
+    ("*.log", "debug.log.txt", False, None),
+    ("build/", "pkg/build", True, True),
+    ("build/", "pkg/build", False, None),
+    ("/build", "build", True, True),
+    ("/build", "pkg/build", True, None),
+    ("docs/*.md", "docs/a.md", False, True),
+    ("docs/*.md", "docs/sub/a.md", False, None),
+    ("docs/*.md", "x/docs/a.md", False, None),
+    ("**/tmp", "a/b/tmp", True, True),
+    ("**/tmp", "tmp", True, True),
+    ("a/**/z", "a/z", True, True),
+    ("a/**/z", "a/b/c/z", True, True),
+    ("out/**", "out/x/y.py", False, True),
+    ("file?.txt", "file1.txt", False, True),
+    ("file?.txt", "file10.txt", False, None),
+    ("[abc].py", "b.py", False, True),
+    ("[!abc].py", "b.py", False, None),
+    ("[!abc].py", "d.py", False, True),
+    ("\\#notes", "#notes", False, True),
+    ("# comment", "# comment", False, None),
+    ("trailing   ", "trailing", False, True),
+])
+def test_single_pattern(pattern, path, is_dir, expected):
+    rules = RuleSet([pattern])
+    assert rules.match(path.rpartition("/")[2], path, is_dir) is expected
+
+
+def test_last_matching_pattern_wins():
+    rules = RuleSet(["*.log", "!keep.log", "keep.log"])
+    assert rules.match("keep.log", "keep.log", False) is True
+    rules = RuleSet(["*.log", "!keep.log"])
+    assert rules.match("keep.log", "keep.log", False) is False
+    assert rules.match("other.log", "other.log", False) is True
+
+
+def _paths(scan):
+    return {entry.path.replace(os.sep, "/") for entry in scan.files}
+
+
+def test_walk_honours_gitignore_and_prunes(tmp_path):
+    (tmp_path / ".gitignore").write_text("generated/\n*.tmp\n!important.tmp\n")
+    (tmp_path / "generated" / "deep").mkdir(parents=True)
+    (tmp_path / "generated" / "deep" / "x.py").write_text("x = 1\n")
+    (tmp_path / "scratch.tmp").write_text("")
+    (tmp_path / "important.tmp").write_text("")
+    (tmp_path / "app.py").write_text("")
+
+    scan = scan_tree(tmp_path)
+
+    assert _paths(scan) == {".gitignore", "important.tmp", "app.py"}
+    assert scan.dirs == []
+
+
+def test_nested_gitignore_overrides_parent(tmp_path):
+    (tmp_path / ".gitignore").write_text("*.dat\n")
+    sub = tmp_path / "fixtures"
+    sub.mkdir()
+    (sub / ".gitignore").write_text("!*.dat\n/local/\n")
+    (sub / "a.dat").write_text("")
+    (sub / "local").mkdir()
+    (sub / "local" / "b.py").write_text("")
+    (tmp_path / "c.dat").write_text("")
+    (tmp_path / "local").mkdir()
+    (tmp_path / "local" / "d.py").write_text("")
+
+    assert _paths(scan_tree(tmp_path)) == {
+        ".gitignore", "fixtures/.gitignore", "fixtures/a.dat", "local/d.py",
+    }
+
+
+def test_defaults_match_egg_info_glob(tmp_path):
+    (tmp_path / "mypkg.egg-info").mkdir()
+    (tmp_path / "mypkg.egg-info" / "PKG-INFO").write_text("")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "x.js").write_text("")
+
+    assert _paths(scan_tree(tmp_path)) == set()
+
+
+def test_gitignore_can_reinclude_a_default(tmp_path):
+    (tmp_path / ".gitignore").write_text("!vendor/\n")
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "lib.go").write_text("")
+
+    assert "vendor/lib.go" in _paths(scan_tree(tmp_path))
+
+
+def test_info_exclude_and_repolyzerignore(tmp_path):
+    (tmp_path / ".git" / "info").mkdir(parents=True)
+    (tmp_path / ".git" / "info" / "exclude").write_text("secret.py\n")
+    (tmp_path / ".gitignore").write_text("data/\n")
+    (tmp_path / ".repolyzerignore").write_text("!data/\nhuge.sql\n")
+    (tmp_path / "secret.py").write_text("")
+    (tmp_path / "huge.sql").write_text("")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "seed.csv").write_text("")
+
+    assert _paths(scan_tree(tmp_path)) == {".gitignore", ".repolyzerignore", "data/seed.csv"}
+
+
+def test_rules_for_a_subdirectory(tmp_path):
+    (tmp_path / ".gitignore").write_text("/src/gen/\n*.pyc\n")
+    (tmp_path / "src" / "gen").mkdir(parents=True)
+    (tmp_path / "src" / "gen" / "x.py").write_text("")
+    (tmp_path / "src" / "a.py").write_text("")
+    (tmp_path / "src" / "a.pyc").write_text("")
+
+    scan = scan_tree(tmp_path / "src", Ignore.for_root(tmp_path, "src"))
+
+    assert _paths(scan) == {"a.py"}
+
+
+def test_ignore_cache_checks_ancestors(tmp_path):
+    (tmp_path / ".gitignore").write_text("out/\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitignore").write_text("*.bak\n")
+    cache = IgnoreCache(tmp_path)
+
+    assert cache.ignored(os.path.join("out", "a", "b.py"), False)
+    assert cache.ignored(os.path.join("pkg", "x.bak"), False)
+    assert not cache.ignored(os.path.join("pkg", "x.py"), False)
+    assert not cache.ignored("x.bak", False)
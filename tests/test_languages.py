@@ -92,3 +92,36 @@ def test_tsx_jsx_mapped(tmp_path):
     names = {lang.name for lang in report.languages}
     assert "TypeScript" in names
     assert "JavaScript" in names
+
+
+def _text_mode_lines(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return sum(1 for _ in f)
+
+
+def test_count_lines_matches_text_mode(tmp_path):
+    samples = [
+        b"no newline",
+        b"trailing\n",
+        b"crlf\r\nline\r\n",
+        b"old mac\rline\r",
+        b"mixed\r\n\r\n\n\rend",
+        b"\n\n\n",
+        b"caf\xc3\xa9\nna\xc3\xafve",
+        b"ok\n\xff\xfe",  # undecodable tail is not a line
+        b"ok\n\xe2\x82",  # truncated multi-byte char
+    ]
+    for i, data in enumerate(samples):
+        f = tmp_path / f"s{i}.py"
+        f.write_bytes(data)
+        assert _count_lines(f) == _text_mode_lines(f), data
+
+
+def test_count_lines_across_blocks(tmp_path, monkeypatch):
+    from repolyzer.analyzers import languages
+
+    monkeypatch.setattr(languages, "BLOCK_SIZE", 3)
+    data = b"ab\r\ncd\re\n\xc3\xa9\r\n\r\nx\xe2\x82\xac"
+    f = tmp_path / "blocks.py"
+    f.write_bytes(data)
+    assert _count_lines(f) == _text_mode_lines(f)
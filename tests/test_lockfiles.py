@@ -0,0 +1,273 @@
+"""Tests for the streaming lockfile parsers."""
+
+import json
+
+import pytest
+
+from repolyzer.analyzers import lockfiles
+from repolyzer.analyzers.lockfiles import read_lockfile
+
+PACKAGE_LOCK_V3 = {
+    "name": "app",
+    "lockfileVersion": 3,
+    "packages": {
+        "": {"name": "app", "dependencies": {"a": "^1"}, "devDependencies": {"d": "^3"}},
+        "node_modules/a": {"version": "1.0.0", "dependencies": {"b": "^1", "c": "^2"}},
+        "node_modules/b": {"version": "1.0.0", "dependencies": {"c": "^1"}},
+        "node_modules/c": {"version": "1.0.0"},
+        "node_modules/a/node_modules/c": {"version": "2.0.0"},
+        "node_modules/d": {"version": "3.0.0", "dev": True},
+    },
+    "dependencies": {"a": {"version": "1.0.0"}},
+}
+
+
+def _read(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return read_lockfile(name, str(path))
+
+
+@pytest.mark.parametrize("block_size", [1 << 20, 7])
+def test_package_lock_follows_node_resolution(tmp_path, monkeypatch, block_size):
+    monkeypatch.setattr(lockfiles, "BLOCK_SIZE", block_size)
+
+    stats = _read(tmp_path, "package-lock.json", json.dumps(PACKAGE_LOCK_V3, indent=2))
+
+    # a -> b -> c@1 is the deepest chain; a's own c@2 sits beside b
+    assert stats == (5, 1, 3)
+
+
+def test_package_lock_v1_nested_tree(tmp_path):
+    lock = {
+        "name": "app",
+        "lockfileVersion": 1,
+        "dependencies": {
+            "a": {"version": "1.0.0", "requires": {"b": "^2"}, "dependencies": {"b": {"version": "2.0.0"}}},
+            "b": {"version": "1.0.0"},
+        },
+    }
+    assert _read(tmp_path, "package-lock.json", json.dumps(lock)) == (3, 1, 2)
+
+
+def test_yarn_classic(tmp_path):
+    text = """\
+# yarn lockfile v1
+
+
+a@^1.0.0:
+  version "1.0.0"
+  resolved "https://registry.yarnpkg.com/a/-/a-1.0.0.tgz"
+  dependencies:
+    b "^1.0.0"
+    "@s/c" "~2"
+
+b@^1.0.0, b@^1.1.0:
+  version "1.2.0"
+
+"@s/c@~2":
+  version "2.0.1"
+  dependencies:
+    b "^1.1.0"
+"""
+    assert _read(tmp_path, "yarn.lock", text) == (3, 0, 2)
+
+
+def test_yarn_berry_workspace_roots(tmp_path):
+    text = """\
+__metadata:
+  version: 6
+
+"a@npm:^1.0.0":
+  version: 1.0.0
+  dependencies:
+    b: ^2.0.0
+  languageName: node
+
+"app@workspace:.":
+  version: 0.0.0-use.local
+  dependencies:
+    a: ^1.0.0
+    b: ^1.0.0
+
+"b@npm:^1.0.0":
+  version: 1.5.0
+
+"b@npm:^2.0.0, b@npm:^2.1.0":
+  version: 2.1.0
+"""
+    assert _read(tmp_path, "yarn.lock", text) == (3, 1, 2)
+
+
+def test_pnpm_v6(tmp_path):
+    text = """\
+lockfileVersion: '6.0'
+
+dependencies:
+  a:
+    specifier: ^1.0.0
+    version: 1.0.0
+
+devDependencies:
+  c:
+    specifier: ^1.0.0
+    version: 1.0.0(a@1.0.0)
+
+packages:
+
+  /a@1.0.0:
+    resolution: {integrity: sha512-x}
+    dependencies:
+      b: 2.0.0
+    dev: false
+
+  /b@1.0.0:
+    resolution: {integrity: sha512-y}
+
+  /b@2.0.0:
+    resolution: {integrity: sha512-z}
+    dependencies:
+      '@s/d': 1.0.0
+
+  /c@1.0.0(a@1.0.0):
+    dependencies:
+      a: 1.0.0
+      b: 1.0.0
+
+  /@s/d@1.0.0:
+    resolution: {integrity: sha512-w}
+"""
+    assert _read(tmp_path, "pnpm-lock.yaml", text) == (5, 1, 3)
+
+
+def test_pnpm_v9_importers_and_v5_ids(tmp_path):
+    v9 = """\
+lockfileVersion: '9.0'
+
+importers:
+
+  .:
+    dependencies:
+      a:
+        specifier: ^1.0.0
+        version: 1.0.0
+
+packages:
+
+  a@1.0.0:
+    resolution: {integrity: sha512-x}
+
+  b@1.0.0:
+    resolution: {integrity: sha512-y}
+
+snapshots:
+
+  a@1.0.0:
+    dependencies:
+      b: 1.0.0
+
+  b@1.0.0: {}
+"""
+    assert _read(tmp_path, "pnpm-lock.yaml", v9) == (2, 0, 2)
+
+    v5 = """\
+lockfileVersion: 5.4
+
+dependencies:
+  '@s/a': 1.0.0_b@1.0.0
+
+packages:
+
+  /@s/a/1.0.0_b@1.0.0:
+    dependencies:
+      b: 1.0.0
+
+  /b/1.0.0:
+    dev: false
+"""
+    assert _read(tmp_path, "pnpm-lock.yaml", v5) == (2, 0, 2)
+
+
+def test_poetry_lock(tmp_path):
+    text = """\
+[[package]]
+name = "requests"
+version = "2.31.0"
+python-versions = ">=3.7"
+files = [
+    {file = "requests-2.31.0.tar.gz", hash = "sha256:aaa"},
+]
+
+[package.dependencies]
+certifi = ">=2017.4.17"
+urllib3 = {version = ">=1.21.1,<3", optional = true}
+
+[package.extras]
+socks = ["PySocks"]
+
+[[package]]
+name = "certifi"
+version = "2023.7.22"
+
+[[package]]
+name = "urllib3"
+version = "2.0.4"
+
+[metadata]
+lock-version = "2.0"
+"""
+    assert _read(tmp_path, "poetry.lock", text) == (3, 0, 2)
+
+
+def test_cargo_lock_starts_from_workspace_crates(tmp_path):
+    text = """\
+version = 3
+
+[[package]]
+name = "app"
+version = "0.1.0"
+dependencies = [
+ "rand 0.8.5",
+ "serde",
+]
+
+[[package]]
+name = "rand"
+version = "0.7.3"
+source = "registry+https://github.com/rust-lang/crates.io-index"
+
+[[package]]
+name = "rand"
+version = "0.8.5"
+source = "registry+https://github.com/rust-lang/crates.io-index"
+dependencies = ["rand_core"]
+
+[[package]]
+name = "rand_core"
+version = "0.6.4"
+source = "registry+https://github.com/rust-lang/crates.io-index"
+
+[[package]]
+name = "serde"
+version = "1.0.0"
+source = "registry+https://github.com/rust-lang/crates.io-index"
+"""
+    assert _read(tmp_path, "Cargo.lock", text) == (4, 1, 2)
+
+
+def test_go_sum_has_no_depth(tmp_path):
+    text = """\
+golang.org/x/text v0.3.0 h1:g61tztE5qeGQ89tm6NTjjM9VPIm088od1l6aSorWRWg=
+golang.org/x/text v0.3.0/go.mod h1:NqM8EUOU14njkJ3fqMW+pc6Ldnwhi/IjpwHt7yyuwOQ=
+golang.org/x/text v0.14.0/go.mod h1:18ZOQIKpY8NJVqYksKHtTdi31H5itFRjB5/qKTNYzSU=
+rsc.io/quote v1.5.2 h1:w5fcysjrx7yqtD/aO+QwRjYZOKnaM9Uh2b40tElTs3Y=
+"""
+    assert _read(tmp_path, "go.sum", text) == (3, 1, None)
+
+
+def test_malformed_and_missing_lockfiles(tmp_path):
+    assert _read(tmp_path, "package-lock.json", '{"packages": {"node_modules/a": ') == (0, 0, None)
+    assert read_lockfile("Cargo.lock", str(tmp_path / "missing")) == (0, 0, None)
+    text = '{"packages": {"node_modules/a": {"dependencies": 5}}}'
+    assert _read(tmp_path, "package-lock.json", text) == (0, 0, None)
+    assert _read(tmp_path, "package-lock.json", '{"dependencies": {"a": {"requires": 5}}}') == (0, 0, None)
@@ -0,0 +1,54 @@
+"""Tests for the parallel chunk runner."""
+
+from functools import partial
+
+from repolyzer.analyzers.languages import analyze_languages
+from repolyzer.analyzers.todos import analyze_todos
+from repolyzer.parallel import map_chunks
+
+
+def _scale(factor, chunk):
+    return [factor * x for x in chunk]
+
+
+def test_map_chunks_preserves_order():
+    items = list(range(1000))
+    parts = map_chunks(partial(_scale, 2), items, jobs=4)
+    assert len(parts) > 1
+    assert [x for part in parts for x in part] == [2 * x for x in items]
+
+
+def test_map_chunks_serial():
+    parts = map_chunks(partial(_scale, 1), [1, 2, 3], jobs=1)
+    assert parts == [[1, 2, 3]]
+
+
+def test_map_chunks_empty():
+    assert map_chunks(partial(_scale, 1), [], jobs=4) == []
+
+
+def _make_tree(root, files=600):
+    for i in range(files):
+        d = root / f"pkg{i % 7}"
+        d.mkdir(exist_ok=True)
+        ext = (".py", ".js", ".rs")[i % 3]
+        body = "x = 1\n" * (i % 5)
+        if i % 4 == 0:
+            body += "# TODO: item %d\n# FIXME: other\n" % i
+        (d / f"m{i}{ext}").write_text(body)
+
+
+def test_parallel_languages_match_serial(tmp_path):
+    _make_tree(tmp_path)
+    serial = analyze_languages(tmp_path, jobs=1)
+    parallel = analyze_languages(tmp_path, jobs=4)
+    assert parallel == serial
+
+
+def test_parallel_todos_match_serial(tmp_path):
+    _make_tree(tmp_path)
+    serial = analyze_todos(tmp_path, jobs=1)
+    parallel = analyze_todos(tmp_path, jobs=4)
+    assert parallel.total == serial.total == 300
+    assert dict(parallel.counts) == dict(serial.counts)
+    assert parallel.items == serial.items
@@ -0,0 +1,120 @@
+"""Tests for the analyzer scheduler and pipeline."""
+
+import time
+
+import pytest
+
+from repolyzer.analyzers import (
+    analyze_dependencies,
+    analyze_health,
+    analyze_languages,
+    analyze_structure,
+    analyze_todos,
+)
+from repolyzer.pipeline import AnalysisOptions, Scheduler, run_analysis
+
+
+def test_scheduler_passes_dependency_results():
+    scheduler = Scheduler()
+    scheduler.add("a", lambda: 2)
+    scheduler.add("b", lambda: 3)
+    scheduler.add("product", lambda a, b: a * b, "a", "b")
+    results = scheduler.run()
+    assert results == {"a": 2, "b": 3, "product": 6}
+    assert set(scheduler.timings) == {"a", "b", "product"}
+
+
+def test_scheduler_runs_independent_tasks_concurrently():
+    scheduler = Scheduler()
+    for name in ("one", "two", "three"):
+        scheduler.add(name, lambda: time.sleep(0.2))
+    start = time.perf_counter()
+    scheduler.run()
+    assert time.perf_counter() - start < 0.5
+    assert all(t >= 0.2 for t in scheduler.timings.values())
+
+
+def test_scheduler_result_order_is_registration_order():
+    scheduler = Scheduler()
+    scheduler.add("slow", lambda: time.sleep(0.1) or "slow")
+    scheduler.add("fast", lambda: "fast")
+    assert list(scheduler.run()) == ["slow", "fast"]
+
+
+def test_scheduler_unknown_dependency():
+    scheduler = Scheduler()
+    with pytest.raises(ValueError):
+        scheduler.add("b", lambda a: a, "a")
+
+
+def test_scheduler_propagates_errors():
+    def boom():
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler()
+    scheduler.add("boom", boom)
+    scheduler.add("after", lambda x: x, "boom")
+    with pytest.raises(RuntimeError, match="boom"):
+        scheduler.run()
+
+
+def test_run_analysis_matches_serial_analyzers(tmp_path):
+    (tmp_path / "README.md").write_text("# Demo\n")
+    (tmp_path / "app.py").write_text("# TODO: one\nx = 1\n")
+    (tmp_path / "requirements.txt").write_text("flask\n")
+
+    analysis = run_analysis(tmp_path, AnalysisOptions(git=False, cache=False, jobs=1))
+
+    assert analysis.languages == analyze_languages(tmp_path)
+    assert analysis.structure == analyze_structure(tmp_path)
+    assert analysis.dependencies == analyze_dependencies(tmp_path)
+    assert analysis.health == analyze_health(tmp_path)
+    assert analysis.todos.total == analyze_todos(tmp_path).total == 1
+    assert analysis.git is None
+    assert {"scan", "contents", "languages", "structure", "todos"} <= set(analysis.timings)
+
+
+def test_run_analysis_skips_disabled_analyzers(tmp_path):
+    analysis = run_analysis(
+        tmp_path, AnalysisOptions(git=False, health=False, todos=False, cache=False),
+    )
+    assert analysis.health is None
+    assert analysis.todos is None
+    assert "todos" not in analysis.timings
+
+
+def test_scheduler_profile_runs_tasks_serially():
+    order = []
+    scheduler = Scheduler(profile=True)
+    scheduler.add("a", lambda: order.append("a") or 2)
+    scheduler.add("b", lambda: order.append("b") or 3)
+    scheduler.add("sum", lambda a, b: a + b, "a", "b")
+    assert scheduler.run() == {"a": 2, "b": 3, "sum": 5}
+    assert order == ["a", "b"]
+    assert list(scheduler.profiles) == ["a", "b", "sum"]
+    assert scheduler.timings["sum"] == scheduler.profiles["sum"].wall_seconds
+
+
+def test_run_analysis_profile_counts_io(tmp_path):
+    import subprocess
+
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "app.py").write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("hello\n")
+    (tmp_path / "requirements.txt").write_text("flask\n")
+
+    analysis = run_analysis(tmp_path, AnalysisOptions(cache=False, jobs=1, profile=True))
+    profiles = {p.name: p for p in analysis.profiles}
+
+    assert set(profiles) == set(analysis.timings)
+    assert profiles["scan"].files_visited == 3
+    assert profiles["contents"].files_opened == 1
+    assert profiles["contents"].bytes_read == 6
+    assert profiles["dependencies"].files_opened == 1
+    assert any(r.command.startswith("git status") for r in profiles["git"].subprocesses)
+    assert all(p.wall_seconds >= 0 and p.peak_memory_bytes >= 0 for p in analysis.profiles)
+
+
+def test_run_analysis_without_profile_has_no_profiles(tmp_path):
+    analysis = run_analysis(tmp_path, AnalysisOptions(git=False, cache=False))
+    assert analysis.profiles == []
@@ -0,0 +1,46 @@
+"""Tests for the per-task profiling counters."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from repolyzer import profiling
+
+
+def test_counters_are_noops_outside_a_task():
+    assert not profiling.active()
+    profiling.count(files_visited=5)
+    with profiling.track_subprocess("git status"):
+        pass
+
+
+def test_profiled_collects_counters():
+    with profiling.profiled("demo") as profile:
+        assert profiling.active()
+        profiling.count(files_visited=3, files_opened=2, bytes_read=100)
+        profiling.count(bytes_read=50)
+        with profiling.track_subprocess("git log"):
+            pass
+    assert not profiling.active()
+    assert (profile.files_visited, profile.files_opened, profile.bytes_read) == (3, 2, 150)
+    assert [r.command for r in profile.subprocesses] == ["git log"]
+    assert profile.wall_seconds >= profile.subprocesses[0].seconds >= 0
+
+
+def test_in_context_attributes_pool_threads_to_the_task():
+    with profiling.profiled("demo") as profile:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(profiling.in_context(profiling.count), files_opened=1) for _ in range(4)]
+            for future in futures:
+                future.result()
+    assert profile.files_opened == 4
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no cheap RSS reading on Windows")
+def test_profiled_measures_memory_growth():
+    with profiling.profiled("alloc") as profile:
+        block = bytearray(32 * 1024 * 1024)
+        block[::4096] = b"x" * len(block[::4096])  # touch every page
+    del block
+    assert profile.peak_memory_bytes >= 16 * 1024 * 1024
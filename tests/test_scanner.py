@@ -0,0 +1,226 @@
+"""Tests for the shared filesystem scan."""
+
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from repolyzer.analyzers.languages import analyze_languages
+from repolyzer.analyzers.structure import analyze_structure
+from repolyzer.analyzers.todos import analyze_todos
+from repolyzer import scanner
+from repolyzer.scanner import FileEntry, FileTable, scan_git_index, scan_tree
+
+
+def test_scan_tree_records_files(tmp_path):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    sub = tmp_path / "pkg"
+    sub.mkdir()
+    (sub / "mod.rs").write_text("fn main() {}\n")
+
+    scan = scan_tree(tmp_path)
+    entries = {e.path: e for e in scan.files}
+
+    assert set(entries) == {"app.py", os.path.join("pkg", "mod.rs")}
+    assert entries["app.py"].ext == ".py"
+    assert entries["app.py"].depth == 0
+    assert entries["app.py"].size == 6
+    assert entries[os.path.join("pkg", "mod.rs")].depth == 1
+    assert scan.total_dirs == 1
+
+
+def test_file_table_round_trips_entries():
+    entries = [
+        FileEntry("setup.py", 10, ".py", 0, 1),
+        FileEntry(os.path.join("src", "app_test.go"), 20, ".go", 1, 2),
+        FileEntry(os.path.join("src", "pkg", "caf\u00e9.test.js"), 30, ".js", 2, 3),
+        FileEntry(os.path.join("src", "Makefile"), 40, "", 1, 4),
+    ]
+    table = FileTable(entries)
+
+    assert list(table) == entries
+    assert table[-1] == entries[-1]
+    assert table.dirs == ["", "src", os.path.join("src", "pkg")]
+    assert list(table.sizes) == [10, 20, 30, 40]
+    assert list(table[1:3]) == entries[1:3]
+    assert list(table.select([3, 0])) == [entries[3], entries[0]]
+    assert list(pickle.loads(pickle.dumps(table))) == entries
+    with pytest.raises(IndexError):
+        table[4]
+
+
+def test_file_table_find_matches_whole_basenames():
+    table = FileTable(FileEntry(path, 0, os.path.splitext(path)[1], 0) for path in [
+        "package.json", "old-package.json", "package.json.bak", "a.test.js", "test.js", "x_test.go",
+    ])
+
+    assert table.find(names=["package.json"]) == [0]
+    assert table.find(names=["test.js"], globs=["*.test.js", "*_test.go"]) == [3, 4, 5]
+    assert table.find() == []
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10")
+def test_file_entries_have_slots():
+    assert not hasattr(FileEntry("a.py", 0, ".py", 0), "__dict__")
+
+
+def test_scan_tree_skips_dirs(tmp_path):
+    nm = tmp_path / "node_modules"
+    nm.mkdir()
+    (nm / "dep.js").write_text("var x = 1;\n")
+    (tmp_path / "app.js").write_text("var y = 2;\n")
+
+    scan = scan_tree(tmp_path)
+    assert [e.path for e in scan.files] == ["app.js"]
+    assert scan.total_dirs == 0
+
+
+def test_scan_tree_dotfile_has_no_extension(tmp_path):
+    (tmp_path / ".bashrc").write_text("export X=1\n")
+    scan = scan_tree(tmp_path)
+    assert scan.files[0].ext == ""
+
+
+def test_scan_tree_deepest_path(tmp_path):
+    deep = tmp_path / "a" / "b" / "c"
+    deep.mkdir(parents=True)
+    scan = scan_tree(tmp_path)
+    assert scan.max_depth == 3
+    assert scan.deepest_path == os.path.join("a", "b", "c")
+
+
+def test_analyzers_share_one_scan(tmp_path):
+    (tmp_path / "app.py").write_text("# TODO: one\nx = 1\n")
+    scan = scan_tree(tmp_path)
+
+    languages = analyze_languages(tmp_path, scan=scan)
+    structure = analyze_structure(tmp_path, scan=scan)
+    todos = analyze_todos(tmp_path, scan=scan)
+
+    assert languages.total_lines == 2
+    assert structure.total_files == 1
+    assert todos.total == 1
+    assert todos.items[0].file == "app.py"
+
+
+def test_scan_tree_does_not_follow_dir_symlinks(tmp_path):
+    real = tmp_path / "real"
+    real.mkdir()
+    (real / "a.py").write_text("x = 1\n")
+    try:
+        os.symlink(real, tmp_path / "link", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        return  # symlinks unavailable (e.g. unprivileged Windows)
+
+    scan = scan_tree(tmp_path)
+    assert [e.path for e in scan.files] == [os.path.join("real", "a.py")]
+    assert scan.total_dirs == 2
+
+
+def test_scan_tree_matches_os_walk_order(tmp_path):
+    for d in ("b", "a", "a/c"):
+        (tmp_path / d).mkdir()
+    for f in ("top.py", "b/x.py", "a/y.py", "a/c/z.py"):
+        (tmp_path / f).write_text("")
+
+    expected = []
+    for dirpath, _, filenames in os.walk(tmp_path):
+        expected.extend(os.path.relpath(os.path.join(dirpath, f), tmp_path) for f in filenames)
+
+    assert [e.path for e in scan_tree(tmp_path).files] == expected
+
+
+def _git(tmp_path, *args):
+    subprocess.run(["git", "-C", str(tmp_path), *args], capture_output=True, check=True)
+
+
+def _init_repo(tmp_path):
+    _git(tmp_path, "init")
+    _git(tmp_path, "config", "user.email", "test@test.com")
+    _git(tmp_path, "config", "user.name", "Tester")
+
+
+def test_scan_git_index_not_a_repo(tmp_path):
+    assert scan_git_index(tmp_path) is None
+
+
+def test_scan_git_index_lists_tracked_files(tmp_path):
+    _init_repo(tmp_path)
+    (tmp_path / ".gitignore").write_text("out/\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("x = 1\n")
+    (tmp_path / "app.py").write_text("y = 2\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-m", "init")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "gen.py").write_text("ignored\n")
+    (tmp_path / "untracked.py").write_text("not in index\n")
+
+    scan = scan_git_index(tmp_path)
+    entries = {e.path: e for e in scan.files}
+
+    assert set(entries) == {".gitignore", "app.py", os.path.join("pkg", "mod.py")}
+    walked = {e.path: e for e in scan_tree(tmp_path).files}
+    for path, entry in entries.items():
+        assert (entry.size, entry.mtime_ns, entry.depth) == (
+            walked[path].size, walked[path].mtime_ns, walked[path].depth,
+        )
+    assert scan.total_dirs == 1
+    assert scan.max_depth == 1
+
+
+def test_scan_git_index_picks_up_worktree_changes(tmp_path):
+    _init_repo(tmp_path)
+    (tmp_path / "app.py").write_text("x = 1\n")
+    (tmp_path / "gone.py").write_text("x = 1\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-m", "init")
+    (tmp_path / "app.py").write_text("x = 1\ny = 2\nz = 3\n")
+    (tmp_path / "gone.py").unlink()
+
+    scan = scan_git_index(tmp_path)
+    assert [(e.path, e.size) for e in scan.files] == [("app.py", 18)]
+
+
+def test_scan_git_index_stats_truncated_sizes(tmp_path, monkeypatch):
+    _init_repo(tmp_path)
+    (tmp_path / "big.bin").write_bytes(b"x" * 300)
+    (tmp_path / "small.py").write_text("x = 1\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-m", "init")
+    # Stand in for a file of 4 GiB or more by truncating sizes to 8 bits
+    parse = scanner._parse_index_stat
+    monkeypatch.setattr(
+        scanner, "_parse_index_stat", lambda debug: (lambda s, m, f: (s % 256, m, f))(*parse(debug))
+    )
+
+    scan = scan_git_index(tmp_path)
+    assert [(e.path, e.size) for e in scan.files] == [("big.bin", 300), ("small.py", 6)]
+
+
+def test_scan_git_index_skips_sparse_checkout(tmp_path):
+    _init_repo(tmp_path)
+    for name in ("keep", "drop"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "mod.py").write_text("x = 1\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-m", "init")
+    _git(tmp_path, "sparse-checkout", "set", "keep")
+
+    scan = scan_git_index(tmp_path)
+    assert [e.path for e in scan.files] == [os.path.join("keep", "mod.py")]
+    assert scan.total_dirs == 1
+
+
+def test_scan_git_index_subdirectory(tmp_path):
+    _init_repo(tmp_path)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.py").write_text("a\n")
+    (tmp_path / "top.py").write_text("t\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-m", "init")
+
+    scan = scan_git_index(tmp_path / "sub")
+    assert [e.path for e in scan.files] == ["a.py"]
@@ -0,0 +1,78 @@
+"""Startup cost of the CLI, measured with ``python -X importtime``."""
+
+import subprocess
+import sys
+
+# Never needed before a command actually runs
+HEAVY_MODULES = (
+    "rich",
+    "repolyzer.display",
+    "repolyzer.pipeline",
+    "repolyzer.analyzers.languages",
+    "repolyzer.analyzers.git",
+    "repolyzer.analyzers.todos",
+    "multiprocessing",
+    "concurrent.futures",
+    "subprocess",
+    "sqlite3",
+)
+
+
+def _importtime(*args):
+    """Map each imported module to its cumulative import time in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def _heavy(imported):
+    return [name for name in imported if name.split(".")[0] == "rich" or name in HEAVY_MODULES]
+
+
+def test_importing_cli_skips_heavy_modules():
+    imported = _importtime("-c", "import repolyzer.cli")
+    assert "repolyzer.cli" in imported
+    assert _heavy(imported) == []
+
+
+def test_version_skips_heavy_modules():
+    assert _heavy(_importtime("-m", "repolyzer", "--version")) == []
+
+
+def test_cli_import_costs_less_than_click():
+    # Relative to click, measured in the same process, so slow or loaded
+    # machines scale both sides alike; the modules above are what matters
+    ratios = []
+    for _ in range(3):
+        times = _importtime("-c", "import repolyzer.cli")
+        ratios.append((times["repolyzer.cli"] - times["click"]) / times["click"])
+    assert min(ratios) < 1, f"repolyzer's own imports took {min(ratios):.1f}x as long as click's"
+
+
+def test_analyzers_resolve_lazily():
+    code = (
+        "import sys\n"
+        "import repolyzer.analyzers as a\n"
+        "assert 'repolyzer.analyzers.git' not in sys.modules\n"
+        "fn = a.analyze_git\n"
+        "assert 'repolyzer.analyzers.git' in sys.modules\n"
+        "assert fn.__module__ == 'repolyzer.analyzers.git'\n"
+        "try:\n"
+        "    a.analyze_nothing\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise SystemExit('expected AttributeError')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
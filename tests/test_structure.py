@@ -70,3 +70,28 @@ def test_analyze_structure_deep_nesting(tmp_path):
 
     report = analyze_structure(tmp_path)
     assert report.max_depth >= 5
+
+
+def test_analyze_structure_keeps_top_five_files(tmp_path):
+    for i in range(12):
+        (tmp_path / f"f{i}.txt").write_text("a" * (i + 1))
+
+    report = analyze_structure(tmp_path)
+    assert [size for _, size in report.largest_files] == [12, 11, 10, 9, 8]
+
+
+def test_analyze_structure_heaviest_dirs(tmp_path):
+    (tmp_path / "small").mkdir()
+    (tmp_path / "small" / "a.txt").write_text("a")
+    big = tmp_path / "big" / "nested"
+    big.mkdir(parents=True)
+    (big / "b.txt").write_text("b" * 500)
+    (tmp_path / "big" / "c.txt").write_text("c" * 100)
+    (tmp_path / "root.txt").write_text("r" * 10)
+
+    report = analyze_structure(tmp_path)
+    assert [(d.path, d.files, d.size_bytes) for d in report.heaviest_dirs] == [
+        ("big", 2, 600),
+        (".", 1, 10),
+        ("small", 1, 1),
+    ]
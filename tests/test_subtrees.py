@@ -0,0 +1,113 @@
+"""Tests for reusing per-subtree content totals across runs."""
+
+import os
+import time
+
+from repolyzer import content as content_module
+from repolyzer.cache import ScanCache
+from repolyzer.content import ContentTotals, scan_contents
+from repolyzer.scanner import scan_tree
+from repolyzer.subtrees import summarize_contents
+
+
+def _write_old(path, text, age=60):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    past = time.time() - age
+    os.utime(path, (past, past))
+
+
+def _tree(root):
+    _write_old(root / "app.py", "# TODO: root\n")
+    _write_old(root / "lib" / "a" / "deep.py", "x = 1\n# FIXME: deep\n")
+    _write_old(root / "lib" / "b" / "other.js", "let y;\n")
+    _write_old(root / "docs" / "notes.md", "# Notes\n")
+    _write_old(root / "assets" / "logo.png", "")
+
+
+def _summarize(root, db, markers=True):
+    cache = ScanCache(db, preload=False)
+    try:
+        return summarize_contents(root, scan_tree(root), markers=markers, cache=cache)
+    finally:
+        cache.close()
+
+
+def _expected(root, markers=True):
+    return ContentTotals.from_contents(scan_contents(root, scan_tree(root), markers=markers))
+
+
+def _record_loads(monkeypatch):
+    loaded = []
+    original = ScanCache.load
+    monkeypatch.setattr(ScanCache, "load", lambda self, dirs: loaded.append(sorted(dirs)) or original(self, dirs))
+    return loaded
+
+
+def test_cold_and_warm_runs_match_a_full_read(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    _tree(repo)
+    db = tmp_path / "cache.sqlite"
+    expected = _expected(repo)
+
+    assert _summarize(repo, db) == expected
+
+    loaded = _record_loads(monkeypatch)
+    monkeypatch.setattr(content_module, "open", lambda *args, **kwargs: 1 / 0, raising=False)
+    assert _summarize(repo, db) == expected
+    assert loaded == [[]]  # the root matched: nothing below it was looked at
+
+
+def test_change_visits_only_the_chain_to_the_root(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    _tree(repo)
+    db = tmp_path / "cache.sqlite"
+    _summarize(repo, db)
+
+    _write_old(repo / "lib" / "a" / "deep.py", "x = 1\n# FIXME: deep\n# HACK: new\ny = 2\n", age=30)
+    loaded = _record_loads(monkeypatch)
+    totals = _summarize(repo, db)
+
+    assert loaded == [sorted(["", "lib", os.path.join("lib", "a")])]
+    assert totals == _expected(repo)
+    assert totals.marker_counts == {"TODO": 1, "FIXME": 1, "HACK": 1}
+
+
+def test_added_and_removed_directories(tmp_path):
+    repo = tmp_path / "repo"
+    _tree(repo)
+    db = tmp_path / "cache.sqlite"
+    _summarize(repo, db)
+
+    for path in (repo / "lib" / "b").iterdir():
+        path.unlink()
+    (repo / "lib" / "b").rmdir()
+    _write_old(repo / "src" / "main.go", "package main\n")
+
+    assert _summarize(repo, db) == _expected(repo)
+    assert os.path.join("lib", "b") not in ScanCache(db).subtree_digests()
+
+
+def test_lines_only_totals_are_not_used_for_markers(tmp_path):
+    repo = tmp_path / "repo"
+    _tree(repo)
+    db = tmp_path / "cache.sqlite"
+
+    lines_only = _summarize(repo, db, markers=False)
+    assert lines_only.marker_counts == {}
+    assert _summarize(repo, db) == _expected(repo)
+    assert _summarize(repo, db, markers=False) == lines_only
+
+
+def test_directories_with_recent_files_are_not_stored(tmp_path):
+    repo = tmp_path / "repo"
+    _tree(repo)
+    (repo / "lib" / "b" / "other.js").write_text("let z;\n")
+    db = tmp_path / "cache.sqlite"
+
+    _summarize(repo, db)
+
+    stored = ScanCache(db).subtree_digests()
+    assert os.path.join("lib", "a") in stored
+    assert not {"", "lib", os.path.join("lib", "b")} & set(stored)
+    assert "docs" in stored and "assets" not in stored  # no code files, nothing to keep
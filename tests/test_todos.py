@@ -66,3 +66,45 @@ def test_analyze_todos_item_content(tmp_path):
     assert report.items[0].marker == "BUG"
     assert "memory leak" in report.items[0].text
     assert report.items[0].line == 1
+
+
+def test_analyze_todos_priority_not_position(tmp_path):
+    (tmp_path / "app.py").write_text("# FIXME before TODO\n")
+    report = analyze_todos(tmp_path)
+    # TODO is listed before FIXME in MARKERS, so it wins regardless of position
+    assert dict(report.counts) == {"TODO": 1}
+
+
+def test_analyze_todos_xxx_case_sensitive(tmp_path):
+    (tmp_path / "app.py").write_text("# xxx lower\n# XXX upper\n")
+    report = analyze_todos(tmp_path)
+    assert dict(report.counts) == {"XXX": 1}
+    assert report.items[0].line == 2
+
+
+def test_scan_markers_matches_per_line_search():
+    import io
+    import random
+
+    from repolyzer.analyzers.todos import MARKERS, _scan_markers
+
+    def reference(text):
+        counts, hits = {}, []
+        for line_num, line in enumerate(io.StringIO(text, newline=None), 1):
+            for name, pattern in MARKERS.items():
+                if pattern.search(line):
+                    counts[name] = counts.get(name, 0) + 1
+                    snippet = line.strip()
+                    if len(snippet) > 80:
+                        snippet = snippet[:77] + "..."
+                    hits.append((name, line_num, snippet))
+                    break
+        return counts, hits
+
+    words = ["todo", "FIXME", "xxx", "XXX", "bug", "debug", "Hack", "x", "TODOS", "é", "\u0130"]
+    seps = [" ", "\n", "\r\n", "\r", ":"]
+    rng = random.Random(42)
+    for _ in range(200):
+        text = "".join(rng.choice(words) + rng.choice(seps) for _ in range(rng.randint(0, 30)))
+        counts, items = _scan_markers(text, "f.py", max_items=1000)
+        assert (counts, [(i.marker, i.line, i.text) for i in items]) == reference(text), repr(text)
@@ -0,0 +1,185 @@
+"""Tests for watch mode's incremental state and watchers."""
+
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+from repolyzer.analyzers.languages import analyze_languages
+from repolyzer.analyzers.structure import analyze_structure
+from repolyzer.analyzers.todos import analyze_todos
+from repolyzer.scanner import scan_tree
+from repolyzer.watch import InotifyWatcher, PollingWatcher, WatchState
+
+
+def _tree(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("import os\n# TODO: split\n")
+    (root / "src" / "pkg" / "util.js").write_text("let x = 1;\n// FIXME: leaks\nlet y = 2;\n")
+    (root / "README.md").write_text("# Title\n")
+    (root / "data.bin").write_bytes(b"\0" * 4096)
+
+
+def _bump(path, text):
+    # Same-size rewrites within one mtime tick would look unchanged
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _assert_matches_full_scan(state, root):
+    languages = state.languages()
+    expected = analyze_languages(root)
+    assert {s.name: (s.files, s.lines) for s in languages.languages} == {
+        s.name: (s.files, s.lines) for s in expected.languages
+    }
+    assert languages.total_lines == expected.total_lines
+
+    structure = state.structure()
+    expected = analyze_structure(root)
+    assert structure.total_files == expected.total_files
+    assert structure.total_dirs == expected.total_dirs
+    assert structure.total_size_bytes == expected.total_size_bytes
+    assert structure.max_depth == expected.max_depth
+    assert sorted(structure.largest_files) == sorted(expected.largest_files)
+    assert sorted((d.path, d.files, d.size_bytes) for d in structure.heaviest_dirs) == sorted(
+        (d.path, d.files, d.size_bytes) for d in expected.heaviest_dirs
+    )
+
+    todos = state.todos()
+    expected = analyze_todos(root)
+    assert dict(todos.counts) == dict(expected.counts)
+    assert todos.total == expected.total
+    assert sorted((i.file, i.line) for i in todos.items) == sorted((i.file, i.line) for i in expected.items)
+
+
+@pytest.fixture
+def state(tmp_path):
+    _tree(tmp_path)
+    return WatchState.build(tmp_path, cache=False)
+
+
+def test_initial_state_matches_analyzers(state, tmp_path):
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_modified_file_is_reread(state, tmp_path):
+    _bump(tmp_path / "src" / "app.py", "import os\n# TODO: split\n# HACK: temporary\nx = 1\n")
+
+    reread, new_dirs = state.apply([os.path.join("src", "app.py")])
+
+    assert (reread, new_dirs) == (1, [])
+    assert state.todos().counts["HACK"] == 1
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_unchanged_file_is_not_reread(state):
+    assert state.apply([os.path.join("src", "app.py"), "README.md"]) == (0, [])
+
+
+def test_added_and_deleted_files(state, tmp_path):
+    (tmp_path / "main.go").write_text("package main\n// BUG: off by one\n")
+    (tmp_path / "src" / "app.py").unlink()
+
+    state.apply(["main.go", os.path.join("src", "app.py")])
+
+    assert "Go" in {s.name for s in state.languages().languages}
+    assert state.todos().counts.get("TODO", 0) == 0
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_new_directory_is_scanned_and_reported(state, tmp_path):
+    deep = tmp_path / "lib" / "a" / "b"
+    deep.mkdir(parents=True)
+    (deep / "core.rs").write_text("fn main() {}\n// TODO: errors\n")
+
+    reread, new_dirs = state.apply(["lib"])
+
+    assert reread == 1
+    assert sorted(new_dirs) == ["lib", os.path.join("lib", "a"), os.path.join("lib", "a", "b")]
+    assert state.structure().deepest_path == os.path.join("lib", "a", "b")
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_removed_directory_drops_its_files(state, tmp_path):
+    shutil.rmtree(tmp_path / "src")
+
+    state.apply(["src"])
+
+    assert state.languages().total_files == 1  # README.md
+    assert state.todos().total == 0
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_skipped_directories_are_ignored(state, tmp_path):
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("// TODO: not ours\n")
+
+    assert state.apply(["node_modules", os.path.join("node_modules", "dep.js")]) == (0, [])
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_largest_files_follow_shrinking_file(state, tmp_path):
+    (tmp_path / "data.bin").write_bytes(b"")
+    state.apply(["data.bin"])
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_changed_since_finds_every_difference(state, tmp_path):
+    _bump(tmp_path / "README.md", "# Title\n\nMore.\n")
+    (tmp_path / "data.bin").unlink()
+    (tmp_path / "docs").mkdir()
+
+    changed = state.changed_since(scan_tree(tmp_path))
+
+    assert changed == {"README.md", "data.bin", "docs"}
+    state.apply(changed)
+    _assert_matches_full_scan(state, tmp_path)
+
+
+def test_polling_watcher_asks_for_a_rescan():
+    assert PollingWatcher(interval=0).wait(timeout=0) is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_reports_changes(state, tmp_path):
+    watcher = InotifyWatcher.create(tmp_path, state.dirs)
+    if watcher is None:
+        pytest.skip("inotify unavailable")
+    try:
+        assert watcher.wait(timeout=0) == set()
+
+        (tmp_path / "lib").mkdir()
+        changed = watcher.wait(timeout=5)
+        assert changed == {"lib"}
+        _, new_dirs = state.apply(changed)
+        watcher.add(new_dirs)
+
+        (tmp_path / "lib" / "mod.py").write_text("# NOTE: new\n")
+        (tmp_path / "src" / "app.py").unlink()
+        changed = set()
+        deadline = time.monotonic() + 5
+        while len(changed) < 2 and time.monotonic() < deadline:
+            changed |= watcher.wait(timeout=1)
+        assert changed == {os.path.join("lib", "mod.py"), os.path.join("src", "app.py")}
+
+        state.apply(changed)
+        _assert_matches_full_scan(state, tmp_path)
+    finally:
+        watcher.close()
+
+
+def test_gitignore_change_resyncs(state, tmp_path):
+    (tmp_path / ".gitignore").write_text("pkg/\n")
+
+    state.apply([".gitignore"])
+
+    assert os.path.join("src", "pkg", "util.js") not in state.files
+    assert state.todos().counts.get("FIXME", 0) == 0
+    _assert_matches_full_scan(state, tmp_path)
+
+    (tmp_path / ".gitignore").write_text("")
+    state.apply([".gitignore"])
+    assert state.todos().counts["FIXME"] == 1